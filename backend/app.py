@@ -1,5 +1,5 @@
-from flask import Flask, request, jsonify, make_response, send_from_directory, has_app_context
-from datetime import datetime, timezone, timedelta
+from flask import Flask, Response, g, request, jsonify, make_response, send_from_directory, has_app_context, has_request_context, stream_with_context
+from datetime import date, datetime, timezone, timedelta
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 import os
@@ -8,7 +8,29 @@ import uuid
 import logging
 import secrets
 import hashlib
+import base64
+import csv
+import io
+import time
+import threading
+import re
+import bisect
+from contextvars import ContextVar
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from collections import deque
+from collections import OrderedDict
+import click
+from decimal import Decimal, InvalidOperation
+import numpy as np
+from sqlalchemy import event, func, inspect, or_, text, tuple_
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     JWTManager,
@@ -26,6 +48,10 @@ from flask_jwt_extended import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Import-to-first-request startup timing (see create_app and _note_first_request)
+_IMPORT_STARTED = time.perf_counter()
+startup_timings = {}
+
 # -----------------------
 # App + CORS
 # -----------------------
@@ -51,17 +77,117 @@ if DATABASE_URL.startswith("postgres://"):
 app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URL
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Pool sizing per worker process. Under gunicorn (gunicorn.conf.py) each of WEB_CONCURRENCY
+# workers runs GUNICORN_THREADS request threads, so a worker needs one connection per thread;
+# DB_MAX_CONNECTIONS is this app's budget on the database server, shared by all workers.
+WEB_WORKERS = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+WEB_THREADS = max(1, int(os.environ.get("GUNICORN_THREADS", "4")))
+DB_MAX_CONNECTIONS = int(os.environ.get("DB_MAX_CONNECTIONS", "60"))
+# /api/dashboard sub-queries run on a shared per-worker pool, each holding its own connection
+DASHBOARD_WORKERS = max(1, int(os.environ.get("DASHBOARD_WORKERS", "4")))
+
+def pool_settings(workers: int = WEB_WORKERS, threads: int = WEB_THREADS, budget: int = DB_MAX_CONNECTIONS):
+    per_worker = max(1, budget // workers)
+    pool_size = min(threads, per_worker)
+    overflow = min(threads + DASHBOARD_WORKERS, per_worker - pool_size)
+    return (
+        int(os.environ.get("DB_POOL_SIZE", pool_size)),
+        int(os.environ.get("DB_MAX_OVERFLOW", max(0, overflow))),
+    )
+
+DB_POOL_SIZE, DB_MAX_OVERFLOW = pool_settings()
+
+# Seconds a request waits for a pooled connection before failing
+DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
+
+class PoolWaitStats:
+    """How long checkouts waited for a pooled connection in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            if not hasattr(self, "total_count"):  # lifetime totals for /api/metrics; never reset
+                self.total_count, self.total_seconds, self.total_timeouts = 0, 0.0, 0
+            self.count = 0
+            self.seconds = 0.0
+            self.max = 0.0
+            self.waited = 0  # checkouts slower than 1ms: pool exhausted or opening a connection
+            self.timeouts = 0
+            self.recent = deque(maxlen=1024)
+            self.since = datetime.now(timezone.utc)
+
+    def observe(self, seconds: float, timed_out: bool = False):
+        with self.lock:
+            self.count += 1
+            self.seconds += seconds
+            self.max = max(self.max, seconds)
+            self.waited += seconds > 0.001
+            self.timeouts += timed_out
+            self.recent.append(seconds)
+            self.total_count += 1
+            self.total_seconds += seconds
+            self.total_timeouts += timed_out
+
+    def totals(self) -> dict:
+        with self.lock:
+            return {"checkouts": self.total_count, "seconds": self.total_seconds, "timeouts": self.total_timeouts}
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            recent = sorted(self.recent)
+
+            def pct(p):
+                return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 3) if recent else None
+
+            return {
+                "checkouts": self.count,
+                "waited": self.waited,
+                "timeouts": self.timeouts,
+                "avgMs": round(self.seconds / self.count * 1000, 3) if self.count else None,
+                "maxMs": round(self.max * 1000, 3),
+                "p50Ms": pct(0.5),
+                "p95Ms": pct(0.95),
+                "p99Ms": pct(0.99),
+                "since": self.since.isoformat(),
+            }
+
+pool_wait_stats = PoolWaitStats()
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout. The time includes opening a new connection
+    when the pool has none idle, which is also time a request spends waiting.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeout:
+            pool_wait_stats.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_wait_stats.observe(time.perf_counter() - started)
+        return conn
+
 # Build engine options based on database type
 engine_options = {
+    "poolclass": TimedQueuePool,
     "pool_pre_ping": True,
     "pool_recycle": 1200,
-    "pool_size": 10,
-    "max_overflow": 20,
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
 }
 
+# Seconds to wait for a new Postgres connection; bounds how long startup and requests hang on a dead DB
+DB_CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", "3"))
+
 # SQLite does not support connect_timeout; only add for postgres
 if not DATABASE_URL.startswith("sqlite"):
-    engine_options["connect_args"] = {"connect_timeout": 3}
+    engine_options["connect_args"] = {"connect_timeout": DB_CONNECT_TIMEOUT}
 
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
 
@@ -78,6 +204,57 @@ db = SQLAlchemy(app)
 
 # All data consolidated into single database
 
+# -----------------------
+# Graceful shutdown
+# -----------------------
+class InflightWrites:
+    """
+    Counts write requests in progress and refuses new ones once shutdown begins.
+    Under gunicorn (gunicorn.conf.py) SIGTERM flips stop_accepting(); the gthread worker
+    then keeps serving open keep-alive connections for graceful_timeout while it finishes
+    the requests already running, so writes arriving in that window get a 503 + Retry-After
+    (and go to another worker) instead of starting a commit that may be cut off.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._count = 0
+        self._accepting = True
+
+    def enter(self) -> bool:
+        with self._lock:
+            if not self._accepting:
+                return False
+            self._count += 1
+            return True
+
+    def exit(self):
+        with self._lock:
+            self._count -= 1
+
+    def stop_accepting(self):
+        # Plain assignment, no lock: called from a signal handler
+        self._accepting = False
+
+    @property
+    def pending(self) -> int:
+        return self._count
+
+inflight_writes = InflightWrites()
+
+def drained_write(fn):
+    """Route decorator: track the request in inflight_writes; 503 once the worker is shutting down."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not inflight_writes.enter():
+            resp = jsonify({"status": "error", "message": "Server is restarting, please retry"})
+            resp.headers["Retry-After"] = "5"
+            return resp, 503
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            inflight_writes.exit()
+    return wrapper
+
 # -----------------------
 # Helpers
 # -----------------------
@@ -90,6 +267,8 @@ def require_admin() -> bool:
 
 # ✅ RBAC map: keys must match user_key_from_email()
 # Recommended: use full emails as keys (more reliable than prefix).
+# Initial pod assignments, seeded into pod_assignments by migration 7. After that the
+# table is the source of truth (PUT /api/pod-assignments); editing this has no effect.
 TEAM_ACCESS = {
     "Manager": {
         # "manager1@aidash.com": ["POD-1 (Aryabhatta)", "POD-2 (Crawlers)"],
@@ -115,6 +294,79 @@ def user_key_from_email(email: str) -> str:
     """
     return (email or "").split("@")[0].strip().lower()
 
+# Payload coercion (shared by tracker submissions and imports)
+def to_numeric(val):
+    """Empty strings / 'undefined' become None; anything non-numeric becomes None."""
+    if val is None or val == '' or val == 'undefined':
+        return None
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+def to_text(val):
+    if val is None or val == '' or val == 'undefined':
+        return None
+    return str(val).strip() if str(val).strip() else None
+
+def to_int(val):
+    """Convert boolean to int (0 or 1) for numeric columns"""
+    # Handle boolean first (before None check, since None is also falsy)
+    if isinstance(val, bool):
+        return 1 if val else 0
+    # Handle None, empty strings, undefined
+    if val is None or val == '' or val == 'undefined':
+        return 0  # Default to 0 for false values
+    # Try to convert to int
+    try:
+        return int(val)
+    except (ValueError, TypeError):
+        return 0  # Default to 0 on error
+
+# Keyset pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def parse_page_size(raw) -> int:
+    try:
+        size = int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+def encode_cursor(sort_value, row_id: str) -> str:
+    """
+    Opaque cursor for the last row of a page: urlsafe base64 of [sort_value, id].
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Inverse of encode_cursor(). Raises ValueError on anything malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {e}") from e
+    if not isinstance(row_id, str):
+        raise ValueError("invalid cursor: id must be a string")
+    return sort_value, row_id
+
+def keyset_after(sort_col, id_col, sort_value, row_id):
+    """
+    Filter for rows strictly after (sort_value, row_id) in
+    ORDER BY sort_col DESC NULLS LAST, id_col DESC.
+    """
+    if sort_value is None:
+        return (sort_col.is_(None)) & (id_col < row_id)
+    return or_(tuple_(sort_col, id_col) < tuple_(sort_value, row_id), sort_col.is_(None))
+
 # -----------------------
 # Models
 # -----------------------
@@ -144,7 +396,7 @@ class DailyTracker(db.Model):
     __tablename__ = "daily_tracker_table"
     id = db.Column(db.String(50), primary_key=True)
     email = db.Column(db.String(255), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
+    date = db.Column(db.Date, nullable=False)  # work date; monthly partition key on Postgres
     mode_of_functioning = db.Column(db.String(50), nullable=True)
     pod_name = db.Column(db.String(100), nullable=True)
     product = db.Column(db.String(100), nullable=True)
@@ -188,16 +440,31 @@ class DailyTracker(db.Model):
     # RSMS specific fields
     time_field = db.Column(db.Numeric(10, 2), nullable=True)
 
+    # Legacy rows carry the full request here; new rows point at tracker_submissions_table
     metadata_json = db.Column(db.Text, nullable=True)
+    submission_id = db.Column(db.String(50), nullable=True, index=True)
     submitted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        # Covers SELECT DISTINCT over the filter dimensions (index-only scan per pod range)
+        db.Index("idx_daily_tracker_filter_values", "pod_name", "product", "project_name", "nature_of_work", "task"),
+    )
+
+class TrackerSubmission(db.Model):
+    """One /api/tracker request; its raw payload is stored here once for all project rows."""
+    __tablename__ = "tracker_submissions_table"
+    id = db.Column(db.String(50), primary_key=True)
+    email = db.Column(db.String(255), nullable=False)
+    project_count = db.Column(db.Integer, nullable=False, default=0)
+    payload_json = db.Column(db.Text, nullable=True)
+    submitted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
 
 class ResourceTable(db.Model):
     __tablename__ = "resource_planning_table"
     id = db.Column(db.String(50), primary_key=True)
     email = db.Column(db.String(255), nullable=False)
-    date = db.Column(db.String(50), nullable=False)
+    date = db.Column(db.Date, nullable=False)
     pod_name = db.Column(db.String(100), nullable=True)
     mode_of_functioning = db.Column(db.String(100), nullable=True)
     product = db.Column(db.String(100), nullable=True)
@@ -229,10 +496,115 @@ class DailyActivity(db.Model):
     created_at = db.Column(db.Text, nullable=True)
     less_worked_hours = db.Column(db.Text, nullable=True)
 
+    # Product fields of tracker rows moved here by archive_tracker (same names and types as
+    # DailyTracker, as in the original create_tables.sql); archived_at marks those rows
+    conductor_lines = db.Column(db.Numeric(10, 2), nullable=True)
+    number_of_points = db.Column(db.Numeric(10, 2), nullable=True)
+    tracker_updating = db.Column(db.Numeric(10, 2), nullable=True)
+    data_quality_checking = db.Column(db.Numeric(10, 2), nullable=True)
+    training_feedback = db.Column(db.Numeric(10, 2), nullable=True)
+    trn_remarks = db.Column(db.Text, nullable=True)
+    documentation = db.Column(db.Numeric(10, 2), nullable=True)
+    doc_remark = db.Column(db.Text, nullable=True)
+    others_misc = db.Column(db.Text, nullable=True)
+    updated_in_prod_qc_tracker = db.Column(db.Numeric(10, 2), nullable=True)
+    site_name = db.Column(db.String(255), nullable=True)
+    area_hectares = db.Column(db.Numeric(10, 2), nullable=True)
+    polygon_feature_count = db.Column(db.Numeric(10, 2), nullable=True)
+    polyline_feature_count = db.Column(db.Numeric(10, 2), nullable=True)
+    point_feature_count = db.Column(db.Numeric(10, 2), nullable=True)
+    spent_hours_on_above_task = db.Column(db.Numeric(10, 2), nullable=True)
+    density = db.Column(db.Numeric(10, 2), nullable=True)
+    time_field = db.Column(db.Numeric(10, 2), nullable=True)
+    metadata_json = db.Column(db.Text, nullable=True)
+    submission_id = db.Column(db.String(50), nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("idx_daily_activity_filter_values", "pod_name", "product", "project_name", "nature_of_work", "task"),
+    )
+
+class DailyTrackerRollup(db.Model):
+    """
+    Per (email, date, pod, product, project) totals of daily_tracker_table, kept
+    in step with every write so reports never have to scan raw rows.
+    NULL dimensions are stored as "" so the composite key can be upserted.
+    """
+    __tablename__ = "daily_tracker_rollup"
+    email = db.Column(db.String(255), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    pod_name = db.Column(db.String(100), primary_key=True, default="")
+    product = db.Column(db.String(100), primary_key=True, default="")
+    project_name = db.Column(db.String(255), primary_key=True, default="")
+    total_hours = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    line_miles = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    feature_count = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    entries = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("idx_daily_tracker_rollup_date", "date"),
+        db.Index("idx_daily_tracker_rollup_pod_date", "pod_name", "date"),
+    )
+
+class SchemaMigration(db.Model):
+    """Applied versions from MIGRATIONS (see run_migrations)."""
+    __tablename__ = "schema_migrations"
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(255), nullable=False)
+    applied_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class PodAssignment(db.Model):
+    """
+    Which pods a Manager/Team Lead sees. user_key is user_key_from_email() of the
+    identity; the primary key doubles as the index for the scope semi-join.
+    """
+    __tablename__ = "pod_assignments"
+    user_key = db.Column(db.String(255), primary_key=True)
+    role = db.Column(db.String(50), primary_key=True)
+    pod_name = db.Column(db.String(100), primary_key=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class WriteGeneration(db.Model):
+    """
+    Per-table write counter, bumped after every committed write (see bump_generation)
+    so conditional-GET validators change on in-place edits too.
+    """
+    __tablename__ = "write_generations"
+    name = db.Column(db.String(50), primary_key=True)
+    generation = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+class ArchiveCheckpoint(db.Model):
+    """
+    Progress of an in-flight archive pass (see archive_tracker): the last (date, id)
+    moved, so an interrupted run resumes where it stopped. Cleared when a pass completes.
+    """
+    __tablename__ = "archive_checkpoints"
+    job = db.Column(db.String(50), primary_key=True)
+    last_date = db.Column(db.Date, nullable=True)
+    last_id = db.Column(db.String(50), nullable=True)
+    rows_moved = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+# Composite indexes matching the hot query shapes. Fresh databases get them from
+# db.create_all(); existing ones from migration 3.
+db.Index("idx_daily_tracker_submitted_at", DailyTracker.submitted_at.desc())
+db.Index("idx_daily_tracker_pod_submitted", DailyTracker.pod_name, DailyTracker.submitted_at.desc())
+db.Index("idx_daily_tracker_email_submitted", DailyTracker.email, DailyTracker.submitted_at.desc())
+db.Index("idx_daily_activity_pod_activity_date", DailyActivity.pod_name, DailyActivity.activity_date.desc())
+db.Index("idx_daily_activity_activity_date_id", DailyActivity.activity_date.desc(), DailyActivity.id.desc())
+db.Index("idx_users_table_pod_name", User.pod_name)
+db.Index("idx_resource_planning_date", ResourceTable.date)
+# archive_tracker walks old rows in (date, id) order
+db.Index("idx_daily_tracker_date_id", DailyTracker.date, DailyTracker.id)
+
 
 # -----------------------
 # DB init
 # -----------------------
+# One-time setup (tables, migrations, partitions, seed users). Runs from create_app at
+# startup or `flask --app app init-db`, never from request handlers.
 _tables_verified = False
 
 def initialize_rds():
@@ -247,13 +619,15 @@ def initialize_rds():
                 return initialize_rds()
 
         db.create_all()
+        run_migrations()
+        ensure_partitions()
 
         # Ensure default admin exists
         if not User.query.filter_by(email="admin@aidash.com").first():
             admin = User(
                 id=str(uuid.uuid4()),
                 email="admin@aidash.com",
-                password=generate_password_hash("password123"),
+                password=generate_password_hash("password123", PASSWORD_HASH_METHOD),
                 name="System Admin",
                 role="Admin",
             )
@@ -263,10 +637,10 @@ def initialize_rds():
         # Seed sample users if none exist
         if User.query.count() == 1:  # Only admin exists
             sample_users = [
-                User(id=str(uuid.uuid4()), email="user1@aidash.com", password=generate_password_hash("password123"), name="User One", role="User"),
-                User(id=str(uuid.uuid4()), email="user2@aidash.com", password=generate_password_hash("password123"), name="User Two", role="User"),
-                User(id=str(uuid.uuid4()), email="manager1@aidash.com", password=generate_password_hash("password123"), name="Manager One", role="Manager"),
-                User(id=str(uuid.uuid4()), email="lead1@aidash.com", password=generate_password_hash("password123"), name="Team Lead One", role="Team Lead"),
+                User(id=str(uuid.uuid4()), email="user1@aidash.com", password=generate_password_hash("password123", PASSWORD_HASH_METHOD), name="User One", role="User"),
+                User(id=str(uuid.uuid4()), email="user2@aidash.com", password=generate_password_hash("password123", PASSWORD_HASH_METHOD), name="User Two", role="User"),
+                User(id=str(uuid.uuid4()), email="manager1@aidash.com", password=generate_password_hash("password123", PASSWORD_HASH_METHOD), name="Manager One", role="Manager"),
+                User(id=str(uuid.uuid4()), email="lead1@aidash.com", password=generate_password_hash("password123", PASSWORD_HASH_METHOD), name="Team Lead One", role="Team Lead"),
             ]
             db.session.add_all(sample_users)
             db.session.commit()
@@ -276,187 +650,2106 @@ def initialize_rds():
 
     except Exception as e:
         logger.error(f"DB Init Error: {e}")
+        db.session.rollback()
         return False
-# -----------------------
-# Static routes (React build)
-# -----------------------
-@app.route("/", methods=["GET"])
-def index():
-    resp = make_response(send_from_directory("dist", "index.html"))
-    resp.headers["Cache-Control"] = "no-store, max-age=0"
-    return resp
 
-@app.route("/assets/<path:filename>")
-def assets(filename):
-    return send_from_directory("dist/assets", filename)
+@app.cli.command("init-db")
+def init_db_command():
+    """Create tables, apply migrations, ensure partitions and seed the default users."""
+    if not initialize_rds():
+        raise click.ClickException("Database initialisation failed (see log)")
+    click.echo("Database ready")
 
 # -----------------------
-# API
+# Schema migrations
 # -----------------------
-@app.route("/api/health", methods=["GET"])
-def health_check():
-    return jsonify({"status": "connected", "timestamp": datetime.now(timezone.utc).isoformat()}), 200
-
-@app.route("/api/debug/daily-activity-count", methods=["GET"])
-def debug_daily_activity_count():
-    """Debug endpoint to check data in database"""
-    try:
-        initialize_rds()
-        count = DailyTracker.query.count()
-        return jsonify({"status": "success", "daily_tracker_count": count}), 200
-    except Exception as e:
-        logger.error(f"Error: {str(e)}")
-        return jsonify({"status": "error", "message": str(e)}), 500
+# db.create_all() only creates missing tables; anything that changes an existing
+# table (columns, indexes) goes here as a new, never-edited version.
+def _columns(table: str) -> set:
+    return {c["name"] for c in inspect(db.session.connection()).get_columns(table)}
+
+def _add_column(table: str, column: str, ddl_type: str):
+    if column not in _columns(table):
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
+def _create_index(name: str, table: str, columns: str):
+    db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+def _migration_0001():
+    # Columns the models (and get_users / get_daily_activity) rely on but older schemas lack
+    _add_column("users_table", "pod_name", "VARCHAR(100)")
+    _add_column("daily_activity", "name", "TEXT")
+    _add_column("daily_activity", "activity_date", "TIMESTAMP")
+    _add_column("daily_activity", "less_worked_hours", "TEXT")
+    # The original create_tables.sql kept the work day in a NOT NULL VARCHAR "date" that the
+    # model never writes: carry it over to activity_date (keyset order, partition key) and
+    # stop requiring it, or imports and archive inserts fail the constraint
+    cols = _columns("daily_activity")
+    if "date" in cols:
+        fallback = "submitted_at" if "submitted_at" in cols else "NULL"
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(text(
+                "UPDATE daily_activity SET activity_date = COALESCE("
+                r"CASE WHEN date ~ '^\d{4}-\d{2}-\d{2}' THEN left(date, 10)::timestamp END, "
+                f"{fallback}) WHERE activity_date IS NULL"
+            ))
+            db.session.execute(text("ALTER TABLE daily_activity ALTER COLUMN date DROP NOT NULL"))
+        else:
+            db.session.execute(text(
+                f"UPDATE daily_activity SET activity_date = COALESCE(datetime(date), datetime({fallback})) "
+                "WHERE activity_date IS NULL"
+            ))
+            # SQLite can't relax NOT NULL in place; the value now lives in activity_date
+            db.session.execute(text("ALTER TABLE daily_activity DROP COLUMN date"))
+
+def _migration_0002():
+    _add_column("daily_tracker_table", "submission_id", "VARCHAR(50)")
+    _create_index("ix_daily_tracker_table_submission_id", "daily_tracker_table", "submission_id")
+    _create_index(
+        "idx_daily_tracker_filter_values", "daily_tracker_table",
+        "pod_name, product, project_name, nature_of_work, task",
+    )
+    _create_index(
+        "idx_daily_activity_filter_values", "daily_activity",
+        "pod_name, product, project_name, nature_of_work, task",
+    )
 
-@app.route("/api/ui-options", methods=["GET"])
-def ui_options():
-    try:
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        metadata_path = os.path.join(base_dir, "metadata.json")
-        with open(metadata_path, "r", encoding="utf-8") as f:
-            meta = json.load(f)
-        return jsonify({"status": "success", "data": meta.get("uiOptions", {})}), 200
-    except Exception as e:
-        logger.error(f"UI options load error: {e}")
-        return jsonify({"status": "error", "message": "Could not load uiOptions"}), 500
+def _migration_0003():
+    # /api/performance, /api/team-report, exports: scope by pod or email, newest first
+    _create_index("idx_daily_tracker_submitted_at", "daily_tracker_table", "submitted_at DESC")
+    _create_index("idx_daily_tracker_pod_submitted", "daily_tracker_table", "pod_name, submitted_at DESC")
+    _create_index("idx_daily_tracker_email_submitted", "daily_tracker_table", "email, submitted_at DESC")
+    # /api/daily_activity keyset pages, scoped (Manager/Team Lead) and unscoped (Admin)
+    _create_index("idx_daily_activity_pod_activity_date", "daily_activity", "pod_name, activity_date DESC")
+    _create_index("idx_daily_activity_activity_date_id", "daily_activity", "activity_date DESC, id DESC")
+    # /api/users for Managers/Team Leads
+    _create_index("idx_users_table_pod_name", "users_table", "pod_name")
+    # /api/resource date ranges; /api/performance/summary for pod scopes
+    _create_index("idx_resource_planning_date", "resource_planning_table", "date")
+    _create_index("idx_daily_tracker_rollup_pod_date", "daily_tracker_rollup", "pod_name, date")
+
+def _is_date_column(table: str, column: str) -> bool:
+    for c in inspect(db.session.connection()).get_columns(table):
+        if c["name"] == column:
+            return isinstance(c["type"], db.Date) and not isinstance(c["type"], db.DateTime)
+    return False
+
+def _migration_0004():
+    # VARCHAR work dates -> DATE. Rows whose text is not a date fall back to the day they were submitted.
+    if db.engine.dialect.name == "postgresql":
+        for table in ("daily_tracker_table", "resource_planning_table"):
+            if _is_date_column(table, "date"):
+                continue
+            db.session.execute(text(
+                f"ALTER TABLE {table} ALTER COLUMN date TYPE DATE USING ("
+                r"CASE WHEN date ~ '^\d{4}-\d{2}-\d{2}' THEN left(date, 10)::date "
+                "ELSE COALESCE(submitted_at, now())::date END)"
+            ))
+        if not _is_date_column("daily_tracker_rollup", "date"):
+            # Derived data: empty it, retype, rebuild from the converted tracker rows
+            db.session.execute(text("DELETE FROM daily_tracker_rollup"))
+            db.session.execute(text(
+                "ALTER TABLE daily_tracker_rollup ALTER COLUMN date TYPE DATE USING NULLIF(date, '')::date"
+            ))
+    else:
+        # SQLite has no column types to change; normalise the stored text so it parses as a DATE
+        for table in ("daily_tracker_table", "resource_planning_table"):
+            db.session.execute(text(
+                f"UPDATE {table} SET date = COALESCE(date(date), date(submitted_at), date('now')) "
+                "WHERE date IS NULL OR date IS NOT date(date)"
+            ))
+        db.session.execute(text("DELETE FROM daily_tracker_rollup"))
+    # daily_activity holds no archived tracker rows (nor their columns) before migration 8
+    rebuild_rollup(commit=False, include_archived=False)
+
+def _migration_0005():
+    # Monthly range partitions (Postgres only; SQLite keeps plain tables)
+    if db.engine.dialect.name != "postgresql":
+        return
+    partition_by_month(DailyTracker.__table__, "date", "PRIMARY KEY (id, date)")
+    # activity_date is nullable, so it can't sit in a primary key; NULLs land in the default partition
+    partition_by_month(DailyActivity.__table__, "activity_date", "UNIQUE (id, activity_date)")
+    # edit_daily_activity_by_keys looks rows up by id alone
+    _create_index("idx_daily_activity_id", "daily_activity", "id")
+
+def _migration_0006():
+    _create_index("idx_daily_tracker_date_id", "daily_tracker_table", "date, id")
+
+def _migration_0007():
+    # pod_assignments itself comes from db.create_all(); seed it once from TEAM_ACCESS
+    if db.session.query(PodAssignment.user_key).first() is None:
+        db.session.add_all(
+            PodAssignment(user_key=key, role=role, pod_name=pod)
+            for role, users in TEAM_ACCESS.items()
+            for key, pods in users.items()
+            for pod in pods
+        )
 
-@app.route("/api/login", methods=["POST"])
-def login():
-    initialize_rds()
-    data = request.json or {}
-    email = (data.get("email") or "").strip()
-    password = data.get("password")
+# Tracker-only columns daily_activity needs to hold archived rows in full
+ARCHIVED_TRACKER_COLUMNS = (
+    ("conductor_lines", "NUMERIC(10, 2)"), ("number_of_points", "NUMERIC(10, 2)"),
+    ("tracker_updating", "NUMERIC(10, 2)"), ("data_quality_checking", "NUMERIC(10, 2)"),
+    ("training_feedback", "NUMERIC(10, 2)"), ("trn_remarks", "TEXT"), ("documentation", "NUMERIC(10, 2)"),
+    ("doc_remark", "TEXT"), ("others_misc", "TEXT"), ("updated_in_prod_qc_tracker", "NUMERIC(10, 2)"),
+    ("site_name", "VARCHAR(255)"), ("area_hectares", "NUMERIC(10, 2)"),
+    ("polygon_feature_count", "NUMERIC(10, 2)"), ("polyline_feature_count", "NUMERIC(10, 2)"),
+    ("point_feature_count", "NUMERIC(10, 2)"), ("spent_hours_on_above_task", "NUMERIC(10, 2)"),
+    ("density", "NUMERIC(10, 2)"), ("time_field", "NUMERIC(10, 2)"), ("metadata_json", "TEXT"),
+    ("submission_id", "VARCHAR(50)"), ("archived_at", "TIMESTAMP"),
+)
 
-    if not email or not password:
-        return jsonify({"status": "error", "message": "email and password required"}), 400
+def _migration_0008():
+    # Existing columns (schemas from the original create_tables.sql have most) are kept as they are
+    for column, ddl_type in ARCHIVED_TRACKER_COLUMNS:
+        _add_column("daily_activity", column, ddl_type)
+
+MIGRATIONS = [
+    (1, "users_table.pod_name, daily_activity columns used by the models, legacy date -> activity_date", _migration_0001),
+    (2, "tracker submission_id and filter-value covering indexes", _migration_0002),
+    (3, "composite indexes for the hot query shapes", _migration_0003),
+    (4, "DATE work-date columns on tracker, resource planning and rollup", _migration_0004),
+    (5, "monthly range partitioning of daily_tracker_table and daily_activity", _migration_0005),
+    (6, "(date, id) index for tracker archival", _migration_0006),
+    (7, "seed pod_assignments from TEAM_ACCESS", _migration_0007),
+    (8, "daily_activity columns for archived tracker rows", _migration_0008),
+]
+
+# Arbitrary constant: serializes concurrent workers running migrations on Postgres
+_MIGRATION_LOCK_ID = 74_830_211
+
+def run_migrations() -> list:
+    """
+    Apply pending MIGRATIONS in order, one transaction each. Returns applied versions.
+    """
+    is_pg = db.engine.dialect.name == "postgresql"
+    if is_pg:
+        db.session.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _MIGRATION_LOCK_ID})
+    try:
+        done = {v for (v,) in db.session.query(SchemaMigration.version)}
+        applied = []
+        for version, description, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            try:
+                migrate()
+                db.session.add(SchemaMigration(version=version, description=description))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            logger.info(f"Applied migration {version}: {description}")
+            applied.append(version)
+        return applied
+    finally:
+        if is_pg:
+            db.session.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _MIGRATION_LOCK_ID})
+            db.session.commit()
 
-    user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password, password):
-        return jsonify({"status": "error", "message": "Invalid credentials"}), 401
+@app.cli.command("migrate")
+def migrate_command():
+    """Create missing tables and apply pending schema migrations."""
+    db.create_all()
+    applied = run_migrations()
+    current = max((v for v, _, _ in MIGRATIONS), default=0)
+    click.echo(f"Applied {applied or 'nothing'}; schema is at version {current}")
 
-    access_token = create_access_token(
-        identity=user.email,
-        additional_claims={"role": user.role, "id": user.id},
-    )
-    refresh_token = create_refresh_token(identity=user.email)
-    return jsonify(
-        {
-            "status": "success",
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "user": {"id": user.id, "email": user.email, "name": user.name, "role": user.role},
-        }
-    ), 200
+# -----------------------
+# Monthly partitions (Postgres)
+# -----------------------
+# daily_tracker_table is range-partitioned on date and daily_activity on activity_date,
+# one partition per calendar month (<table>_pYYYYMM) plus a DEFAULT catch-all, so month-range
+# reports prune to the months they ask for and old months can be detached without a DELETE.
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITIONED_TABLES = {"daily_tracker_table": "date", "daily_activity": "activity_date"}
 
+def _month_start(day):
+    return day.replace(day=1)
 
-@app.route("/api/refresh", methods=["POST"])
-def refresh_token_route():
-    """Accepts a refresh token (in JSON body or Authorization header) and returns a new access token."""
-    initialize_rds()
-    token = None
-    auth = request.headers.get("Authorization", "")
-    if auth and auth.startswith("Bearer "):
-        token = auth.split(" ", 1)[1].strip()
-    else:
-        data = request.json or {}
-        token = data.get("refresh_token")
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
 
-    if not token:
-        return jsonify({"status": "error", "message": "Refresh token required"}), 401
+def _partition_name(table: str, month) -> str:
+    return f"{table}_p{month:%Y%m}"
 
-    try:
-        decoded = decode_token(token)
-        identity = decoded.get("sub") or decoded.get("identity")
-        if not identity:
-            return jsonify({"status": "error", "message": "Invalid refresh token"}), 401
+def is_partitioned(table: str) -> bool:
+    if db.engine.dialect.name != "postgresql":
+        return False
+    return db.session.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"), {"t": table}
+    ).first() is not None
+
+def _partitions(table: str) -> list:
+    return [
+        name for (name,) in db.session.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+        ), {"t": table})
+    ]
 
-        user = User.query.filter_by(email=identity).first()
-        if not user:
-            return jsonify({"status": "error", "message": "User not found"}), 401
+def create_month_partition(table: str, column: str, month) -> bool:
+    """
+    Add the partition for `month`. Rows for that month already sitting in the DEFAULT
+    partition are moved into it before it is attached. Returns False if it already existed.
+    """
+    name = _partition_name(table, month)
+    if name in _partitions(table):
+        return False
+    lo, hi = _month_start(month), _next_month(month)
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    db.session.execute(text(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {column} >= :lo AND {column} < :hi RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), {"lo": lo, "hi": hi})
+    db.session.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+    ))
+    return True
+
+def ensure_partitions(months_ahead: int = PARTITION_MONTHS_AHEAD) -> list:
+    """
+    Make sure every partitioned table has partitions from its oldest row's month through
+    `months_ahead` months past today. Commits; returns the partitions created.
+    """
+    created = []
+    for table, column in PARTITIONED_TABLES.items():
+        if not is_partitioned(table):
+            continue
+        first = db.session.execute(text(f"SELECT min({column}) FROM {table}")).scalar()
+        month = _month_start(datetime.now(timezone.utc).date())
+        if first is not None:
+            month = min(month, _month_start(first if not isinstance(first, datetime) else first.date()))
+        last = _month_start(datetime.now(timezone.utc).date())
+        for _ in range(months_ahead):
+            last = _next_month(last)
+        while month <= last:
+            if create_month_partition(table, column, month):
+                created.append(_partition_name(table, month))
+            month = _next_month(month)
+    db.session.commit()
+    return created
 
-        new_access = create_access_token(identity=identity, additional_claims={"role": user.role, "id": user.id})
-        return jsonify({"status": "success", "access_token": new_access}), 200
+def detach_partitions_before(month) -> list:
+    """
+    Detach (not drop) monthly partitions older than `month`. The detached tables keep
+    their rows and can be archived or dropped separately. Commits; returns their names.
+    """
+    cutoff = _partition_name("", _month_start(month))
+    detached = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            continue
+        for name in _partitions(table):
+            suffix = name[len(table):]
+            if suffix.startswith("_p") and suffix < cutoff:
+                db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                detached.append(name)
+    db.session.commit()
+    return detached
 
-    except Exception as e:
-        logger.warning(f"Refresh token decode failed: {e}")
-        return jsonify({"status": "error", "message": "Invalid refresh token"}), 401
+def partition_by_month(table, column: str, key_constraint: str):
+    """
+    Rebuild an existing plain table as a monthly range-partitioned one, copying its rows.
+    Runs inside the calling migration's transaction.
+    """
+    name = table.name
+    if is_partitioned(name):
+        return
+    old = f"{name}_unpartitioned"
+    # Secondary indexes, including ones only create_tables.sql knows about; unique ones
+    # would need the partition key, and the key constraint is added separately below
+    index_defs = [
+        d for (d,) in db.session.execute(
+            text("SELECT indexdef FROM pg_indexes WHERE tablename = :t AND indexdef NOT LIKE 'CREATE UNIQUE%'"),
+            {"t": name},
+        )
+    ]
+    db.session.execute(text(f"ALTER TABLE {name} RENAME TO {old}"))
+    db.session.execute(text(f"CREATE TABLE {name} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"))
+    db.session.execute(text(f"CREATE TABLE {name}_default PARTITION OF {name} DEFAULT"))
+    lo, hi = db.session.execute(text(f"SELECT min({column}), max({column}) FROM {old}")).one()
+    today = datetime.now(timezone.utc).date()
+    month = _month_start(lo.date() if isinstance(lo, datetime) else lo) if lo else _month_start(today)
+    last = max(_month_start(hi.date() if isinstance(hi, datetime) else hi) if hi else month, _month_start(today))
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        create_month_partition(name, column, month)
+        month = _next_month(month)
+    db.session.execute(text(f"INSERT INTO {name} SELECT * FROM {old}"))
+    # Dropping the old table frees its constraint and index names for the parent
+    db.session.execute(text(f"DROP TABLE {old}"))
+    db.session.execute(text(f"ALTER TABLE {name} ADD {key_constraint}"))
+    for index_def in index_defs:
+        db.session.execute(text(index_def.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1)))
+    for index in table.indexes:
+        index.create(bind=db.session.connection(), checkfirst=True)
+
+@app.cli.command("partitions")
+@click.option("--ahead", default=PARTITION_MONTHS_AHEAD, show_default=True, help="Months to pre-create past today.")
+@click.option("--detach-before", default=None, help="Detach monthly partitions older than this month (YYYY-MM).")
+def partitions_command(ahead, detach_before):
+    """Create upcoming monthly partitions and optionally detach old ones."""
+    for name in ensure_partitions(ahead):
+        click.echo(f"created {name}")
+    if detach_before:
+        month = datetime.strptime(detach_before, "%Y-%m").date()
+        for name in detach_partitions_before(month):
+            click.echo(f"detached {name}")
 
 # -----------------------
-# Forgot / Reset Password
+# Query plan check
 # -----------------------
-@app.route("/api/forgot-password", methods=["POST"])
-def forgot_password():
+def _explain_targets():
     """
-    Generates a reset token and stores only its hash with expiry.
-    Always returns a generic message to prevent email enumeration.
+    (name, query) pairs with the same shape each endpoint issues.
     """
-    initialize_rds()
-    data = request.json or {}
-    email = (data.get("email") or "").strip().lower()
+    day = datetime.now(timezone.utc) - timedelta(days=30)
+    return [
+        ("GET /api/performance (User)",
+         performance_query("User", "user1@aidash.com").order_by(DailyTracker.submitted_at.desc()).limit(500)),
+        ("GET /api/performance (Manager)",
+         DailyTracker.query.filter(in_pod_scope(DailyTracker.pod_name, "Manager", "manager1@aidash.com"))
+         .order_by(DailyTracker.submitted_at.desc()).limit(500)),
+        ("GET /api/team-report",
+         db.session.query(DailyTracker.email, func.count(DailyTracker.id), func.sum(DailyTracker.dedicated_hours))
+         .filter(DailyTracker.date >= day.date()).group_by(DailyTracker.email)),
+        ("GET /api/performance/summary (Manager)",
+         db.session.query(DailyTrackerRollup.date, func.sum(DailyTrackerRollup.total_hours))
+         .filter(in_pod_scope(DailyTrackerRollup.pod_name, "Manager", "manager1@aidash.com"))
+         .group_by(DailyTrackerRollup.date)),
+        ("GET /api/daily_activity (Manager)",
+         DailyActivity.query.filter(in_pod_scope(DailyActivity.pod_name, "Manager", "manager1@aidash.com"))
+         .order_by(DailyActivity.activity_date.desc().nullslast(), DailyActivity.id.desc()).limit(51)),
+        ("GET /api/daily_activity (Admin)",
+         DailyActivity.query.order_by(DailyActivity.activity_date.desc().nullslast(), DailyActivity.id.desc()).limit(51)),
+        ("GET /api/users (Manager)",
+         User.query.filter(in_pod_scope(User.pod_name, "Manager", "manager1@aidash.com")).order_by(User.created_at.desc())),
+        ("GET /api/resource (date range)",
+         ResourceTable.query.filter(ResourceTable.date >= day.date()).order_by(ResourceTable.date.desc()).limit(500)),
+    ]
 
-    generic_msg = "If this email exists, a reset link has been sent."
+def explain_plan(query) -> list:
+    """Plan lines for an ORM query on the current dialect."""
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    if compiled.positional:
+        params = tuple(compiled.params[k] for k in compiled.positiontup)
+    else:
+        params = compiled.params
+    conn = db.session.connection()
+    if db.engine.dialect.name == "postgresql":
+        rows = conn.exec_driver_sql(f"EXPLAIN {compiled}", params).fetchall()
+        return [r[0] for r in rows]
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [r[-1] for r in rows]
+
+def is_sequential_scan(line: str) -> bool:
+    line = line.strip()
+    if "Seq Scan" in line:
+        return True
+    # SQLite: "SCAN daily_activity" is a full scan; "SCAN t USING [COVERING] INDEX" is not
+    return line.startswith("SCAN ") and "USING" not in line
 
-    if not email:
-        return jsonify({"status": "success", "message": generic_msg}), 200
+@app.cli.command("explain-queries")
+@click.option("--strict", is_flag=True, help="Exit non-zero when any query plans a sequential scan.")
+def explain_queries_command(strict):
+    """EXPLAIN each endpoint's query and flag sequential scans."""
+    initialize_rds()
+    flagged = 0
+    for name, query in _explain_targets():
+        plan = explain_plan(query)
+        seq = [line for line in plan if is_sequential_scan(line)]
+        flagged += bool(seq)
+        click.echo(f"{'SEQ SCAN' if seq else 'ok      '}  {name}")
+        for line in plan:
+            click.echo(f"            {line}")
+    if flagged:
+        click.echo(f"{flagged} queries plan a sequential scan (tiny tables may do so legitimately; "
+                   "check against production-sized data)")
+    if strict and flagged:
+        raise SystemExit(1)
 
-    user = User.query.filter_by(email=email).first()
-    if not user:
-        return jsonify({"status": "success", "message": generic_msg}), 200
+# -----------------------
+# Daily rollup maintenance
+# -----------------------
+ROLLUP_KEYS = ("email", "date", "pod_name", "product", "project_name")
+# Row columns rollup_apply adds up
+ROLLUP_MEASURES = ("dedicated_hours", "line_miles", "polygon_feature_count", "polyline_feature_count", "point_feature_count")
 
-    raw_token = secrets.token_urlsafe(32)
-    token_hash = sha256_hex(raw_token)
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=RESET_TOKEN_MINUTES)
+def _to_decimal(val) -> Decimal:
+    if val is None or val == "":
+        return Decimal(0)
+    try:
+        return Decimal(str(val))
+    except (InvalidOperation, ValueError):
+        return Decimal(0)
 
-    # Invalidate previous unused tokens (optional)
-    PasswordResetToken.query.filter_by(user_id=user.id, used_at=None).update(
-        {"used_at": datetime.now(timezone.utc)}
-    )
-    db.session.commit()
+def _upsert_insert():
+    """
+    Dialect-specific INSERT supporting on_conflict_do_update (Postgres / SQLite).
+    """
+    if db.engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
 
-    prt = PasswordResetToken(
-        id=str(uuid.uuid4()),
-        user_id=user.id,
-        token_hash=token_hash,
-        expires_at=expires_at,
+def rollup_apply(rows, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) the contribution of tracker rows to
+    daily_tracker_rollup. Runs on db.session so it commits with the caller's write.
+    `rows` may be DailyTracker objects or dicts with the same column names.
+    """
+    deltas = {}
+    for r in rows:
+        get = r.get if isinstance(r, dict) else (lambda k, r=r: getattr(r, k, None))
+        key = tuple(get(k) if k == "date" else str(get(k) or "") for k in ROLLUP_KEYS)
+        acc = deltas.setdefault(key, [Decimal(0), Decimal(0), Decimal(0), 0])
+        acc[0] += sign * _to_decimal(get("dedicated_hours"))
+        acc[1] += sign * _to_decimal(get("line_miles"))
+        acc[2] += sign * (
+            _to_decimal(get("polygon_feature_count"))
+            + _to_decimal(get("polyline_feature_count"))
+            + _to_decimal(get("point_feature_count"))
+        )
+        acc[3] += sign
+    if not deltas:
+        return
+
+    values = [
+        dict(zip(ROLLUP_KEYS, key), total_hours=h, line_miles=lm, feature_count=fc, entries=n)
+        for key, (h, lm, fc, n) in deltas.items()
+    ]
+    table = DailyTrackerRollup.__table__
+    stmt = _upsert_insert()(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEYS),
+        set_={
+            "total_hours": table.c.total_hours + stmt.excluded.total_hours,
+            "line_miles": table.c.line_miles + stmt.excluded.line_miles,
+            "feature_count": table.c.feature_count + stmt.excluded.feature_count,
+            "entries": table.c.entries + stmt.excluded.entries,
+        },
     )
-    db.session.add(prt)
-    db.session.commit()
+    db.session.execute(stmt)
 
-    # In production: send email. For dev: log token.
-    logger.info(f"[DEV] Password reset token for {email}: {raw_token} (expires {expires_at.isoformat()})")
+    if sign < 0:
+        db.session.execute(
+            table.delete()
+            .where(tuple_(*[table.c[k] for k in ROLLUP_KEYS]).in_(list(deltas.keys())))
+            .where(table.c.entries <= 0)
+        )
 
-    return jsonify({"status": "success", "message": generic_msg}), 200
+def _rollup_source(model, day):
+    """(rollup keys..., hours, line_miles, features) per row of `model`; `day` is its work-date expression."""
+    return db.select(
+        model.email.label("email"),
+        day.label("date"),
+        func.coalesce(model.pod_name, "").label("pod_name"),
+        func.coalesce(model.product, "").label("product"),
+        func.coalesce(model.project_name, "").label("project_name"),
+        model.dedicated_hours.label("hours"),
+        model.line_miles.label("line_miles"),
+        (
+            func.coalesce(model.polygon_feature_count, 0)
+            + func.coalesce(model.polyline_feature_count, 0)
+            + func.coalesce(model.point_feature_count, 0)
+        ).label("features"),
+    )
 
-@app.route("/api/reset-password", methods=["POST"])
-def reset_password():
+def rebuild_rollup(commit: bool = True, include_archived: bool = True) -> int:
     """
-    Resets password using token. Checks: exists, not used, not expired.
+    Recompute daily_tracker_rollup from the full tracker history: daily_tracker_table
+    plus the rows archive_tracker moved to daily_activity.
     """
+    table = DailyTrackerRollup.__table__
+    source = _rollup_source(DailyTracker, DailyTracker.date)
+    if include_archived:
+        source = source.union_all(
+            _rollup_source(DailyActivity, sql_day(DailyActivity.activity_date))
+            .where(DailyActivity.archived_at.isnot(None))
+        )
+    s = source.subquery()
+    keys = [s.c.email, s.c.date, s.c.pod_name, s.c.product, s.c.project_name]
+    select_stmt = db.select(
+        *keys,
+        func.coalesce(func.sum(s.c.hours), 0),
+        func.coalesce(func.sum(s.c.line_miles), 0),
+        func.coalesce(func.sum(s.c.features), 0),
+        func.count(),
+    ).group_by(*keys)
+
+    db.session.execute(table.delete())
+    db.session.execute(
+        table.insert().from_select(
+            list(ROLLUP_KEYS) + ["total_hours", "line_miles", "feature_count", "entries"],
+            select_stmt,
+        )
+    )
+    if commit:
+        db.session.commit()
+    return db.session.query(func.count()).select_from(table).scalar()
+
+@app.cli.command("rebuild-rollup")
+def rebuild_rollup_command():
+    """Backfill daily_tracker_rollup from daily_tracker_table and archived rows."""
     initialize_rds()
-    data = request.json or {}
-    token = (data.get("token") or "").strip()
-    new_password = (data.get("new_password") or "").strip()
+    started = datetime.now(timezone.utc)
+    count = rebuild_rollup()
+    report_cache.clear()
+    elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+    click.echo(f"Rebuilt daily_tracker_rollup: {count} rows in {elapsed:.2f}s")
 
-    if not token or not new_password:
-        return jsonify({"status": "error", "message": "token and new_password required"}), 400
+# -----------------------
+# Bulk import into daily_activity
+# -----------------------
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", "5000"))
 
-    if len(new_password) < 8:
-        return jsonify({"status": "error", "message": "Password must be at least 8 characters"}), 400
+def _activity_columns():
+    return [c for c in DailyActivity.__table__.columns]
 
-    token_hash = sha256_hex(token)
-    now = datetime.now(timezone.utc)
+def _normalize_key(key: str) -> str:
+    # "dedicatedHoursH1V1", "dedicated_hours_h1v1" and "Dedicated Hours H1V1" all match
+    return "".join(ch for ch in (key or "").lower() if ch.isalnum())
 
-    prt = PasswordResetToken.query.filter_by(token_hash=token_hash).first()
-    if not prt or prt.used_at is not None or prt.expires_at < now:
-        return jsonify({"status": "error", "message": "Invalid or expired token"}), 400
+def _coerce_activity_record(rec: dict, columns, lookup):
+    """
+    Map one input record (snake_case or camelCase keys) onto daily_activity
+    columns, coercing values the same way submit_tracker does.
+    Raises ValueError if the record cannot be stored.
+    """
+    row = {c.name: None for c in columns}
+    for key, val in rec.items():
+        col = lookup.get(_normalize_key(key))
+        if col is None:
+            continue
+        if isinstance(col.type, db.Numeric):
+            row[col.name] = to_numeric(val)
+        elif isinstance(col.type, db.DateTime):
+            value = to_text(val)
+            parsed = _parse_date(value) if value else None
+            if value and parsed is None:
+                raise ValueError(f"invalid {col.name} '{value}'")
+            row[col.name] = parsed
+        else:
+            row[col.name] = to_text(val)
+    if not row["email"]:
+        raise ValueError("email is required")
+    if not row["id"]:
+        row["id"] = str(uuid.uuid4())
+    return row
+
+def _iter_import_records(stream, fmt: str):
+    """
+    Yields (line_no, record_or_exception) without reading the whole stream.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for rec in reader:
+            yield reader.line_num, rec
+        return
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+            if not isinstance(rec, dict):
+                raise ValueError("expected a JSON object")
+            yield line_no, rec
+        except ValueError as e:
+            yield line_no, e
+
+def _write_activity_chunk(rows, columns):
+    """
+    COPY on Postgres (psycopg2), batched executemany INSERT elsewhere.
+    """
+    if db.engine.dialect.name == "postgresql" and db.engine.dialect.driver == "psycopg2":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for r in rows:
+            writer.writerow(
+                [r[c.name].isoformat() if isinstance(r[c.name], datetime) else r[c.name] for c in columns]
+            )
+        buf.seek(0)
+        col_list = ", ".join(c.name for c in columns)
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {DailyActivity.__tablename__} ({col_list}) FROM STDIN WITH (FORMAT csv)", buf)
+        finally:
+            cursor.close()
+    else:
+        db.session.execute(DailyActivity.__table__.insert(), rows)
+
+def import_daily_activity(stream, fmt: str, chunk_size: int = IMPORT_CHUNK_SIZE, max_errors: int = 20):
+    """
+    Stream CSV or NDJSON records into daily_activity in chunks of `chunk_size`,
+    committing per chunk so memory and transaction size stay bounded.
+    Returns a summary dict with counts, elapsed seconds and rows per second.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported format '{fmt}'")
+
+    columns = _activity_columns()
+    lookup = {_normalize_key(c.name): c for c in columns}
+    started = time.perf_counter()
+    imported = 0
+    rejected = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        nonlocal imported
+        _write_activity_chunk(chunk, columns)
+        db.session.commit()
+        imported += len(chunk)
+        chunk.clear()
+        elapsed = time.perf_counter() - started
+        logger.info(f"daily_activity import: {imported} rows ({imported / elapsed if elapsed else 0:.0f} rows/s)")
+
+    try:
+        for line_no, rec in _iter_import_records(stream, fmt):
+            try:
+                if isinstance(rec, Exception):
+                    raise rec
+                chunk.append(_coerce_activity_record(rec, columns, lookup))
+            except ValueError as e:
+                rejected += 1
+                if len(errors) < max_errors:
+                    errors.append({"line": line_no, "error": str(e)})
+                continue
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rowsPerSecond": round(imported / elapsed, 1) if elapsed else None,
+    }
+
+@app.cli.command("import-activity")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["csv", "ndjson"]), default=None,
+              help="Defaults from the file extension (.csv, otherwise ndjson).")
+@click.option("--chunk-size", default=IMPORT_CHUNK_SIZE, show_default=True)
+def import_activity_command(path, fmt, chunk_size):
+    """Stream a CSV/NDJSON file into daily_activity."""
+    initialize_rds()
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        summary = import_daily_activity(f, fmt, chunk_size=chunk_size)
+    reset_filter_values()
+    for err in summary["errors"]:
+        click.echo(f"line {err['line']}: {err['error']}", err=True)
+    click.echo(
+        f"Imported {summary['imported']} rows ({summary['rejected']} rejected) "
+        f"in {summary['seconds']}s, {summary['rowsPerSecond']} rows/s"
+    )
+
+# -----------------------
+# Archival: daily_tracker_table -> daily_activity
+# -----------------------
+# DailyTracker is current data, DailyActivity the old-data store. archive_tracker moves rows
+# older than ARCHIVE_AFTER_DAYS across in (date, id) order, one short transaction per batch
+# (insert, delete, checkpoint), so the tracker table stays small. Rows keep every column
+# (archived_at set), and daily_tracker_rollup keeps their totals, so aggregates don't change.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+ARCHIVE_JOB = "daily_tracker"
+
+def _archive_row(entry: DailyTracker, names: dict, archived_at) -> dict:
+    """One daily_activity row for a tracker entry: every tracker column, plus mappings."""
+    row = {c.name: None for c in _activity_columns()}
+    for col in row:
+        if col in DailyTracker.__table__.columns:
+            row[col] = getattr(entry, col)
+    for col in ("line_miles_h1v1", "line_miles_h1v0", "benchmark_for_task"):  # TEXT in daily_activity
+        row[col] = to_text(row[col])
+    row["name"] = names.get(entry.email)
+    row["activity_date"] = datetime(entry.date.year, entry.date.month, entry.date.day)
+    row["created_at"] = entry.submitted_at.isoformat() if entry.submitted_at else None
+    row["archived_at"] = archived_at
+    return row
+
+def tracker_row_view(entry) -> dict:
+    """
+    Snapshot of the columns rollup_apply and touched_buckets read, for a live
+    DailyTracker row or an archived one in daily_activity (work date from activity_date).
+    """
+    row = {k: getattr(entry, k, None) for k in ROLLUP_KEYS + ROLLUP_MEASURES + ("submitted_at",)}
+    if isinstance(entry, DailyActivity):
+        row["date"] = entry.activity_date.date() if entry.activity_date else None
+    return row
+
+def archived_tracker_export(query, exclude=("metadata_json",)):
+    """
+    `query` over archived daily_activity rows, selecting DailyTracker's columns (minus
+    `exclude`) in table order, as stream_export expects for its `then` queries.
+    """
+    a = DailyActivity
+    mapped = {
+        "date": sql_day(a.activity_date),
+        "submitted_at": a.created_at,  # the ISO timestamp _archive_row stored
+        **{c: db.cast(getattr(a, c), db.Numeric(10, 2)) for c in ("line_miles_h1v1", "line_miles_h1v0", "benchmark_for_task")},
+    }
+    return query.with_entities(*(
+        mapped[c.name].label(c.name) if c.name in mapped else getattr(a, c.name)
+        for c in DailyTracker.__table__.columns if c.name not in exclude
+    ))
+
+def archive_status(older_than_days: int = ARCHIVE_AFTER_DAYS) -> dict:
+    """Backlog still waiting to be archived and how far behind the cutoff its oldest row is."""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=older_than_days)
+    backlog, oldest = db.session.query(func.count(DailyTracker.id), func.min(DailyTracker.date)).filter(
+        DailyTracker.date < cutoff
+    ).one()
+    ckpt = db.session.get(ArchiveCheckpoint, ARCHIVE_JOB)
+    return {
+        "cutoff": cutoff.isoformat(),
+        "backlog": backlog,
+        "oldestPending": oldest.isoformat() if oldest else None,
+        "lagDays": (cutoff - oldest).days if oldest else 0,
+        "checkpoint": {
+            "lastDate": ckpt.last_date.isoformat() if ckpt.last_date else None,
+            "lastId": ckpt.last_id,
+            "rowsMoved": ckpt.rows_moved,
+            "startedAt": ckpt.started_at.isoformat() if ckpt.started_at else None,
+            "updatedAt": ckpt.updated_at.isoformat() if ckpt.updated_at else None,
+        } if ckpt else None,
+    }
+
+def archive_tracker(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: int = None,
+    pause: float = 0.0,
+) -> dict:
+    """
+    Move DailyTracker rows dated before today - `older_than_days` into daily_activity.
+    Each batch commits on its own; a crash loses at most the batch in flight, and the
+    next run resumes from the checkpoint. Returns a summary with throughput and lag.
+    """
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=older_than_days)
+    columns = _activity_columns()
+    names = dict(db.session.query(User.email, User.name))
+    started = time.perf_counter()
+    moved = 0
+    batches = 0
+    done = False
+
+    while max_batches is None or batches < max_batches:
+        ckpt = db.session.get(ArchiveCheckpoint, ARCHIVE_JOB)
+        if ckpt is None:
+            ckpt = ArchiveCheckpoint(job=ARCHIVE_JOB, rows_moved=0)
+            db.session.add(ckpt)
+
+        q = DailyTracker.query.filter(DailyTracker.date < cutoff)
+        if ckpt.last_date is not None:
+            q = q.filter(tuple_(DailyTracker.date, DailyTracker.id) > (ckpt.last_date, ckpt.last_id))
+        entries = q.order_by(DailyTracker.date, DailyTracker.id).limit(batch_size).all()
+        if not entries:
+            # Pass complete; the next run starts from the beginning again (picks up backdated rows)
+            db.session.delete(ckpt)
+            db.session.commit()
+            done = True
+            break
+
+        try:
+            now = datetime.now(timezone.utc)
+            _write_activity_chunk([_archive_row(e, names, now) for e in entries], columns)
+            buckets = touched_buckets(entries)
+            db.session.execute(
+                DailyTracker.__table__.delete().where(
+                    DailyTracker.id.in_([e.id for e in entries]),
+                    DailyTracker.date.between(entries[0].date, entries[-1].date),  # prunes partitions
+                )
+            )
+            last_date = entries[-1].date
+            ckpt.last_date, ckpt.last_id = last_date, entries[-1].id
+            ckpt.rows_moved = (ckpt.rows_moved or 0) + len(entries)
+            ckpt.updated_at = datetime.now(timezone.utc)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        db.session.expunge_all()
+
+        invalidate_reports("tracker", buckets)
+        moved += len(entries)
+        batches += 1
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"tracker archive: {moved} rows in {batches} batches, up to {last_date} "
+            f"({moved / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - started
+    status = archive_status(older_than_days)
+    return {
+        "moved": moved,
+        "batches": batches,
+        "complete": done,
+        "seconds": round(elapsed, 3),
+        "rowsPerSecond": round(moved / elapsed, 1) if elapsed else None,
+        "backlog": status["backlog"],
+        "lagDays": status["lagDays"],
+        "cutoff": status["cutoff"],
+    }
+
+@app.cli.command("archive-tracker")
+@click.option("--older-than-days", default=ARCHIVE_AFTER_DAYS, show_default=True)
+@click.option("--batch-size", default=ARCHIVE_BATCH_SIZE, show_default=True)
+@click.option("--max-batches", default=None, type=int, help="Stop after this many batches (resume later).")
+@click.option("--pause", default=0.0, show_default=True, help="Seconds to sleep between batches.")
+def archive_tracker_command(older_than_days, batch_size, max_batches, pause):
+    """Move old daily_tracker_table rows into daily_activity."""
+    initialize_rds()
+    summary = archive_tracker(older_than_days, max(1, batch_size), max_batches, pause)
+    click.echo(
+        f"Archived {summary['moved']} rows in {summary['batches']} batches "
+        f"in {summary['seconds']}s, {summary['rowsPerSecond']} rows/s; "
+        f"{summary['backlog']} rows older than {summary['cutoff']} remain (lag {summary['lagDays']} days)"
+    )
+
+# -----------------------
+# Streaming export
+# -----------------------
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def _export_value(val, fmt: str):
+    if hasattr(val, "isoformat"):  # date / datetime
+        return val.isoformat()
+    if isinstance(val, Decimal):
+        return float(val) if fmt == "ndjson" else str(val)
+    return val
+
+def stream_export(query, table, fmt: str, filename: str, exclude=("metadata_json",), then=()):
+    """
+    Stream every row of `query` as CSV or NDJSON using the table's column names
+    (the same names import-activity accepts). Rows are fetched with yield_per,
+    i.e. a server-side cursor on Postgres, so memory stays flat as row count grows.
+    `then` holds further queries streamed afterwards, already selecting those columns in order.
+    """
+    columns = [c for c in table.columns if c.name not in exclude]
+    names = [c.name for c in columns]
+    queries = [query.with_entities(*columns), *then]
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf) if fmt == "csv" else None
+        if writer:
+            writer.writerow(names)
+        pending = 0
+        rows = (row for q in queries for row in q.yield_per(EXPORT_BATCH_SIZE))
+        for row in rows:
+            values = [_export_value(v, fmt) for v in row]
+            if writer:
+                writer.writerow(values)
+            else:
+                buf.write(json.dumps(dict(zip(names, values)), separators=(",", ":")))
+                buf.write("\n")
+            pending += 1
+            if pending >= EXPORT_BATCH_SIZE:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+                pending = 0
+        if buf.tell():
+            yield buf.getvalue()
+
+    resp = Response(stream_with_context(generate()), mimetype=EXPORT_MIMETYPES[fmt])
+    resp.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return resp
+
+def parse_export_format(args):
+    fmt = (args.get("format") or "csv").lower()
+    if fmt not in EXPORT_MIMETYPES:
+        raise ValueError(f"Unsupported format '{fmt}'")
+    return fmt
+
+# -----------------------
+# metadata.json cache (+ ETags)
+# -----------------------
+METADATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "metadata.json")
+
+_metadata_lock = threading.Lock()
+# (mtime_ns, parsed metadata, {variant: (body, etag)}) - replaced as a whole on reload
+_metadata_state = (None, None, {})
+
+def _current_metadata_state():
+    global _metadata_state
+    mtime = os.stat(METADATA_PATH).st_mtime_ns
+    state = _metadata_state
+    if state[0] == mtime:
+        return state
+    with _metadata_lock:
+        if _metadata_state[0] != mtime:
+            with open(METADATA_PATH, "r", encoding="utf-8") as f:
+                _metadata_state = (mtime, json.load(f), {})
+        return _metadata_state
+
+def load_metadata() -> dict:
+    """
+    Parsed metadata.json, re-read only when the file's mtime changes.
+    """
+    return _current_metadata_state()[1]
+
+def metadata_json_response(variant, build_payload):
+    """
+    JSON response derived from metadata.json, serialized once per (file version, variant)
+    and served with a strong ETag; a matching If-None-Match gets a bodiless 304.
+    `variant` must capture everything besides the metadata that shapes the payload.
+    """
+    _, meta, responses = _current_metadata_state()
+    entry = responses.get(variant)
+    if entry is None:
+        body = app.json.dumps(build_payload(meta))
+        entry = (body, hashlib.sha256(body.encode("utf-8")).hexdigest())
+        responses[variant] = entry
+
+    body, etag = entry
+    resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request)
+
+# -----------------------
+# Data-driven filter values
+# -----------------------
+FILTER_VALUES_TTL = int(os.environ.get("FILTER_VALUES_TTL", "600"))
+
+# response key -> column name, in the order of the covering index
+FILTER_FIELDS = (
+    ("podNames", "pod_name"),
+    ("products", "product"),
+    ("projectNames", "project_name"),
+    ("natureOfWork", "nature_of_work"),
+    ("tasks", "task"),
+)
+
+_filter_values_lock = threading.Lock()
+# scope (see filter_scope) -> {"loaded_at": float, "values": {key: set}}
+_filter_values_cache = {}
+
+def filter_scope(role: str, identity: str):
+    """
+    Cache/query scope for filter values: None (unrestricted, admins), ("pods", pods)
+    for Managers/Team Leads, or ("email", identity) for everyone else.
+    """
+    if role in ["Admin", "Internal Admin"]:
+        return None
+    if role in SCOPED_ROLES:
+        return ("pods", tuple(allowed_pods(role, identity)))
+    return ("email", identity)
+
+def _in_filter_scope(scope, pod, email) -> bool:
+    if scope is None:
+        return True
+    kind, value = scope
+    return pod in value if kind == "pods" else email == value
+
+def _load_filter_values(scope) -> dict:
+    values = {key: set() for key, _ in FILTER_FIELDS}
+    for model in (DailyActivity, DailyTracker):
+        cols = [getattr(model, col) for _, col in FILTER_FIELDS]
+        q = db.session.query(*cols).distinct()
+        if scope is not None:
+            kind, value = scope
+            q = q.filter(model.pod_name.in_(value) if kind == "pods" else model.email == value)
+        for row in q:
+            for (key, _), val in zip(FILTER_FIELDS, row):
+                if val:
+                    values[key].add(val)
+    return values
+
+def filter_values_for(scope) -> dict:
+    """
+    Distinct filter values actually present in DailyActivity/DailyTracker for a pod scope.
+    Served from a per-scope cache that submits top up incrementally; a full reload
+    (which also drops values that no longer occur) happens every FILTER_VALUES_TTL seconds.
+    """
+    now = time.monotonic()
+    entry = _filter_values_cache.get(scope)
+    if entry is None or now - entry["loaded_at"] > FILTER_VALUES_TTL:
+        entry = {"loaded_at": now, "values": _load_filter_values(scope)}
+        with _filter_values_lock:
+            _filter_values_cache[scope] = entry
+    with _filter_values_lock:
+        return {key: sorted(vals) for key, vals in entry["values"].items()}
+
+def note_filter_values(rows):
+    """
+    Add values from freshly written rows (dicts or models) to every cached scope that can see them.
+    """
+    if not _filter_values_cache:
+        return
+    with _filter_values_lock:
+        for r in rows:
+            get = r.get if isinstance(r, dict) else (lambda k, r=r: getattr(r, k, None))
+            pod, email = get("pod_name"), get("email")
+            for scope, entry in _filter_values_cache.items():
+                if not _in_filter_scope(scope, pod, email):
+                    continue
+                for key, col in FILTER_FIELDS:
+                    val = get(col)
+                    if val:
+                        entry["values"][key].add(val)
+
+def reset_filter_values():
+    with _filter_values_lock:
+        _filter_values_cache.clear()
+
+# -----------------------
+# Report response cache
+# -----------------------
+REPORT_CACHE_TTL = int(os.environ.get("REPORT_CACHE_TTL", "300"))
+REPORT_CACHE_SIZE = int(os.environ.get("REPORT_CACHE_SIZE", "256"))
+REPORT_CACHE_URL = os.environ.get("REPORT_CACHE_URL")  # e.g. redis://localhost:6379/0 to share across workers
+
+class LRUCache:
+    """
+    In-process LRU with a per-entry TTL. Each entry carries a `meta` dict that
+    invalidate() predicates inspect, so writes can drop exactly the entries they affect.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value, meta)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, meta=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value, meta or {})
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate(self, predicate) -> int:
+        with self._lock:
+            doomed = [k for k, (_, _, meta) in self._data.items() if predicate(meta)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class RedisCache:
+    """
+    Shared cache so every worker sees the same hits and invalidations. Values and
+    meta are stored together as JSON; a key set is kept for predicate invalidation.
+    """
+    def __init__(self, url: str, ttl: float, prefix: str = "ivms:report:"):
+        import redis  # optional dependency, only needed when REPORT_CACHE_URL is set
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self.index_key = prefix + "keys"
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw)["value"] if raw else None
+
+    def set(self, key, value, meta=None):
+        pipe = self.client.pipeline()
+        pipe.setex(self.prefix + key, self.ttl, json.dumps({"value": value, "meta": meta or {}}))
+        pipe.sadd(self.index_key, key)
+        pipe.execute()
+
+    def delete(self, key):
+        pipe = self.client.pipeline()
+        pipe.delete(self.prefix + key)
+        pipe.srem(self.index_key, key)
+        pipe.execute()
+
+    def invalidate(self, predicate) -> int:
+        keys = [k.decode() if isinstance(k, bytes) else k for k in self.client.smembers(self.index_key)]
+        if not keys:
+            return 0
+        raws = self.client.mget([self.prefix + k for k in keys])
+        doomed, expired = [], []
+        for k, raw in zip(keys, raws):
+            if raw is None:
+                expired.append(k)
+            elif predicate(json.loads(raw)["meta"]):
+                doomed.append(k)
+        pipe = self.client.pipeline()
+        if doomed:
+            pipe.delete(*[self.prefix + k for k in doomed])
+        if doomed or expired:
+            pipe.srem(self.index_key, *(doomed + expired))
+        pipe.execute()
+        return len(doomed)
+
+    def clear(self):
+        self.invalidate(lambda meta: True)
+
+def _make_report_cache():
+    if REPORT_CACHE_URL:
+        try:
+            return RedisCache(REPORT_CACHE_URL, REPORT_CACHE_TTL)
+        except ImportError:
+            logger.warning("REPORT_CACHE_URL is set but the redis package is not installed; using in-process cache")
+    return LRUCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL)
+
+report_cache = _make_report_cache()
+
+def report_cache_key(endpoint: str, scope: dict, filters: dict) -> str:
+    raw = json.dumps([endpoint, scope, filters], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def report_cache_meta(tables, pods=None, emails=None, start=None, end=None, date_basis="date") -> dict:
+    """
+    What an entry depends on. pods/emails None means "any"; start/end are ISO days
+    (None = open-ended) on `date_basis` ("date" = row date, "submitted" = submitted_at day).
+    """
+    return {
+        "tables": list(tables),
+        "pods": sorted(pods) if pods is not None else None,
+        "emails": sorted(emails) if emails is not None else None,
+        "start": start,
+        "end": end,
+        "date_basis": date_basis,
+    }
+
+def cached_report(key: str, meta: dict, build):
+    """
+    Returns (payload, hit). `build` runs on a miss and its payload is stored under `key`.
+    """
+    try:
+        payload = report_cache.get(key)
+    except Exception as e:
+        logger.warning(f"report cache get failed: {e}")
+        payload = None
+    if payload is not None:
+        return payload, True
+    payload = build()
+    try:
+        report_cache.set(key, payload, meta)
+    except Exception as e:
+        logger.warning(f"report cache set failed: {e}")
+    return payload, False
+
+def _day(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value)[:10]
+
+def touched_buckets(rows):
+    """
+    (pod, email, {date_basis: day}) for each written row (dict or model).
+    """
+    out = []
+    for r in rows:
+        get = r.get if isinstance(r, dict) else (lambda k, r=r: getattr(r, k, None))
+        out.append((
+            get("pod_name"),
+            get("email"),
+            {"date": _day(get("date")), "submitted": _day(get("submitted_at"))},
+        ))
+    return out
+
+def invalidate_reports(table: str, buckets) -> int:
+    """
+    Drop cached reports over `table` whose pod/email scope and date range
+    include any of the touched (pod, email, days) buckets.
+    """
+    buckets = list(buckets)
+    if not buckets:
+        return 0
+    bump_generation(table)
+
+    def affected(meta):
+        if table not in meta.get("tables", ()):
+            return False
+        for pod, email, days in buckets:
+            if meta.get("pods") is not None and pod not in meta["pods"]:
+                continue
+            if meta.get("emails") is not None and email not in meta["emails"]:
+                continue
+            day = days.get(meta.get("date_basis", "date"))
+            if day is not None:
+                if meta.get("start") and day < meta["start"]:
+                    continue
+                if meta.get("end") and day > meta["end"]:
+                    continue
+            return True
+        return False
+
+    try:
+        return report_cache.invalidate(affected)
+    except Exception as e:
+        logger.warning(f"report cache invalidation failed: {e}")
+        return 0
+
+# -----------------------
+# Conditional GET (table watermarks)
+# -----------------------
+def bump_generation(*names):
+    """
+    Advance the write generation of each table in `names`. Call after the write
+    commits, so a validator computed against the new generation never sees old rows.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        for name in names:
+            stmt = _upsert_insert()(WriteGeneration).values(name=name, generation=1, updated_at=now)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[WriteGeneration.name],
+                set_={"generation": WriteGeneration.generation + 1, "updated_at": now},
+            ))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"write generation bump failed for {names}: {e}")
+
+def _generation(name: str, col):
+    return db.select(col).where(WriteGeneration.name == name).scalar_subquery()
+
+def _utc(ts):
+    return ts.replace(tzinfo=timezone.utc) if ts is not None and ts.tzinfo is None else ts
+
+def watermark(query, ts_col, scope, table: str):
+    """
+    Cheap validator for a list endpoint: MAX(ts_col) and COUNT(*) over the caller's
+    filtered scope plus the write generations of `table` and pod_assignments, all in
+    one round trip. Returns (etag, last_modified). Inserts and deletes move the first
+    two; in-place edits and scope changes move a generation (and Last-Modified with it).
+    """
+    latest, count, gen, gen_at, scope_gen, scope_gen_at = query.with_entities(
+        func.max(ts_col), func.count(),
+        _generation(table, WriteGeneration.generation), _generation(table, WriteGeneration.updated_at),
+        _generation("pod_assignments", WriteGeneration.generation),
+        _generation("pod_assignments", WriteGeneration.updated_at),
+    ).order_by(None).one()
+    latest = _utc(latest)
+    raw = json.dumps([scope, latest.isoformat() if latest else None, count, gen, scope_gen], sort_keys=True, default=str)
+    etag = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+    stamps = [_utc(ts) for ts in (latest, gen_at, scope_gen_at) if ts is not None]
+    last_modified = max(stamps).replace(microsecond=0) if stamps else None
+    return etag, last_modified
+
+def not_modified(etag: str, last_modified=None):
+    """
+    A 304 response when the request's validators still match, else None.
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = last_modified <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+    return with_validators(make_response("", 304), etag, last_modified)
+
+def with_validators(resp, etag: str, last_modified=None):
+    resp.set_etag(etag)
+    if last_modified is not None:
+        resp.last_modified = last_modified
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+# -----------------------
+# Static routes (React build)
+# -----------------------
+@app.route("/", methods=["GET"])
+def index():
+    resp = make_response(send_from_directory("dist", "index.html"))
+    resp.headers["Cache-Control"] = "no-store, max-age=0"
+    return resp
+
+@app.route("/assets/<path:filename>")
+def assets(filename):
+    return send_from_directory("dist/assets", filename)
+
+# -----------------------
+# User claims cache
+# -----------------------
+# role/id/pod_name by email, so /api/refresh (hit on every 401 retry in utils/api.ts)
+# does not query users_table each time. Per process: writes that change a user drop
+# its entry here, other workers catch up within CLAIMS_CACHE_TTL.
+CLAIMS_CACHE_TTL = int(os.environ.get("CLAIMS_CACHE_TTL", "300"))
+CLAIMS_CACHE_SIZE = int(os.environ.get("CLAIMS_CACHE_SIZE", "4096"))
+claims_cache = LRUCache(CLAIMS_CACHE_SIZE, CLAIMS_CACHE_TTL)
+
+def _claims_of(user) -> dict:
+    return {"role": user.role, "id": user.id, "pod_name": user.pod_name}
+
+def user_claims(email: str):
+    """Cached {"role", "id", "pod_name"} for `email`, or None if there is no such user."""
+    claims = claims_cache.get(email)
+    if claims is None:
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            return None
+        claims = _claims_of(user)
+        claims_cache.set(email, claims)
+    return claims
+
+def forget_user_claims(email: str):
+    if email:
+        claims_cache.delete(email)
+
+# -----------------------
+# Pod scopes (RBAC)
+# -----------------------
+# Managers and Team Leads see the pods assigned to them in pod_assignments. Queries
+# apply the scope as a semi-join on that table (in_pod_scope), so the plan doesn't
+# change with the number of pods; the cached list (allowed_pods) answers "is the scope
+# empty", pod checks and invalidation metadata. Both the list and report cache keys
+# (report_scope) carry the pod_assignments write generation, which every assignment
+# change bumps, so no worker keeps using a scope, or an entry built for one, after it
+# changed. SCOPE_CACHE_TTL only bounds how long superseded lists take up memory.
+SCOPED_ROLES = ("Manager", "Team Lead")
+SCOPE_CACHE_TTL = int(os.environ.get("SCOPE_CACHE_TTL", "60"))
+scope_cache = LRUCache(int(os.environ.get("SCOPE_CACHE_SIZE", "1024")), SCOPE_CACHE_TTL)
+
+def scope_generation() -> int:
+    """pod_assignments write generation, read once per app context."""
+    if "scope_generation" not in g:
+        g.scope_generation = db.session.scalar(
+            db.select(WriteGeneration.generation).where(WriteGeneration.name == "pod_assignments")
+        ) or 0
+    return g.scope_generation
+
+def allowed_pods(role: str, identity: str) -> list:
+    """Sorted pods assigned to `identity` in `role` (empty when none)."""
+    key = (role, user_key_from_email(identity), scope_generation())
+    pods = scope_cache.get(key)
+    if pods is None:
+        pods = sorted(
+            pod for (pod,) in db.session.query(PodAssignment.pod_name).filter(
+                PodAssignment.user_key == key[1], PodAssignment.role == role
+            )
+        )
+        scope_cache.set(key, pods)
+    return pods
+
+def in_pod_scope(col, role: str, identity: str):
+    """`col IN (SELECT pod_name FROM pod_assignments WHERE user_key = :k AND role = :r)`."""
+    return col.in_(
+        db.select(PodAssignment.pod_name).where(
+            PodAssignment.user_key == user_key_from_email(identity), PodAssignment.role == role
+        )
+    )
+
+def report_scope(pods, emails) -> dict:
+    """Scope part of a report cache key; pod scopes are keyed on the assignment generation."""
+    return {"pods": pods, "emails": emails, "scopeGeneration": scope_generation() if pods is not None else None}
+
+# -----------------------
+# Password hashing
+# -----------------------
+# Hashing and verification are deliberately slow KDFs, so they run on a small process
+# pool instead of the request thread (and outside the GIL). HASH_WORKERS is the number of
+# hashing processes per host, shared out across the WEB_CONCURRENCY web workers (at least
+# one each). HASH_QUEUE_LIMIT caps jobs queued or running per web worker; beyond that
+# callers get HashPoolBusy (-> 503).
+# PASSWORD_HASH_METHOD is a werkzeug method string; give full parameters
+# ("scrypt:32768:8:1", "pbkdf2:sha256:1000000") so stored hashes can be compared to it.
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", str(os.cpu_count() or 1)))  # per host; 0 = hash inline
+HASH_POOL_SIZE = max(1, HASH_WORKERS // WEB_WORKERS) if HASH_WORKERS > 0 else 0  # per web worker
+HASH_QUEUE_LIMIT = int(os.environ.get("HASH_QUEUE_LIMIT", "32"))
+HASH_TIMEOUT = float(os.environ.get("HASH_TIMEOUT", "10"))
+
+class HashPoolBusy(Exception):
+    """Too many password hashes queued; the caller should retry later."""
+
+_hash_pool = None
+_hash_lock = threading.Lock()
+_hash_inflight = 0
+hash_stats = {
+    op: {"count": 0, "seconds": 0.0, "max": 0.0, "recent": deque(maxlen=512)}
+    for op in ("hash", "verify")
+}
+hash_stats_rejected = 0
+
+def _get_hash_pool():
+    # Created lazily in each web worker: a pool inherited across gunicorn's fork would be unusable.
+    # "spawn" so children don't fork a copy of a multi-threaded server process.
+    global _hash_pool
+    with _hash_lock:
+        if _hash_pool is None:
+            _hash_pool = ProcessPoolExecutor(max_workers=HASH_POOL_SIZE, mp_context=multiprocessing.get_context("spawn"))
+        return _hash_pool
+
+def _reset_hash_pool():
+    global _hash_pool
+    with _hash_lock:
+        pool, _hash_pool = _hash_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _release_hash_slot(op: str, started: float):
+    global _hash_inflight
+    elapsed = time.perf_counter() - started
+    with _hash_lock:
+        _hash_inflight -= 1
+        stats = hash_stats[op]
+        stats["count"] += 1
+        stats["seconds"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+        stats["recent"].append(elapsed)
+
+def _run_hash(op: str, fn, *args):
+    global _hash_inflight, hash_stats_rejected
+    with _hash_lock:
+        if _hash_inflight >= HASH_QUEUE_LIMIT:
+            hash_stats_rejected += 1
+            raise HashPoolBusy()
+        _hash_inflight += 1
+    started = time.perf_counter()
+    if HASH_POOL_SIZE <= 0:
+        try:
+            return fn(*args)
+        finally:
+            _release_hash_slot(op, started)
+
+    try:
+        future = _get_hash_pool().submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError):
+        # Broken, or shut down by a concurrent reset
+        _release_hash_slot(op, started)
+        _reset_hash_pool()
+        raise HashPoolBusy()
+    # The slot stays taken until the job really ends, even if this caller gives up waiting
+    future.add_done_callback(lambda _: _release_hash_slot(op, started))
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeout:
+        raise HashPoolBusy()
+    except BrokenProcessPool:
+        # A child died (OOM kill, failed start); start a fresh pool on the next call
+        logger.exception("Password hash pool broken; recreating")
+        _reset_hash_pool()
+        raise HashPoolBusy()
+
+def hash_password(password: str) -> str:
+    return _run_hash("hash", generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+def verify_password(pwhash: str, password: str) -> bool:
+    return _run_hash("verify", check_password_hash, pwhash, password)
+
+def needs_rehash(pwhash: str) -> bool:
+    """True when a stored hash was made with other parameters than PASSWORD_HASH_METHOD."""
+    method = (pwhash or "").split("$", 1)[0]
+    if ":" not in PASSWORD_HASH_METHOD:
+        return method.split(":", 1)[0] != PASSWORD_HASH_METHOD
+    return method != PASSWORD_HASH_METHOD
+
+def hash_busy_response():
+    resp = jsonify({"status": "error", "message": "Server busy, please retry"})
+    resp.headers["Retry-After"] = "2"
+    return resp, 503
+
+def hash_stats_snapshot() -> dict:
+    with _hash_lock:
+        out = {"inflight": _hash_inflight, "rejected": hash_stats_rejected, "queueLimit": HASH_QUEUE_LIMIT,
+               "workers": HASH_POOL_SIZE, "hostWorkers": HASH_WORKERS, "method": PASSWORD_HASH_METHOD}
+        for op, stats in hash_stats.items():
+            recent = sorted(stats["recent"])
+
+            def pct(p):
+                return round(recent[min(len(recent) - 1, int(p * len(recent)))] * 1000, 1) if recent else None
+
+            out[op] = {
+                "count": stats["count"],
+                "avgMs": round(stats["seconds"] / stats["count"] * 1000, 1) if stats["count"] else None,
+                "maxMs": round(stats["max"] * 1000, 1),
+                "p50Ms": pct(0.5),
+                "p95Ms": pct(0.95),
+            }
+    return out
+
+# -----------------------
+# Request / SQL metrics (Prometheus text format at /api/metrics)
+# -----------------------
+# Per worker process: under gunicorn each scrape reads whichever worker answers, so scrape
+# workers individually (or sum in Prometheus) and expect counters to reset with workers.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # when set, /api/metrics requires "Bearer <token>"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+class RequestMetrics:
+    """SQL work done on behalf of one request; only its own thread writes to it."""
+    __slots__ = ("started", "statements", "sql_seconds", "rows", "endpoint", "role")
+
+    def __init__(self, endpoint=None, role=None):
+        self.started = time.perf_counter()
+        self.endpoint = endpoint
+        self.role = role  # filled in lazily by the slow-query log
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+
+    def merge(self, other: "RequestMetrics"):
+        self.statements += other.statements
+        self.sql_seconds += other.sql_seconds
+        self.rows += other.rows
+
+_request_metrics = ContextVar("request_metrics", default=None)
+
+class EndpointStats:
+    __slots__ = ("latency", "latency_sum", "sql_counts", "statements", "sql_seconds", "rows", "bytes", "statuses")
+
+    def __init__(self):
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.sql_counts = [0] * (len(SQL_COUNT_BUCKETS) + 1)
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.statuses = {}
+
+_endpoint_stats = {}
+_endpoint_stats_lock = threading.Lock()
+
+def record_request(endpoint: str, method: str, status: int, seconds: float, m: RequestMetrics, size: int):
+    with _endpoint_stats_lock:
+        stats = _endpoint_stats.get((endpoint, method))
+        if stats is None:
+            stats = _endpoint_stats[(endpoint, method)] = EndpointStats()
+        stats.latency[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.latency_sum += seconds
+        stats.sql_counts[bisect.bisect_left(SQL_COUNT_BUCKETS, m.statements)] += 1
+        stats.statements += m.statements
+        stats.sql_seconds += m.sql_seconds
+        stats.rows += m.rows
+        stats.bytes += size
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["sql_started"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_finished(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("sql_started", time.perf_counter())
+    m = _request_metrics.get()
+    if elapsed >= SLOW_QUERY_SECONDS:
+        try:
+            names = getattr(getattr(context, "compiled", None), "positiontup", None)
+            record_slow_query(conn, statement, parameters, executemany, elapsed, m, names)
+        except Exception as e:  # never fail the query over its log entry
+            logger.warning(f"slow query log failed: {e}")
+    if m is None:
+        return
+    m.statements += 1
+    m.sql_seconds += elapsed
+    # Affected rows for DML; SELECT counts only where the driver buffers results (psycopg2, not sqlite3)
+    if cursor.rowcount > 0:
+        m.rows += cursor.rowcount
+
+@app.before_request
+def _start_request_metrics():
+    _request_metrics.set(RequestMetrics(request.url_rule.rule if request.url_rule else "unmatched"))
+
+@app.after_request
+def _finish_request_metrics(response):
+    m = _request_metrics.get()
+    if m is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    method, status = request.method, response.status_code
+
+    if response.is_streamed:
+        # Exports: count bytes as they are sent and record once the body is finished
+        sent = [0]
+        body = response.response
+
+        def counted():
+            for chunk in body:
+                sent[0] += len(chunk)
+                yield chunk
+
+        response.response = counted()
+        size = lambda: sent[0]  # noqa: E731
+    else:
+        length = response.calculate_content_length() or 0
+        size = lambda: length  # noqa: E731
+
+    def done():
+        _request_metrics.set(None)
+        record_request(endpoint, method, status, time.perf_counter() - m.started, m, size())
+
+    response.call_on_close(done)
+    return response
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metrics() -> str:
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def histogram(name, labels, bounds, counts, total):
+        running = 0
+        for bound, n in zip(list(bounds) + ["+Inf"], counts):
+            running += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {running}')
+        lines.append(f"{name}_sum{{{labels}}} {total}")
+        lines.append(f"{name}_count{{{labels}}} {running}")
+
+    with _endpoint_stats_lock:
+        snapshot = {
+            key: (list(s.latency), s.latency_sum, list(s.sql_counts), s.statements, s.sql_seconds, s.rows, s.bytes, dict(s.statuses))
+            for key, s in sorted(_endpoint_stats.items())
+        }
+    labelled = [(f'endpoint="{_label(ep)}",method="{method}"', v) for (ep, method), v in snapshot.items()]
+
+    family("ivms_http_requests_total", "counter", "Requests by endpoint, method and status.")
+    for labels, v in labelled:
+        for status, n in sorted(v[7].items()):
+            lines.append(f'ivms_http_requests_total{{{labels},status="{status}"}} {n}')
+    family("ivms_http_request_duration_seconds", "histogram", "Request latency, including streamed bodies.")
+    for labels, v in labelled:
+        histogram("ivms_http_request_duration_seconds", labels, LATENCY_BUCKETS, v[0], round(v[1], 6))
+    family("ivms_http_request_sql_statements", "histogram", "SQL statements issued per request.")
+    for labels, v in labelled:
+        histogram("ivms_http_request_sql_statements", labels, SQL_COUNT_BUCKETS, v[2], v[3])
+    for name, idx, help_text in (
+        ("ivms_http_sql_seconds_total", 4, "Time spent executing SQL, by endpoint."),
+        ("ivms_http_sql_rows_total", 5, "Rows affected or returned as reported by the DB driver, by endpoint."),
+        ("ivms_http_response_bytes_total", 6, "Response body bytes, by endpoint."),
+    ):
+        family(name, "counter", help_text)
+        for labels, v in labelled:
+            value = round(v[idx], 6) if isinstance(v[idx], float) else v[idx]
+            lines.append(f"{name}{{{labels}}} {value}")
+
+    pool = db.engine.pool
+    for name, value, help_text in (
+        ("ivms_db_pool_size", DB_POOL_SIZE, "Configured pool_size."),
+        ("ivms_db_pool_max_overflow", DB_MAX_OVERFLOW, "Configured max_overflow."),
+        ("ivms_db_pool_checked_out", pool.checkedout(), "Connections currently checked out."),
+        ("ivms_db_pool_checked_in", pool.checkedin(), "Idle connections in the pool."),
+        ("ivms_db_pool_overflow", max(0, pool.overflow()), "Overflow connections currently open."),
+    ):
+        family(name, "gauge", help_text)
+        lines.append(f"{name} {value}")
+    totals = pool_wait_stats.totals()
+    for name, value, help_text in (
+        ("ivms_db_pool_checkouts_total", totals["checkouts"], "Pool checkouts."),
+        ("ivms_db_pool_checkout_wait_seconds_total", round(totals["seconds"], 6), "Time spent waiting for a pooled connection."),
+        ("ivms_db_pool_checkout_timeouts_total", totals["timeouts"], "Checkouts that hit pool_timeout."),
+    ):
+        family(name, "counter", help_text)
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    if METRICS_TOKEN and not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"
+    ):
+        return jsonify({"status": "error", "message": "Unauthorized"}), 401
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+# -----------------------
+# Slow-query log (fingerprints, optional background EXPLAIN on Postgres)
+# -----------------------
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_MS", "500")) / 1000
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "0") == "1"  # runs the SELECT again under EXPLAIN ANALYZE
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL", "600"))  # per fingerprint
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "30000"))
+SLOW_QUERY_MAX_FINGERPRINTS = int(os.environ.get("SLOW_QUERY_MAX_FINGERPRINTS", "500"))
+SLOW_QUERY_RECENT = int(os.environ.get("SLOW_QUERY_RECENT", "200"))
+_SECRET_PARAM = re.compile(r"pass|token|secret|hash", re.I)
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"%\(\w+\)s|%s|\?"), "?"),  # driver bind markers
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # numbers
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),  # IN (...) lists and single VALUES rows
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+)"),  # multi-row VALUES
+    (re.compile(r"\s+"), " "),
+]
+
+def fingerprint_sql(statement: str):
+    """(fingerprint id, normalized SQL) with literals and bind values stripped."""
+    normalized = statement
+    for pattern, repl in _FINGERPRINT_RULES:
+        normalized = pattern.sub(repl, normalized)
+    normalized = normalized.strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized
+
+def _redacted_params(parameters, executemany: bool, names=None):
+    """
+    Bind parameters for the log, with secret-looking names masked and size capped.
+    names: bind names in order for positional paramstyles (qmark/format), when known.
+    """
+    first = parameters[0] if executemany and parameters else parameters
+    if isinstance(first, dict):
+        first = {k: "***" if _SECRET_PARAM.search(str(k)) else v for k, v in first.items()}
+    elif isinstance(first, (tuple, list)) and names and len(names) == len(first):
+        first = tuple("***" if _SECRET_PARAM.search(str(k)) else v for k, v in zip(names, first))
+    shown = repr(first)
+    if len(shown) > 500:
+        shown = shown[:500] + "..."
+    return f"{shown} (+{len(parameters) - 1} more rows)" if executemany and parameters and len(parameters) > 1 else shown
+
+_slow_lock = threading.Lock()
+slow_fingerprints = {}
+slow_recent = deque(maxlen=SLOW_QUERY_RECENT)
+_explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_explain_pending = set()
+
+def _caller_role(m):
+    if m is not None and m.role is None and has_request_context():
+        try:
+            m.role = (get_jwt() or {}).get("role") or "anonymous"
+        except Exception:
+            m.role = "anonymous"
+    return m.role if m is not None else None
+
+def record_slow_query(conn, statement: str, parameters, executemany: bool, elapsed: float, m, names=None):
+    if statement.lstrip()[:7].upper() == "EXPLAIN":
+        return  # our own plan capture
+    fp, normalized = fingerprint_sql(statement)
+    endpoint = m.endpoint if m is not None else "background"
+    role = _caller_role(m)
+    params = _redacted_params(parameters, executemany, names)
+    ms = elapsed * 1000
+    now = datetime.now(timezone.utc)
+    explain = False
+    with _slow_lock:
+        entry = slow_fingerprints.get(fp)
+        if entry is None:
+            if len(slow_fingerprints) >= SLOW_QUERY_MAX_FINGERPRINTS:
+                del slow_fingerprints[min(slow_fingerprints, key=lambda k: slow_fingerprints[k]["totalMs"])]
+            entry = slow_fingerprints[fp] = {
+                "fingerprint": fp, "sql": normalized, "count": 0, "totalMs": 0.0, "maxMs": 0.0,
+                "endpoints": {}, "roles": {}, "explain": None, "explainedAt": None,
+            }
+        entry["count"] += 1
+        entry["totalMs"] += ms
+        entry["maxMs"] = max(entry["maxMs"], ms)
+        entry["lastSeen"] = now.isoformat()
+        entry["lastParams"] = params
+        entry["endpoints"][endpoint] = entry["endpoints"].get(endpoint, 0) + 1
+        entry["roles"][role or "-"] = entry["roles"].get(role or "-", 0) + 1
+        slow_recent.append({"at": now.isoformat(), "fingerprint": fp, "ms": round(ms, 1), "endpoint": endpoint,
+                            "role": role, "params": params})
+        if (
+            SLOW_QUERY_EXPLAIN and not executemany and conn.dialect.name == "postgresql"
+            and re.match(r"\s*(SELECT|WITH)\b", statement, re.I)
+            and not re.search(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", statement, re.I)
+            and fp not in _explain_pending
+            and (entry["explainedAt"] is None
+                 or (now - datetime.fromisoformat(entry["explainedAt"])).total_seconds() >= SLOW_QUERY_EXPLAIN_INTERVAL)
+        ):
+            _explain_pending.add(fp)
+            explain = True
+    logger.warning(f"Slow query {ms:.0f}ms [{fp}] endpoint={endpoint} role={role} sql={normalized[:500]} params={params}")
+    if explain:
+        _explain_pool.submit(_explain_slow_query, fp, statement, parameters)
+
+def _explain_slow_query(fp: str, statement: str, parameters):
+    """EXPLAIN (ANALYZE, BUFFERS) a slow SELECT on its own connection, read-only and time-boxed."""
+    plan = None
+    try:
+        with app.app_context():
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}")
+                rows = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters).fetchall()
+                conn.rollback()
+        plan = "\n".join(r[0] for r in rows)
+    except Exception as e:
+        plan = f"EXPLAIN failed: {e}"
+        logger.warning(f"Slow query [{fp}] EXPLAIN failed: {e}")
+    with _slow_lock:
+        _explain_pending.discard(fp)
+        entry = slow_fingerprints.get(fp)
+        if entry is not None:
+            entry["explain"] = plan
+            entry["explainedAt"] = datetime.now(timezone.utc).isoformat()
+    logger.info(f"Slow query [{fp}] plan:\n{plan}")
+
+SLOW_QUERY_SORTS = {"total": "totalMs", "max": "maxMs", "count": "count"}
+
+@app.route("/api/debug/slow-queries", methods=["GET"])
+@jwt_required()
+def debug_slow_queries():
+    """
+    Top slow-query fingerprints in this worker, by total time (sort=total|max|count).
+    Optional: limit (default 20), recent=1 to include the latest individual slow statements,
+    reset=1 to clear after reporting.
+    """
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+    sort = request.args.get("sort", "total")
+    if sort not in SLOW_QUERY_SORTS:
+        return jsonify({"status": "error", "message": f"Unsupported sort '{sort}'"}), 400
+    limit = max(1, min(request.args.get("limit", 20, type=int), SLOW_QUERY_MAX_FINGERPRINTS))
+    with _slow_lock:
+        top = sorted(slow_fingerprints.values(), key=lambda e: e[SLOW_QUERY_SORTS[sort]], reverse=True)[:limit]
+        data = [
+            {**e, "totalMs": round(e["totalMs"], 1), "maxMs": round(e["maxMs"], 1),
+             "avgMs": round(e["totalMs"] / e["count"], 1), "endpoints": dict(e["endpoints"]), "roles": dict(e["roles"])}
+            for e in top
+        ]
+        recent = list(slow_recent) if request.args.get("recent") == "1" else None
+        if request.args.get("reset") == "1":
+            slow_fingerprints.clear()
+            slow_recent.clear()
+    payload = {"status": "success", "thresholdMs": SLOW_QUERY_SECONDS * 1000, "explain": SLOW_QUERY_EXPLAIN,
+               "pid": os.getpid(), "data": data}
+    if recent is not None:
+        payload["recent"] = recent
+    return jsonify(payload), 200
+
+# -----------------------
+# API
+# -----------------------
+@app.route("/api/health", methods=["GET"])
+def health_check():
+    return jsonify({
+        "status": "connected",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "startup": startup_timings,
+    }), 200
+
+@app.route("/api/debug/hash-stats", methods=["GET"])
+@jwt_required()
+def debug_hash_stats():
+    """Password hash pool: queue depth, rejections and hash/verify latency."""
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+    return jsonify({"status": "success", "data": hash_stats_snapshot()}), 200
+
+@app.route("/api/debug/pool", methods=["GET"])
+@jwt_required()
+def debug_pool():
+    """
+    This worker's connection pool: configuration, current checkouts and checkout wait
+    times. ?reset=1 starts a fresh measurement window after reporting.
+    """
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+    pool = db.engine.pool
+    data = {
+        "pid": os.getpid(),
+        "workers": WEB_WORKERS,
+        "threads": WEB_THREADS,
+        "poolSize": DB_POOL_SIZE,
+        "maxOverflow": DB_MAX_OVERFLOW,
+        "poolTimeout": DB_POOL_TIMEOUT,
+        "checkedOut": pool.checkedout(),
+        "checkedIn": pool.checkedin(),
+        "overflowInUse": max(0, pool.overflow()),
+        "wait": pool_wait_stats.snapshot(),
+    }
+    if request.args.get("reset") == "1":
+        pool_wait_stats.reset()
+    return jsonify({"status": "success", "data": data}), 200
+
+@app.route("/api/debug/daily-activity-count", methods=["GET"])
+def debug_daily_activity_count():
+    """Debug endpoint to check data in database"""
+    try:
+        count = DailyTracker.query.count()
+        return jsonify({"status": "success", "daily_tracker_count": count}), 200
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route("/api/ui-options", methods=["GET"])
+def ui_options():
+    try:
+        return metadata_json_response(
+            "ui-options",
+            lambda meta: {"status": "success", "data": meta.get("uiOptions", {})},
+        )
+    except Exception as e:
+        logger.error(f"UI options load error: {e}")
+        return jsonify({"status": "error", "message": "Could not load uiOptions"}), 500
+
+@app.route("/api/login", methods=["POST"])
+def login():
+    data = request.json or {}
+    email = (data.get("email") or "").strip()
+    password = data.get("password")
+
+    if not email or not password:
+        return jsonify({"status": "error", "message": "email and password required"}), 400
+
+    user = User.query.filter_by(email=email).first()
+    try:
+        if not user or not verify_password(user.password, password):
+            return jsonify({"status": "error", "message": "Invalid credentials"}), 401
+    except HashPoolBusy:
+        return hash_busy_response()
+
+    # Transparent upgrade when PASSWORD_HASH_METHOD changed since this hash was made
+    if needs_rehash(user.password):
+        try:
+            user.password = hash_password(password)
+            db.session.commit()
+        except HashPoolBusy:
+            pass  # upgrade on a later login
+
+    claims_cache.set(user.email, _claims_of(user))
+    access_token = create_access_token(
+        identity=user.email,
+        additional_claims={"role": user.role, "id": user.id},
+    )
+    refresh_token = create_refresh_token(identity=user.email)
+    return jsonify(
+        {
+            "status": "success",
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "user": {"id": user.id, "email": user.email, "name": user.name, "role": user.role},
+        }
+    ), 200
+
+
+@app.route("/api/refresh", methods=["POST"])
+def refresh_token_route():
+    """Accepts a refresh token (in JSON body or Authorization header) and returns a new access token."""
+    token = None
+    auth = request.headers.get("Authorization", "")
+    if auth and auth.startswith("Bearer "):
+        token = auth.split(" ", 1)[1].strip()
+    else:
+        data = request.json or {}
+        token = data.get("refresh_token")
+
+    if not token:
+        return jsonify({"status": "error", "message": "Refresh token required"}), 401
+
+    try:
+        decoded = decode_token(token)
+        identity = decoded.get("sub") or decoded.get("identity")
+        if not identity:
+            return jsonify({"status": "error", "message": "Invalid refresh token"}), 401
+
+        claims = user_claims(identity)
+        if not claims:
+            return jsonify({"status": "error", "message": "User not found"}), 401
+
+        new_access = create_access_token(identity=identity, additional_claims={"role": claims["role"], "id": claims["id"]})
+        return jsonify({"status": "success", "access_token": new_access}), 200
+
+    except Exception as e:
+        logger.warning(f"Refresh token decode failed: {e}")
+        return jsonify({"status": "error", "message": "Invalid refresh token"}), 401
+
+# -----------------------
+# Forgot / Reset Password
+# -----------------------
+@app.route("/api/forgot-password", methods=["POST"])
+def forgot_password():
+    """
+    Generates a reset token and stores only its hash with expiry.
+    Always returns a generic message to prevent email enumeration.
+    """
+    data = request.json or {}
+    email = (data.get("email") or "").strip().lower()
+
+    generic_msg = "If this email exists, a reset link has been sent."
+
+    if not email:
+        return jsonify({"status": "success", "message": generic_msg}), 200
+
+    user = User.query.filter_by(email=email).first()
+    if not user:
+        return jsonify({"status": "success", "message": generic_msg}), 200
+
+    raw_token = secrets.token_urlsafe(32)
+    token_hash = sha256_hex(raw_token)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=RESET_TOKEN_MINUTES)
+
+    # Invalidate previous unused tokens (optional)
+    PasswordResetToken.query.filter_by(user_id=user.id, used_at=None).update(
+        {"used_at": datetime.now(timezone.utc)}
+    )
+    db.session.commit()
+
+    prt = PasswordResetToken(
+        id=str(uuid.uuid4()),
+        user_id=user.id,
+        token_hash=token_hash,
+        expires_at=expires_at,
+    )
+    db.session.add(prt)
+    db.session.commit()
+
+    # In production: send email. For dev: log token.
+    logger.info(f"[DEV] Password reset token for {email}: {raw_token} (expires {expires_at.isoformat()})")
+
+    return jsonify({"status": "success", "message": generic_msg}), 200
+
+@app.route("/api/reset-password", methods=["POST"])
+def reset_password():
+    """
+    Resets password using token. Checks: exists, not used, not expired.
+    """
+    data = request.json or {}
+    token = (data.get("token") or "").strip()
+    new_password = (data.get("new_password") or "").strip()
+
+    if not token or not new_password:
+        return jsonify({"status": "error", "message": "token and new_password required"}), 400
+
+    if len(new_password) < 8:
+        return jsonify({"status": "error", "message": "Password must be at least 8 characters"}), 400
+
+    token_hash = sha256_hex(token)
+    now = datetime.now(timezone.utc)
+
+    prt = PasswordResetToken.query.filter_by(token_hash=token_hash).first()
+    if not prt or prt.used_at is not None or _utc(prt.expires_at) < now:
+        return jsonify({"status": "error", "message": "Invalid or expired token"}), 400
 
     user = User.query.get(prt.user_id)
     if not user:
         return jsonify({"status": "error", "message": "Invalid token"}), 400
 
-    user.password = generate_password_hash(new_password)
+    try:
+        user.password = hash_password(new_password)
+    except HashPoolBusy:
+        return hash_busy_response()
     prt.used_at = now
     db.session.commit()
+    forget_user_claims(user.email)
 
     return jsonify({"status": "success", "message": "Password updated successfully. Please login."}), 200
 
@@ -468,7 +2761,6 @@ def reset_password():
 
 
 def get_users():
-    initialize_rds()
     # Allow Admins, Managers and Team Leads to list users (Admin gets full access)
     identity = get_jwt_identity()
     role = (get_jwt() or {}).get("role", "User")
@@ -478,26 +2770,29 @@ def get_users():
 
     q = User.query
     # Managers/Team Leads should only see users from their allowed PODs
-    if role in ("Manager", "Team Lead"):
-        key = user_key_from_email(identity)
-        allowed_pods = TEAM_ACCESS.get(role, {}).get(key, [])
-        if not allowed_pods:
+    if role in SCOPED_ROLES:
+        if not allowed_pods(role, identity):
             return jsonify({"status": "success", "data": []}), 200
-        q = q.filter(User.pod_name.in_(allowed_pods))
+        q = q.filter(in_pod_scope(User.pod_name, role, identity))
+
+    etag, last_modified = watermark(q, User.created_at, ["users", role, identity if role != "Admin" else None], "users")
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
 
     users = q.order_by(User.created_at.desc()).all()
-    return jsonify(
+    resp = jsonify(
         {
             "status": "success",
             "data": [{"id": u.id, "email": u.email, "name": u.name, "role": u.role, "pod": u.pod_name} for u in users],
         }
-    ), 200
+    )
+    return with_validators(resp, etag, last_modified), 200
 
 @app.route("/api/users", methods=["POST"])
 @jwt_required()
 def create_user():
     try:
-        initialize_rds()
         if not require_admin():
             return jsonify({"status": "error", "message": "Admin only"}), 403
 
@@ -517,10 +2812,15 @@ def create_user():
         if not role:
             return jsonify({"status": "error", "message": "role is required"}), 400
 
-        hashed = generate_password_hash(raw_password)
+        try:
+            hashed = hash_password(raw_password)
+        except HashPoolBusy:
+            return hash_busy_response()
         new_user = User(id=str(uuid.uuid4()), email=email, password=hashed, name=name, role=role, pod_name=pod)
         db.session.add(new_user)
         db.session.commit()
+        forget_user_claims(email)
+        bump_generation("users")
 
         return jsonify({"status": "success", "message": "User created successfully"}), 201
 
@@ -535,7 +2835,6 @@ def create_user():
 @app.route("/api/users/<user_id>", methods=["DELETE"])
 @jwt_required()
 def delete_user(user_id):
-    initialize_rds()
     if not require_admin():
         return jsonify({"status": "error", "message": "Admin only"}), 403
 
@@ -543,72 +2842,269 @@ def delete_user(user_id):
     if user:
         db.session.delete(user)
         db.session.commit()
+        forget_user_claims(user.email)
+        bump_generation("users")
+
+    return jsonify({"status": "success"}), 200
+
+# -----------------------
+# Pod assignments (Admin only)
+# -----------------------
+@app.route("/api/pod-assignments", methods=["GET"])
+@jwt_required()
+def list_pod_assignments():
+    """Optional query params: user (email or key), role."""
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+
+    q = PodAssignment.query
+    if request.args.get("user"):
+        q = q.filter(PodAssignment.user_key == user_key_from_email(request.args["user"]))
+    if request.args.get("role"):
+        q = q.filter(PodAssignment.role == request.args["role"])
+
+    grouped = {}
+    for a in q.order_by(PodAssignment.role, PodAssignment.user_key, PodAssignment.pod_name):
+        grouped.setdefault((a.role, a.user_key), []).append(a.pod_name)
+    data = [{"role": role, "user": key, "pods": pods} for (role, key), pods in grouped.items()]
+    return jsonify({"status": "success", "data": data}), 200
+
+@app.route("/api/pod-assignments", methods=["PUT"])
+@jwt_required()
+def set_pod_assignments():
+    """
+    Replace the pods of one Manager/Team Lead. Body: {"user": email or key, "role", "pods": [...]}.
+    An empty list removes every assignment. Takes effect on the next request.
+    """
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+
+    data = request.json or {}
+    key = user_key_from_email(data.get("user") or "")
+    role = (data.get("role") or "").strip()
+    pods = data.get("pods")
+    if not key:
+        return jsonify({"status": "error", "message": "user is required"}), 400
+    if role not in SCOPED_ROLES:
+        return jsonify({"status": "error", "message": f"role must be one of {', '.join(SCOPED_ROLES)}"}), 400
+    if not isinstance(pods, list) or not all(isinstance(p, str) and p.strip() for p in pods):
+        return jsonify({"status": "error", "message": "pods must be a list of pod names"}), 400
+    pods = sorted({p.strip() for p in pods})
+
+    PodAssignment.query.filter_by(user_key=key, role=role).delete()
+    db.session.add_all(PodAssignment(user_key=key, role=role, pod_name=pod) for pod in pods)
+    db.session.commit()
+    bump_generation("pod_assignments")
+
+    return jsonify({"status": "success", "data": {"role": role, "user": key, "pods": pods}}), 200
+
+# -----------------------
+# Performance (RBAC)
+# -----------------------
+def performance_query(role: str, identity: str, req_email=None, model=DailyTracker):
+    """
+    Tracker query scoped to what `identity` may see, or None when the scope is empty.
+    model=DailyActivity scopes archived tracker rows the same way.
+    """
+    q = model.query
+    if model is DailyActivity:
+        q = q.filter(DailyActivity.archived_at.isnot(None))
+
+    # Server-side enforcement of visibility
+    if role == "User":
+        # Always honor JWT identity for regular users
+        q = q.filter(model.email == identity)
+
+    elif role in SCOPED_ROLES:
+        if not allowed_pods(role, identity):
+            return None
+        q = q.filter(in_pod_scope(model.pod_name, role, identity))
+        # Managers/Team Leads may optionally request a specific user's data, but still restricted to their PODs
+        if req_email:
+            q = q.filter(model.email == req_email)
+
+    elif role == "Admin":
+        # Admins may optionally filter by email
+        if req_email:
+            q = q.filter(model.email == req_email)
+
+    return q
+
+@app.route("/api/performance", methods=["GET"])
+@jwt_required()
+def get_performance():
+
+    identity = get_jwt_identity()          # email from token
+    role = (get_jwt() or {}).get("role", "User")
+
+    # optional email query param (frontend may pass current user's email)
+    req_email = request.args.get('email')
+
+    q = performance_query(role, identity, req_email)
+    if q is None:
+        return jsonify({"status": "success", "data": []}), 200
+    try:
+        start_day = parse_day(request.args.get("start_date"))
+        end_day = parse_day(request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    q = filter_day_range(q, DailyTracker.date, start_day, end_day)
+
+    etag, last_modified = watermark(
+        q, DailyTracker.submitted_at, ["performance", role, identity, req_email, _day(start_day), _day(end_day)],
+        "tracker",
+    )
+    cached = not_modified(etag, last_modified)
+    if cached is not None:
+        return cached
+
+    def build():
+        entries = q.order_by(DailyTracker.submitted_at.desc()).limit(500).all()
+        data = [
+            {
+                "id": e.id,
+                "email": e.email,
+                "date": e.date.isoformat() if e.date else None,
+                "podName": e.pod_name,
+                "product": e.product,
+                "projectName": e.project_name,
+                "hours": float(e.dedicated_hours) if e.dedicated_hours is not None else None,
+                "submitted_at": e.submitted_at.isoformat() if e.submitted_at else None,
+            }
+            for e in entries
+        ]
+        if len(data) < 500:
+            # Older rows archive_tracker has moved to daily_activity, same scope
+            a = DailyActivity
+            archived = filter_timestamp_day_range(
+                performance_query(role, identity, req_email, model=a), a.activity_date, start_day, end_day
+            )
+            data += [
+                {
+                    "id": e.id,
+                    "email": e.email,
+                    "date": e.activity_date.date().isoformat() if e.activity_date else None,
+                    "podName": e.pod_name,
+                    "product": e.product,
+                    "projectName": e.project_name,
+                    "hours": float(e.dedicated_hours) if e.dedicated_hours is not None else None,
+                    "submitted_at": e.created_at,
+                }
+                for e in archived.order_by(a.activity_date.desc(), a.created_at.desc()).limit(500 - len(data))
+            ]
+        return {"status": "success", "data": data}
 
-    return jsonify({"status": "success"}), 200
+    pods = None
+    emails = [req_email] if req_email and role in ("Manager", "Team Lead", "Admin") else None
+    if role == "User":
+        emails = [identity]
+    elif role in SCOPED_ROLES:
+        pods = allowed_pods(role, identity)
+    # Keyed on the ETag too: an entry cached before a write that another worker made (or
+    # that has not invalidated yet) can never answer for the newer watermark
+    key = report_cache_key(
+        "performance", report_scope(pods, emails), {"start": _day(start_day), "end": _day(end_day), "etag": etag}
+    )
+    meta = report_cache_meta(["tracker"], pods=pods, emails=emails, start=_day(start_day), end=_day(end_day))
+    payload, hit = cached_report(key, meta, build)
+    resp = jsonify(payload)
+    resp.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return with_validators(resp, etag, last_modified), 200
 
-# -----------------------
-# Performance (RBAC)
-# -----------------------
-@app.route("/api/performance", methods=["GET"])
+@app.route("/api/performance/export", methods=["GET"])
 @jwt_required()
-def get_performance():
-    initialize_rds()
+def export_performance():
+    """
+    Stream the caller's full DailyTracker scope (no row cap) as CSV or NDJSON: live rows,
+    then the ones archive_tracker moved to daily_activity.
+    Query params: format=csv|ndjson, email, start_date, end_date (on the tracker date).
+    """
 
-    identity = get_jwt_identity()          # email from token
+    identity = get_jwt_identity()
     role = (get_jwt() or {}).get("role", "User")
+    try:
+        fmt = parse_export_format(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
 
-    # optional email query param (frontend may pass current user's email)
-    req_email = request.args.get('email')
-
-    q = DailyTracker.query
+    q = performance_query(role, identity, request.args.get("email"))
+    if q is None:
+        return stream_export(DailyTracker.query.filter(db.false()), DailyTracker.__table__, fmt, "performance")
+    try:
+        start_day = parse_day(request.args.get("start_date"))
+        end_day = parse_day(request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    q = filter_day_range(q, DailyTracker.date, start_day, end_day).order_by(DailyTracker.submitted_at.desc())
+
+    # Rows archive_tracker has moved to daily_activity, same scope; all older than the live ones
+    a = DailyActivity
+    archived = filter_timestamp_day_range(
+        performance_query(role, identity, request.args.get("email"), model=a), a.activity_date, start_day, end_day
+    ).order_by(a.activity_date.desc(), a.created_at.desc())
+    return stream_export(q, DailyTracker.__table__, fmt, "performance", then=[archived_tracker_export(archived)])
+
+def performance_summary_rows(role: str, identity: str, req_email=None, start_day=None, end_day=None) -> list:
+    """Per-day rollup totals (newest first) for what `identity` may see."""
+    r = DailyTrackerRollup
+    q = db.session.query(
+        r.date,
+        func.sum(r.entries).label("entries"),
+        func.sum(r.total_hours).label("total_hours"),
+        func.sum(r.line_miles).label("line_miles"),
+        func.sum(r.feature_count).label("feature_count"),
+    )
 
-    # Server-side enforcement of visibility
     if role == "User":
-        # Always honor JWT identity for regular users
-        q = q.filter(DailyTracker.email == identity)
-
-    elif role in ["Manager", "Team Lead"]:
-        key = user_key_from_email(identity)
-        allowed_pods = TEAM_ACCESS.get(role, {}).get(key, [])
-        if not allowed_pods:
-            return jsonify({"status": "success", "data": []}), 200
-        q = q.filter(DailyTracker.pod_name.in_(allowed_pods))
-        # Managers/Team Leads may optionally request a specific user's data, but still restricted to their PODs
+        q = q.filter(r.email == identity)
+    elif role in SCOPED_ROLES:
+        if not allowed_pods(role, identity):
+            return []
+        q = q.filter(in_pod_scope(r.pod_name, role, identity))
         if req_email:
-            q = q.filter(DailyTracker.email == req_email)
-
+            q = q.filter(r.email == req_email)
     elif role == "Admin":
-        # Admins may optionally filter by email
         if req_email:
-            q = q.filter(DailyTracker.email == req_email)
+            q = q.filter(r.email == req_email)
 
-    entries = q.order_by(DailyTracker.submitted_at.desc()).limit(500).all()
-
-    return jsonify(
+    q = filter_day_range(q, r.date, start_day, end_day)
+    return [
         {
-            "status": "success",
-            "data": [
-                {
-                    "id": e.id,
-                    "email": e.email,
-                    "podName": e.pod_name,
-                    "product": e.product,
-                    "projectName": e.project_name,
-                    "hours": float(e.dedicated_hours) if e.dedicated_hours is not None else None,
-                    "submitted_at": e.submitted_at.isoformat() if e.submitted_at else None,
-                }
-                for e in entries
-            ],
+            "date": row.date.isoformat() if row.date else None,
+            "entries": int(row.entries or 0),
+            "hours": float(row.total_hours or 0),
+            "lineMiles": float(row.line_miles or 0),
+            "featureCount": float(row.feature_count or 0),
         }
-    ), 200
+        for row in q.group_by(r.date).order_by(r.date.desc()).all()
+    ]
+
+@app.route("/api/performance/summary", methods=["GET"])
+@jwt_required()
+def get_performance_summary():
+    """
+    Per-day totals for the caller's scope, answered from daily_tracker_rollup.
+    Optional query params: start_date, end_date (YYYY-MM-DD, tracker date), email.
+    """
+
+    identity = get_jwt_identity()
+    role = (get_jwt() or {}).get("role", "User")
+    try:
+        start_day = parse_day(request.args.get("start_date"))
+        end_day = parse_day(request.args.get("end_date"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    rows = performance_summary_rows(role, identity, request.args.get("email"), start_day, end_day)
+    return jsonify({"status": "success", "data": rows}), 200
 
 # -----------------------
 # Tracker submit (JWT protected) ✅ force email from token
 # -----------------------
 @app.route("/api/tracker", methods=["POST"])
 @jwt_required()
+@drained_write
 def submit_tracker():
-    initialize_rds()
     data = request.json or {}
 
     identity = get_jwt_identity()
@@ -619,92 +3115,87 @@ def submit_tracker():
     product = data.get("product")
     tracker_date = data.get("date")
     projects = data.get("projects") or []
+    if not projects:
+        return jsonify({"status": "success", "count": 0, "ids": []}), 201
+    try:
+        tracker_date = parse_day(tracker_date) or datetime.now(timezone.utc).date()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    # The raw payload is stored once per submission; rows reference it by id
+    now = datetime.now(timezone.utc)
+    submission = TrackerSubmission(
+        id=str(uuid.uuid4()),
+        email=email,
+        project_count=len(projects),
+        payload_json=json.dumps(data),
+        submitted_at=now,
+    )
+    db.session.add(submission)
 
     # Create an entry for EACH project
-    created_ids = []
-    for proj in projects:
-        # Helper to convert empty strings to None for numeric fields
-        def to_numeric(val):
-            if val is None or val == '' or val == 'undefined':
-                return None
-            try:
-                return float(val)
-            except (ValueError, TypeError):
-                return None
-        
-        def to_text(val):
-            if val is None or val == '' or val == 'undefined':
-                return None
-            return str(val).strip() if str(val).strip() else None
-        
-        def to_int(val):
-            """Convert boolean to int (0 or 1) for numeric columns"""
-            # Handle boolean first (before None check, since None is also falsy)
-            if isinstance(val, bool):
-                return 1 if val else 0
-            # Handle None, empty strings, undefined
-            if val is None or val == '' or val == 'undefined':
-                return 0  # Default to 0 for false values
-            # Try to convert to int
-            try:
-                result = int(val)
-                return result
-            except (ValueError, TypeError):
-                return 0  # Default to 0 on error
-        
-        entry = DailyTracker(
-            id=str(uuid.uuid4()),
-            email=email,
-            date=tracker_date or "",
-            mode_of_functioning=mode,
-            pod_name=pod,
-            product=product,
-            project_name=proj.get("projectName"),
-            nature_of_work=proj.get("natureOfWork"),
-            task=proj.get("task") or proj.get("subTask"),
-            dedicated_hours=to_numeric(proj.get("dedicatedHours")),
-            remarks=to_text(proj.get("remarks")),
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "submission_id": submission.id,
+            "email": email,
+            "date": tracker_date,
+            "mode_of_functioning": mode,
+            "pod_name": pod,
+            "product": product,
+            "project_name": proj.get("projectName"),
+            "nature_of_work": proj.get("natureOfWork"),
+            "task": proj.get("task") or proj.get("subTask"),
+            "dedicated_hours": to_numeric(proj.get("dedicatedHours")),
+            "remarks": to_text(proj.get("remarks")),
 
             # AIMS
-            conductor_lines=to_numeric(proj.get("conductorLines")),
-            number_of_points=to_numeric(proj.get("numberOfPoints")),
+            "conductor_lines": to_numeric(proj.get("conductorLines")),
+            "number_of_points": to_numeric(proj.get("numberOfPoints")),
 
             # IVMS
-            benchmark_for_task=to_numeric(proj.get("benchmarkForTask")),
-            line_miles=to_numeric(proj.get("lineMiles")),
-            line_miles_h1v1=to_numeric(proj.get("lineMilesH1V1")),
-            dedicated_hours_h1v1=to_numeric(proj.get("dedicatedHoursH1V1")),
-            line_miles_h1v0=to_numeric(proj.get("lineMilesH1V0")),
-            dedicated_hours_h1v0=to_numeric(proj.get("dedicatedHoursH1V0")),
+            "benchmark_for_task": to_numeric(proj.get("benchmarkForTask")),
+            "line_miles": to_numeric(proj.get("lineMiles")),
+            "line_miles_h1v1": to_numeric(proj.get("lineMilesH1V1")),
+            "dedicated_hours_h1v1": to_numeric(proj.get("dedicatedHoursH1V1")),
+            "line_miles_h1v0": to_numeric(proj.get("lineMilesH1V0")),
+            "dedicated_hours_h1v0": to_numeric(proj.get("dedicatedHoursH1V0")),
 
             # Vendor POC (numeric booleans: 0 or 1)
-            tracker_updating=to_int(proj.get("trackerUpdating")),
-            data_quality_checking=to_int(proj.get("dataQualityChecking")),
-            training_feedback=to_int(proj.get("trainingFeedback")),
-            trn_remarks=to_text(proj.get("trnRemarks")),
-            documentation=to_int(proj.get("documentation")),
-            doc_remark=to_text(proj.get("docRemark")),
-            others_misc=to_text(proj.get("othersMisc")),
-            updated_in_prod_qc_tracker=proj.get("updatedInProdQCTracker"),
+            "tracker_updating": to_int(proj.get("trackerUpdating")),
+            "data_quality_checking": to_int(proj.get("dataQualityChecking")),
+            "training_feedback": to_int(proj.get("trainingFeedback")),
+            "trn_remarks": to_text(proj.get("trnRemarks")),
+            "documentation": to_int(proj.get("documentation")),
+            "doc_remark": to_text(proj.get("docRemark")),
+            "others_misc": to_text(proj.get("othersMisc")),
+            "updated_in_prod_qc_tracker": proj.get("updatedInProdQCTracker"),
 
             # ISMS
-            site_name=to_text(proj.get("siteName")),
-            area_hectares=to_numeric(proj.get("areaHectares")),
-            polygon_feature_count=to_numeric(proj.get("polygonFeatureCount")),
-            polyline_feature_count=to_numeric(proj.get("polylineFeatureCount")),
-            point_feature_count=to_numeric(proj.get("pointFeatureCount")),
-            spent_hours_on_above_task=to_numeric(proj.get("spentHoursOnAboveTask")),
-            density=to_numeric(proj.get("density")),
+            "site_name": to_text(proj.get("siteName")),
+            "area_hectares": to_numeric(proj.get("areaHectares")),
+            "polygon_feature_count": to_numeric(proj.get("polygonFeatureCount")),
+            "polyline_feature_count": to_numeric(proj.get("polylineFeatureCount")),
+            "point_feature_count": to_numeric(proj.get("pointFeatureCount")),
+            "spent_hours_on_above_task": to_numeric(proj.get("spentHoursOnAboveTask")),
+            "density": to_numeric(proj.get("density")),
 
             # RSMS
-            time_field=to_numeric(proj.get("timeField")),
+            "time_field": to_numeric(proj.get("timeField")),
 
-            metadata_json=json.dumps(data),
-        )
-        db.session.add(entry)
-        created_ids.append(entry.id)
-    
+            "submitted_at": now,
+        }
+        for proj in projects
+    ]
+
+    # One executemany (batched multi-row INSERT) instead of one ORM flush per project
+    db.session.execute(DailyTracker.__table__.insert(), rows)
+    rollup_apply(rows)
     db.session.commit()
+    note_filter_values(rows)
+    invalidate_reports("tracker", touched_buckets(rows))
+
+    created_ids = [r["id"] for r in rows]
     return jsonify({"status": "success", "count": len(created_ids), "ids": created_ids}), 201
 
 
@@ -716,13 +3207,15 @@ def submit_tracker():
 @jwt_required()
 def create_resource():
     try:
-        initialize_rds()
         data = request.json or {}
 
         identity = get_jwt_identity()
         email = identity  # ✅ lock submitter
 
-        date = data.get("date")
+        try:
+            date = parse_day(data.get("date"))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         if not date:
             return jsonify({"status": "error", "message": "date is required"}), 400
 
@@ -740,6 +3233,7 @@ def create_resource():
 
         db.session.add(entry)
         db.session.commit()
+        invalidate_reports("resource", touched_buckets([entry]))
         return jsonify({"status": "success", "id": entry.id}), 201
     except IntegrityError:
         db.session.rollback()
@@ -752,7 +3246,6 @@ def create_resource():
 @app.route("/api/resource", methods=["GET"])
 def list_resources():
     try:
-        initialize_rds()
         email = request.args.get("email")
         date_from = request.args.get("date_from")
         date_to = request.args.get("date_to")
@@ -763,17 +3256,24 @@ def list_resources():
             query = query.filter_by(email=email)
         if pod_name:
             query = query.filter_by(pod_name=pod_name)
-        if date_from:
-            query = query.filter(ResourceTable.date >= date_from)
-        if date_to:
-            query = query.filter(ResourceTable.date <= date_to)
+        try:
+            query = filter_day_range(query, ResourceTable.date, parse_day(date_from), parse_day(date_to))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+        etag, last_modified = watermark(
+            query, ResourceTable.submitted_at, ["resource", email, pod_name, date_from, date_to], "resource"
+        )
+        cached = not_modified(etag, last_modified)
+        if cached is not None:
+            return cached
 
         entries = query.order_by(ResourceTable.date.desc()).limit(500).all()
         data = [
             {
                 "id": e.id,
                 "email": e.email,
-                "date": e.date,
+                "date": e.date.isoformat() if e.date else None,
                 "podName": e.pod_name,
                 "modeOfFunctioning": e.mode_of_functioning,
                 "product": e.product,
@@ -785,7 +3285,7 @@ def list_resources():
             for e in entries
         ]
 
-        return jsonify({"status": "success", "data": data}), 200
+        return with_validators(jsonify({"status": "success", "data": data}), etag, last_modified), 200
     except Exception as e:
         logger.error(f"Error listing resources: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -793,145 +3293,187 @@ def list_resources():
 # -----------------------
 # Old Data + Filters (combined sources) ✅ Public access for now
 # -----------------------
+def daily_activity_query(role: str, identity: str, args):
+    """
+    DailyActivity query with RBAC scoping and the optional filters in `args`
+    (pod_name, product, project_name, nature_of_work, task, start_date, end_date).
+    Returns None when the caller's scope is empty; ValueError on an unparseable date.
+    """
+    # Optional filters
+    pod_name = args.get("pod_name")
+    product = args.get("product")
+    project_name = args.get("project_name")
+    nature_of_work = args.get("nature_of_work")
+    task = args.get("task")
+
+    # Build query from DailyActivity (old data) table
+    q = DailyActivity.query
+
+    # ✅ ROLE BASED ACCESS
+    if role == "User":
+        q = q.filter(DailyActivity.email == identity)
+
+    elif role in SCOPED_ROLES:
+        pods = allowed_pods(role, identity)
+        if not pods:
+            return None
+        q = q.filter(in_pod_scope(DailyActivity.pod_name, role, identity))
+
+        # Optional: if user chooses a pod filter, allow only within allowed pods
+        if pod_name:
+            if pod_name not in pods:
+                return None
+            q = q.filter(DailyActivity.pod_name == pod_name)
+
+    elif role in ["Admin", "Internal Admin"]:
+        if pod_name:
+            q = q.filter(DailyActivity.pod_name == pod_name)
+
+    # Apply other filters
+    if product:
+        q = q.filter(DailyActivity.product == product)
+    if project_name:
+        q = q.filter(DailyActivity.project_name == project_name)
+    if nature_of_work:
+        q = q.filter(DailyActivity.nature_of_work == nature_of_work)
+    if task:
+        q = q.filter(DailyActivity.task == task)
+
+    # Date range filtering (whole days, inclusive)
+    start_day = parse_day(args.get("start_date"))
+    end_day = parse_day(args.get("end_date"))
+    return filter_timestamp_day_range(q, DailyActivity.activity_date, start_day, end_day)
+
+def serialize_daily_activity(e) -> dict:
+    return {
+        "id": e.id,
+        "email": e.email,
+        "name": e.name,
+        "podName": e.pod_name,
+        "modeOfFunctioning": e.mode_of_functioning,
+        "product": e.product,
+        "projectName": e.project_name,
+        "natureOfWork": e.nature_of_work,
+        "task": e.task,
+        "dedicatedHours": float(e.dedicated_hours) if e.dedicated_hours is not None else None,
+        "remarks": e.remarks,
+        "activityDate": e.activity_date.isoformat() if e.activity_date else None,
+    }
+
 @app.route("/api/daily_activity", methods=["GET"])
 @jwt_required()
 def get_daily_activity():
     try:
-        initialize_rds()
 
         # Get role and email from JWT claims
         identity = get_jwt_identity()
         claims = get_jwt()
         role = claims.get("role", "User")
 
-        # Allow role/email override via query params for testing (remove in production)
-        role = request.args.get("role", role)
-        identity = request.args.get("email", identity)
+        try:
+            q = daily_activity_query(role, identity, request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        if q is None:
+            return jsonify({"status": "success", "data": [], "next_cursor": None}), 200
+
+        # Keyset pagination over (activity_date, id): every page is an index range
+        # scan of page_size + 1 rows, no matter how deep the cursor is.
+        page_size = parse_page_size(request.args.get("page_size"))
+        cursor = request.args.get("cursor")
+        if cursor:
+            try:
+                after_date, after_id = decode_cursor(cursor)
+            except ValueError:
+                return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+            q = q.filter(keyset_after(DailyActivity.activity_date, DailyActivity.id, after_date, after_id))
+
+        entries = (
+            q.order_by(DailyActivity.activity_date.desc().nullslast(), DailyActivity.id.desc())
+            .limit(page_size + 1)
+            .all()
+        )
+        next_cursor = None
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            next_cursor = encode_cursor(entries[-1].activity_date, entries[-1].id)
 
-        # Optional filters
-        pod_name = request.args.get("pod_name")
-        product = request.args.get("product")
-        project_name = request.args.get("project_name")
-        nature_of_work = request.args.get("nature_of_work")
-        task = request.args.get("task")
-
-        # Build query from DailyActivity (old data) table
-        q = DailyActivity.query
-
-        # ✅ ROLE BASED ACCESS
-        if role == "User":
-            q = q.filter(DailyActivity.email == identity)
-
-        elif role in ["Manager", "Team Lead"]:
-            key = user_key_from_email(identity)
-            allowed_pods = TEAM_ACCESS.get(role, {}).get(key, [])
-            if not allowed_pods:
-                return jsonify({"status": "success", "data": []}), 200
-            q = q.filter(DailyActivity.pod_name.in_(allowed_pods))
-
-            # Optional: if user chooses a pod filter, allow only within allowed pods
-            if pod_name:
-                if pod_name not in allowed_pods:
-                    return jsonify({"status": "success", "data": []}), 200
-                q = q.filter(DailyActivity.pod_name == pod_name)
-
-        elif role in ["Admin", "Internal Admin"]:
-            if pod_name:
-                q = q.filter(DailyActivity.pod_name == pod_name)
-
-        # Apply other filters
-        if product:
-            q = q.filter(DailyActivity.product == product)
-        if project_name:
-            q = q.filter(DailyActivity.project_name == project_name)
-        if nature_of_work:
-            q = q.filter(DailyActivity.nature_of_work == nature_of_work)
-        if task:
-            q = q.filter(DailyActivity.task == task)
-
-        # Date range filtering
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        if start_date:
-            q = q.filter(DailyActivity.activity_date >= start_date)
-        if end_date:
-            q = q.filter(DailyActivity.activity_date <= end_date)
-
-        entries = q.order_by(DailyActivity.activity_date.desc()).limit(50).all()
-
-        result_data = []
-        for e in entries:
-            result_data.append({
-                "id": e.id,
-                "email": e.email,
-                "name": e.name,
-                "podName": e.pod_name,
-                "modeOfFunctioning": e.mode_of_functioning,
-                "product": e.product,
-                "projectName": e.project_name,
-                "natureOfWork": e.nature_of_work,
-                "task": e.task,
-                "dedicatedHours": float(e.dedicated_hours) if e.dedicated_hours is not None else None,
-                "remarks": e.remarks,
-                "activityDate": e.activity_date.isoformat() if e.activity_date else None,
-            })
+        result_data = [serialize_daily_activity(e) for e in entries]
 
-        return jsonify({"status": "success", "data": result_data}), 200
+        return jsonify({"status": "success", "data": result_data, "next_cursor": next_cursor}), 200
 
     except Exception as e:
         logger.error(f"Error fetching daily_activity: {str(e)}")
         return jsonify({"status": "error", "message": f"Error fetching data: {str(e)}"}), 500
 
-@app.route("/api/daily_activity/filters", methods=["GET"])
-def get_daily_activity_filters():
-    """Get filter values from metadata.json with role-based filtering."""
+@app.route("/api/daily_activity/export", methods=["GET"])
+@jwt_required()
+def export_daily_activity():
+    """
+    Stream every matching DailyActivity row as CSV or NDJSON (format=csv|ndjson).
+    Accepts the same RBAC scoping and filters as /api/daily_activity.
+    """
+
+    identity = get_jwt_identity()
+    role = (get_jwt() or {}).get("role", "User")
+
     try:
-        initialize_rds()
+        fmt = parse_export_format(request.args)
+        q = daily_activity_query(role, identity, request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if q is None:
+        q = DailyActivity.query.filter(db.false())
 
-        # Load metadata
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        metadata_path = os.path.join(base_dir, "metadata.json")
-        
-        ui_options = {}
-        try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-                ui_options = metadata.get("uiOptions", {})
-        except Exception as e:
-            logger.warning(f"Could not load metadata.json: {e}")
+    q = q.order_by(DailyActivity.activity_date.desc().nullslast(), DailyActivity.id.desc())
+    return stream_export(q, DailyActivity.__table__, fmt, "daily_activity")
 
-        # Get from metadata or empty
-        all_products = ui_options.get("products", [])
-        all_project_names = ui_options.get("projectNames", [])
-        all_nature_of_work = ui_options.get("natureOfWork", [])
-        all_tasks = ui_options.get("tasks", [])
-        all_pod_names = ui_options.get("podNames", [])
+@app.route("/api/daily_activity/filters", methods=["GET"])
+@jwt_required()
+def get_daily_activity_filters():
+    """
+    Get filter values from metadata.json with role-based filtering.
+    With ?source=data the values come from the rows in the caller's scope
+    (their pods for Managers/Team Leads, their own rows for Users).
+    """
+    try:
 
-        # Get user info
-        identity = request.args.get("email", "admin@aidash.com")
-        role = request.args.get("role", "Admin")
-        key = user_key_from_email(identity)
+        # Get role and email from JWT claims
+        identity = get_jwt_identity()
+        role = (get_jwt() or {}).get("role", "User")
 
         # Filter POD names based on role
-        pod_names = all_pod_names
-        if role in ["Manager", "Team Lead"]:
-            allowed_pods = TEAM_ACCESS.get(role, {}).get(key, [])
-            if not allowed_pods:
+        scope_pods = None
+        if role in SCOPED_ROLES:
+            scope_pods = allowed_pods(role, identity)
+            if not scope_pods:
                 return jsonify(
                     {"status": "success",
                      "data": {"products": [], "projectNames": [], "natureOfWork": [], "tasks": [], "podNames": []}}
                 ), 200
-            pod_names = allowed_pods
 
-        return jsonify(
-            {
-                "products": all_products,
-                "projectNames": all_project_names,
-                "natureOfWork": all_nature_of_work,
-                "tasks": all_tasks,
-                "podNames": pod_names,
+        # ?source=data: only values that actually occur in the caller's scope
+        if request.args.get("source") == "data":
+            resp = jsonify(filter_values_for(filter_scope(role, identity)))
+            resp.add_etag()
+            resp.headers["Cache-Control"] = "no-cache"
+            return resp.make_conditional(request)
+
+        def build(meta):
+            ui_options = meta.get("uiOptions", {})
+            return {
+                "products": ui_options.get("products", []),
+                "projectNames": ui_options.get("projectNames", []),
+                "natureOfWork": ui_options.get("natureOfWork", []),
+                "tasks": ui_options.get("tasks", []),
+                "podNames": scope_pods if scope_pods is not None else ui_options.get("podNames", []),
             }
-        ), 200
+
+        try:
+            return metadata_json_response(("filters", tuple(scope_pods or ())), build)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load metadata.json: {e}")
+            return jsonify(build({})), 200
 
     except Exception as e:
         logger.error(f"Error fetching filters: {str(e)}")
@@ -945,8 +3487,45 @@ def get_daily_activity_filters():
             }
         ), 200
 
+@app.route("/api/daily_activity/import", methods=["POST"])
+@jwt_required()
+def import_daily_activity_route():
+    """
+    Admin bulk load. Send the file as the raw request body with
+    ?format=csv|ndjson (or a text/csv / application/x-ndjson Content-Type).
+    """
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+
+    fmt = request.args.get("format")
+    if not fmt:
+        fmt = "csv" if (request.mimetype or "").endswith("csv") else "ndjson"
+    chunk_size = request.args.get("chunk_size", type=int) or IMPORT_CHUNK_SIZE
+
+    try:
+        stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+        summary = import_daily_activity(stream, fmt, chunk_size=max(1, chunk_size))
+        reset_filter_values()
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        logger.exception("daily_activity import failed")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+    return jsonify({"status": "success", **summary}), 200
+
+@app.route("/api/daily_activity/archive-status", methods=["GET"])
+@jwt_required()
+def archive_status_route():
+    """Admin view of the tracker archival backlog, lag and in-flight checkpoint."""
+    if not require_admin():
+        return jsonify({"status": "error", "message": "Admin only"}), 403
+    days = request.args.get("older_than_days", type=int) or ARCHIVE_AFTER_DAYS
+    return jsonify({"status": "success", **archive_status(days)}), 200
+
 @app.route("/api/daily_activity/edit", methods=["PUT"])
 @jwt_required()
+@drained_write
 def edit_daily_activity_by_keys():
     role = (get_jwt() or {}).get("role", "User")
     if role not in ["Admin", "Internal Admin"]:
@@ -983,13 +3562,64 @@ def edit_daily_activity_by_keys():
     if not entry:
         return jsonify({"status": "error", "message": "Entry not found"}), 404
 
+    # Keep the rollup in step: take the old contribution out, put the new one in.
+    # Archived tracker rows still count towards it.
+    is_tracker = isinstance(entry, DailyTracker) or entry.archived_at is not None
+    if is_tracker:
+        before = tracker_row_view(entry)
+        rollup_apply([before], sign=-1)
+
     for field, value in updates.items():
         setattr(entry, field, value)
 
+    if is_tracker:
+        after = tracker_row_view(entry)
+        rollup_apply([after])
     db.session.commit()
+    note_filter_values([entry])
+    if is_tracker:
+        invalidate_reports("tracker", touched_buckets([before, after]))
     return jsonify({"status": "success", "message": "Row updated"}), 200
 
 # --- helpers ---
+def parse_day(value):
+    """
+    Work date from a request value ("YYYY-MM-DD" or full ISO). None when empty;
+    ValueError when present but unparseable.
+    """
+    if value is None or str(value).strip() == "":
+        return None
+    parsed = _parse_date(str(value).strip())
+    if parsed is None:
+        raise ValueError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
+    return parsed.date()
+
+def filter_day_range(q, col, start_day=None, end_day=None):
+    """Inclusive [start_day, end_day] filter on a DATE column."""
+    if start_day:
+        q = q.filter(col >= start_day)
+    if end_day:
+        q = q.filter(col <= end_day)
+    return q
+
+def sql_day(col):
+    """SQL expression for the calendar day of a TIMESTAMP column, typed as a DATE."""
+    if db.engine.dialect.name == "postgresql":
+        return db.cast(col, db.Date)
+    return func.date(col, type_=db.Date)
+
+def filter_timestamp_day_range(q, col, start_day=None, end_day=None):
+    """
+    Inclusive [start_day, end_day] filter on a TIMESTAMP column, as a half-open
+    range [start, end + 1 day) of typed bounds so partitions prune.
+    """
+    if start_day:
+        q = q.filter(col >= datetime(start_day.year, start_day.month, start_day.day))
+    if end_day:
+        after = end_day + timedelta(days=1)
+        q = q.filter(col < datetime(after.year, after.month, after.day))
+    return q
+
 def _parse_date(d: str):
     if not d:
         return None
@@ -1005,110 +3635,605 @@ def _parse_date(d: str):
             return None
 
 # -----------------------
-# API: Performance (with date filters + role/email scoping)
+# API: Performance time series (NumPy over daily rollup columns)
 # -----------------------
-@app.route("/api/performance", methods=["GET"])
-def api_performance():
-    try:
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        role = request.args.get("role", "")
-        email = request.args.get("email", "")
-
-        q = DailyTracker.query
+DAILY_TARGET_HOURS = float(os.environ.get("DAILY_TARGET_HOURS", "8"))
+TIMESERIES_DEFAULT_DAYS = 90
+TIMESERIES_MAX_DAYS = 3 * 366
+TIMESERIES_GROUPS = {"email": "email", "pod_name": "pod_name"}
+ROLLING_WINDOWS = (7, 30)
+
+def _rolling_mean(daily, window: int):
+    """Trailing `window`-day mean along axis 1 (calendar days, gaps count as 0)."""
+    csum = np.cumsum(np.pad(daily, ((0, 0), (1, 0))), axis=1)
+    idx = np.arange(daily.shape[1])
+    lo = np.maximum(idx + 1 - window, 0)
+    return (csum[:, idx + 1] - csum[:, lo]) / (idx + 1 - lo)
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def _as_days(dates):
+    """datetime64[D] array from date objects (via ordinals; much faster than np.array on dates)."""
+    return (np.fromiter((d.toordinal() for d in dates), np.int64, len(dates)) - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+def _period_starts(days, period: str):
+    """Bucket start for each datetime64[D] day; weeks start on Monday like period_bucket()."""
+    if period == "week":
+        return days - ((days.astype("int64") + 3) % 7)  # 1970-01-01 was a Thursday
+    if period == "month":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days
+
+def build_timeseries(rows, start_day, end_day, period: str = "day", target_hours: float = DAILY_TARGET_HOURS) -> dict:
+    """
+    rows: (key, date, hours) daily totals, which may start up to 29 days before
+    start_day so the rolling means are warmed up. Returns gap-filled columns per key:
+    hours, rolling 7/30-day daily means and utilization against target_hours per working day.
+    """
+    warm = max(ROLLING_WINDOWS) - 1
+    calendar = np.arange(
+        np.datetime64(start_day) - warm, np.datetime64(end_day) + 1, dtype="datetime64[D]"
+    )
+    if rows:
+        keys, dates, hours = zip(*rows)
+        labels, group_idx = np.unique(np.array([k or "unknown" for k in keys], dtype=object).astype(str), return_inverse=True)
+        day_idx = (_as_days(dates) - calendar[0]).astype("int64")
+        inside = (day_idx >= 0) & (day_idx < len(calendar))
+        daily = np.zeros((len(labels), len(calendar)))
+        np.add.at(daily, (group_idx[inside], day_idx[inside]), np.array(hours, dtype=float)[inside])
+    else:
+        labels, daily = np.array([], dtype=str), np.zeros((0, len(calendar)))
+
+    rolling = {w: _rolling_mean(daily, w)[:, warm:] for w in ROLLING_WINDOWS}
+    daily, calendar = daily[:, warm:], calendar[warm:]
+
+    # Sum days into buckets; rolling means are read at each bucket's last day
+    starts = _period_starts(calendar, period)
+    buckets, bucket_idx = np.unique(starts, return_inverse=True)
+    last_day = np.searchsorted(bucket_idx, np.arange(len(buckets)), side="right") - 1
+    totals = np.zeros((daily.shape[0], len(buckets)))
+    np.add.at(totals.T, bucket_idx, daily.T)
+    workdays = np.bincount(bucket_idx, weights=np.is_busday(calendar), minlength=len(buckets))
+    target = workdays * target_hours
+    with np.errstate(divide="ignore", invalid="ignore"):
+        utilization = np.where(target > 0, totals / target, np.nan)
+
+    def column(values, digits=2):
+        return [None if v != v else v for v in np.round(values, digits).tolist()]
+
+    worked = target.sum()
+    series = []
+    for i, label in enumerate(labels):
+        series.append({
+            "key": str(label),
+            "hours": column(totals[i]),
+            **{f"rolling{w}": column(rolling[w][i, last_day]) for w in ROLLING_WINDOWS},
+            "utilization": column(utilization[i], 3),
+            "totalHours": round(float(totals[i].sum()), 2),
+            "utilizationOverall": round(float(totals[i].sum() / worked), 3) if worked else None,
+        })
+    return {
+        "calendar": [str(b) for b in buckets],
+        "workingDays": workdays.astype(int).tolist(),
+        "series": series,
+    }
 
-        start_dt = _parse_date(start_date)
-        end_dt = _parse_date(end_date)
-        if start_dt:
-            q = q.filter(DailyTracker.submitted_at >= start_dt)
-        if end_dt:
-            q = q.filter(DailyTracker.submitted_at <= (end_dt + timedelta(days=1) - timedelta(seconds=1)))
+@app.route("/api/performance/timeseries", methods=["GET"])
+@jwt_required()
+def performance_timeseries():
+    """
+    Gap-filled hours per user or pod over a calendar, from daily_tracker_rollup.
+    Query params:
+      group_by=email|pod_name (default email), period=day|week|month (default day)
+      start_date/end_date (tracker date; default the last 90 days), email, target_hours
+    """
+    identity = get_jwt_identity()
+    role = (get_jwt() or {}).get("role", "User")
+    group_by = request.args.get("group_by", "email")
+    period = request.args.get("period", "day")
+    if group_by not in TIMESERIES_GROUPS:
+        return jsonify({"status": "error", "message": f"Unsupported group_by '{group_by}'"}), 400
+    if period not in REPORT_PERIODS:
+        return jsonify({"status": "error", "message": f"Unsupported period '{period}'"}), 400
+    try:
+        end_day = parse_day(request.args.get("end_date")) or datetime.now(timezone.utc).date()
+        start_day = parse_day(request.args.get("start_date")) or end_day - timedelta(days=TIMESERIES_DEFAULT_DAYS - 1)
+        target_hours = float(request.args.get("target_hours", DAILY_TARGET_HOURS))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if start_day > end_day or (end_day - start_day).days >= TIMESERIES_MAX_DAYS or target_hours <= 0:
+        return jsonify({"status": "error", "message": "Invalid date range or target_hours"}), 400
+
+    r = DailyTrackerRollup
+    key_col = getattr(r, TIMESERIES_GROUPS[group_by])
+    q = db.session.query(key_col, r.date, func.sum(r.total_hours))
+    req_email = identity if role == "User" else request.args.get("email")
+    pods, emails = None, [req_email] if req_email else None
+    if role in SCOPED_ROLES:
+        pods = allowed_pods(role, identity)
+        if not pods:
+            return jsonify({"status": "success", "data": build_timeseries([], start_day, end_day, period, target_hours)}), 200
+        q = q.filter(in_pod_scope(r.pod_name, role, identity))
+    if req_email:
+        q = q.filter(r.email == req_email)
+    q = filter_day_range(q, r.date, start_day - timedelta(days=max(ROLLING_WINDOWS) - 1), end_day)
+
+    filters = {"start": _day(start_day), "end": _day(end_day), "group_by": group_by, "period": period, "target": target_hours}
+    key = report_cache_key("timeseries", report_scope(pods, emails), filters)
+    # The warm-up days feed the rolling means, so writes to them invalidate too
+    meta = report_cache_meta(
+        ["tracker"], pods=pods, emails=emails,
+        start=_day(start_day - timedelta(days=max(ROLLING_WINDOWS) - 1)), end=_day(end_day),
+    )
+    payload, hit = cached_report(key, meta, lambda: {
+        "status": "success",
+        "groupBy": group_by,
+        "period": period,
+        "targetHours": target_hours,
+        "data": build_timeseries(
+            [(k, d, float(h or 0)) for k, d, h in q.group_by(key_col, r.date).all()],
+            start_day, end_day, period, target_hours,
+        ),
+    })
+    resp = jsonify(payload)
+    resp.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return resp, 200
 
-        # Restrict regular users to their own data
-        if role not in ("Manager", "Admin", "Internal Admin", "Team Lead"):
-            if email:
-                q = q.filter(DailyTracker.email == email)
-            else:
-                return jsonify({"status": "error", "message": "email required for user scope"}), 400
+# -----------------------
+# API: Product KPIs (throughput, benchmark attainment, density)
+# -----------------------
+KPI_GROUPS = {"email": "email", "pod_name": "pod_name", "project_name": "project_name"}
+KPI_COLUMNS = (
+    "dedicated_hours", "line_miles", "benchmark_for_task",
+    "line_miles_h1v1", "dedicated_hours_h1v1", "line_miles_h1v0", "dedicated_hours_h1v0",
+    "conductor_lines", "number_of_points",
+    "area_hectares", "polygon_feature_count", "polyline_feature_count", "point_feature_count",
+    "spent_hours_on_above_task",
+)
+# Sums accumulated per (key, period); each product family divides by the hours of its own rows
+KPI_SUMS = (
+    "entries", "hours",
+    "ivmsHours", "lineMiles", "benchmarkHours", "expectedLineMiles", "benchmarkedLineMiles",
+    "h1v1Miles", "h1v1Hours", "h1v0Miles", "h1v0Hours",
+    "aimsHours", "conductorLines", "points",
+    "ismsHours", "features", "areaHectares", "densityFeatures",
+)
 
-        rows = q.order_by(DailyTracker.submitted_at.desc()).limit(5000).all()
+def _kpi_contributions(values):
+    """
+    values: (rows x KPI_COLUMNS) float matrix with NaN for NULL.
+    Returns (rows x KPI_SUMS) per-row contributions, NaN-free.
+    """
+    col = {name: values[:, i] for i, name in enumerate(KPI_COLUMNS)}
+    has = {name: ~np.isnan(v) for name, v in col.items()}
+    z = {name: np.nan_to_num(v) for name, v in col.items()}
+
+    ivms = has["line_miles"]
+    benchmarked = ivms & (z["benchmark_for_task"] > 0) & (z["dedicated_hours"] > 0)
+    aims = has["conductor_lines"] | has["number_of_points"]
+    features = z["polygon_feature_count"] + z["polyline_feature_count"] + z["point_feature_count"]
+    isms = has["polygon_feature_count"] | has["polyline_feature_count"] | has["point_feature_count"] | has["area_hectares"]
+    isms_hours = np.where(has["spent_hours_on_above_task"], z["spent_hours_on_above_task"], z["dedicated_hours"])
+
+    return np.column_stack([
+        np.ones(len(values)), z["dedicated_hours"],
+        np.where(ivms, z["dedicated_hours"], 0), z["line_miles"],
+        np.where(benchmarked, z["dedicated_hours"], 0),
+        np.where(benchmarked, z["benchmark_for_task"] * z["dedicated_hours"], 0),
+        np.where(benchmarked, z["line_miles"], 0),
+        z["line_miles_h1v1"], z["dedicated_hours_h1v1"], z["line_miles_h1v0"], z["dedicated_hours_h1v0"],
+        np.where(aims, z["dedicated_hours"], 0), z["conductor_lines"], z["number_of_points"],
+        np.where(isms, isms_hours, 0), features, z["area_hectares"],
+        np.where(z["area_hectares"] > 0, features, 0),
+    ])
+
+def _ratio(num, den, digits=3):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(den > 0, num / den, np.nan)
+    return [None if v != v else v for v in np.round(out, digits).tolist()]
+
+def build_kpis(rows, period: str = "month") -> list:
+    """
+    rows: (key, date, *KPI_COLUMNS) tracker rows. Returns one KPI record per (key, period start):
+      lineMilesPerHour (+ H1V1/H1V0 on their own hours), attainment = line miles /
+      (benchmark_for_task x hours) over benchmarked rows, conductorLinesPerHour, pointsPerHour,
+      pointsPerConductorLine, featuresPerHour, hectaresPerHour and featuresPerHectare.
+    """
+    if not rows:
+        return []
+    keys, dates, *columns = zip(*rows)
+    values = np.array(columns, dtype=float).T  # NULL -> NaN
+    labels, label_idx = np.unique(
+        np.array([k or "unknown" for k in keys], dtype=object).astype(str), return_inverse=True
+    )
+    buckets, bucket_idx = np.unique(_period_starts(_as_days(dates), period), return_inverse=True)
+    # One integer code per (key, bucket) so grouping is a single integer unique
+    codes, group_idx = np.unique(label_idx.ravel() * len(buckets) + bucket_idx.ravel(), return_inverse=True)
+    sums = np.zeros((len(codes), len(KPI_SUMS)))
+    np.add.at(sums, group_idx.ravel(), _kpi_contributions(values))
+    s = {name: sums[:, i] for i, name in enumerate(KPI_SUMS)}
+
+    metrics = {
+        "lineMilesPerHour": _ratio(s["lineMiles"], s["ivmsHours"]),
+        "h1v1MilesPerHour": _ratio(s["h1v1Miles"], s["h1v1Hours"]),
+        "h1v0MilesPerHour": _ratio(s["h1v0Miles"], s["h1v0Hours"]),
+        "attainment": _ratio(s["benchmarkedLineMiles"], s["expectedLineMiles"]),
+        "conductorLinesPerHour": _ratio(s["conductorLines"], s["aimsHours"]),
+        "pointsPerHour": _ratio(s["points"], s["aimsHours"]),
+        "pointsPerConductorLine": _ratio(s["points"], s["conductorLines"]),
+        "featuresPerHour": _ratio(s["features"], s["ismsHours"]),
+        "hectaresPerHour": _ratio(s["areaHectares"], s["ismsHours"]),
+        "featuresPerHectare": _ratio(s["densityFeatures"], s["areaHectares"]),
+    }
+    totals = {name: np.round(v, 2).tolist() for name, v in s.items()}
+    totals["entries"] = s["entries"].astype(int).tolist()
+    return [
+        {
+            "key": str(labels[code // len(buckets)]),
+            "period": str(buckets[code % len(buckets)]),
+            **{name: v[i] for name, v in totals.items()},
+            **{name: v[i] for name, v in metrics.items()},
+        }
+        for i, code in enumerate(codes.tolist())
+    ]
 
-        out = []
-        for r in rows:
-            out.append({
-                "id": r.id,
-                "email": r.email,
-                "product": r.product,
-                "projectName": r.project_name,
-                "natureOfWork": r.nature_of_work,
-                "task": r.task,
-                "hours": float(r.dedicated_hours) if r.dedicated_hours else None,
-                "podName": r.pod_name,
-                "submitted_at": r.submitted_at.isoformat() if r.submitted_at else None
-            })
-
-        return jsonify({"status": "success", "data": out})
+@app.route("/api/performance/kpis", methods=["GET"])
+@jwt_required()
+def performance_kpis():
+    """
+    Product KPIs per user, pod or project and period, computed from tracker rows (archived ones included).
+    Query params:
+      group_by=email|pod_name|project_name (default email), period=day|week|month (default month)
+      start_date/end_date (tracker date; default the current month), email, product
+    """
+    identity = get_jwt_identity()
+    role = (get_jwt() or {}).get("role", "User")
+    group_by = request.args.get("group_by", "email")
+    period = request.args.get("period", "month")
+    if group_by not in KPI_GROUPS:
+        return jsonify({"status": "error", "message": f"Unsupported group_by '{group_by}'"}), 400
+    if period not in REPORT_PERIODS:
+        return jsonify({"status": "error", "message": f"Unsupported period '{period}'"}), 400
+    try:
+        end_day = parse_day(request.args.get("end_date")) or datetime.now(timezone.utc).date()
+        start_day = parse_day(request.args.get("start_date")) or end_day.replace(day=1)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    if start_day > end_day or (end_day - start_day).days >= TIMESERIES_MAX_DAYS:
+        return jsonify({"status": "error", "message": "Invalid date range"}), 400
+
+    req_email = identity if role == "User" else request.args.get("email")
+    product = request.args.get("product")
+    q = performance_query(role, identity, req_email)
+    if q is None:
+        return jsonify({"status": "success", "data": []}), 200
+    t, a = DailyTracker, DailyActivity
+    q = filter_day_range(q, t.date, start_day, end_day)
+    # Rows archive_tracker has moved to daily_activity, same scope
+    archived = filter_timestamp_day_range(
+        performance_query(role, identity, req_email, model=a), a.activity_date, start_day, end_day
+    )
+    if product:
+        q = q.filter(t.product == product)
+        archived = archived.filter(a.product == product)
+    # Floats straight from the driver; Decimal construction dominates otherwise
+    q = q.with_entities(
+        getattr(t, KPI_GROUPS[group_by]), t.date, *(db.cast(getattr(t, c), db.Float) for c in KPI_COLUMNS)
+    )
+    archived = archived.with_entities(
+        getattr(a, KPI_GROUPS[group_by]), sql_day(a.activity_date),
+        *(db.cast(getattr(a, c), db.Float) for c in KPI_COLUMNS),
+    )
 
-    except Exception as e:
-        logger.exception("performance API error")
-        return jsonify({"status": "error", "message": str(e)}), 500
+    pods = allowed_pods(role, identity) if role in SCOPED_ROLES else None
+    emails = [req_email] if req_email else None
+    filters = {"start": _day(start_day), "end": _day(end_day), "group_by": group_by, "period": period, "product": product}
+    key = report_cache_key("kpis", report_scope(pods, emails), filters)
+    meta = report_cache_meta(["tracker"], pods=pods, emails=emails, start=_day(start_day), end=_day(end_day))
+    payload, hit = cached_report(key, meta, lambda: {
+        "status": "success",
+        "groupBy": group_by,
+        "period": period,
+        "data": build_kpis(q.all() + archived.all(), period),
+    })
+    resp = jsonify(payload)
+    resp.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return resp, 200
 
 # -----------------------
-# API: Team report (aggregated per-user)
+# API: Team report (aggregated in SQL)
 # -----------------------
+# group_by value -> (model attribute, response key)
+TEAM_REPORT_DIMENSIONS = {
+    "email": ("email", "email"),
+    "pod_name": ("pod_name", "podName"),
+    "product": ("product", "product"),
+    "project_name": ("project_name", "projectName"),
+}
+REPORT_PERIODS = ("day", "week", "month")
+
+def period_bucket(col, period: str):
+    """
+    SQL expression truncating a date/timestamp column to the start of its day/week/month.
+    Weeks start on Monday on both backends.
+    """
+    if db.engine.dialect.name == "postgresql":
+        return func.date_trunc(period, col)
+    if period == "day":
+        return func.date(col)
+    if period == "week":
+        return func.date(col, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", col)
+
+def _bucket_iso(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)[:10]
+
+def parse_team_report_grouping(args):
+    """
+    Returns (group_by, period) from query args; raises ValueError on unknown values.
+    """
+    raw = args.get("group_by") or "email"
+    group_by = []
+    for dim in raw.split(","):
+        dim = dim.strip()
+        if not dim:
+            continue
+        if dim not in TEAM_REPORT_DIMENSIONS:
+            raise ValueError(f"Unsupported group_by '{dim}'")
+        if dim not in group_by:
+            group_by.append(dim)
+
+    period = (args.get("period") or "").strip() or None
+    if period and period not in REPORT_PERIODS:
+        raise ValueError(f"Unsupported period '{period}'")
+    return group_by, period
+
+def team_report_rows(start_day=None, end_day=None, email=None, group_by=("email",), period=None, source="raw", pods=None):
+    """
+    Aggregate tracker rows in the database: one row per group with entries,
+    totalHours and avgDaily (hours per entry). Dates filter and bucket on the
+    tracker date; source="rollup" answers from daily_tracker_rollup instead of raw rows.
+    Raw rows include the ones archive_tracker moved to daily_activity.
+    """
+    if source == "rollup":
+        model = DailyTrackerRollup
+        entries_expr = func.coalesce(func.sum(DailyTrackerRollup.entries), 0)
+        hours_expr = func.coalesce(func.sum(DailyTrackerRollup.total_hours), 0)
+    else:
+        # Each branch filters on its own columns, so both keep their indexes and partition pruning
+        def narrow(stmt, m):
+            if email:
+                stmt = stmt.where(m.email == email)
+            if pods is not None:
+                stmt = stmt.where(m.pod_name.in_(pods))
+            return stmt
+
+        t, a = DailyTracker, DailyActivity
+        live = narrow(filter_day_range(
+            db.select(t.email, t.pod_name, t.product, t.project_name, t.date, t.dedicated_hours), t.date, start_day, end_day
+        ), t)
+        archived = narrow(filter_timestamp_day_range(
+            db.select(a.email, a.pod_name, a.product, a.project_name, sql_day(a.activity_date).label("date"),
+                      a.dedicated_hours).where(a.archived_at.isnot(None)),
+            a.activity_date, start_day, end_day,
+        ), a)
+        model = live.union_all(archived).subquery().c
+        entries_expr = func.count()
+        hours_expr = func.coalesce(func.sum(model.dedicated_hours), 0)
+
+    keys = []
+    cols = []
+    for dim in group_by:
+        attr, out_key = TEAM_REPORT_DIMENSIONS[dim]
+        keys.append(out_key)
+        cols.append(getattr(model, attr))
+
+    date_col = model.date
+    if period:
+        keys.append("period")
+        cols.append(period_bucket(date_col, period))
+
+    labelled = [c.label(f"g{i}") for i, c in enumerate(cols)]
+    q = db.session.query(*labelled, entries_expr.label("entries"), hours_expr.label("total_hours"))
+    if source == "rollup":
+        q = filter_day_range(q, date_col, start_day, end_day)
+        if email:
+            q = q.filter(model.email == email)
+        if pods is not None:
+            q = q.filter(model.pod_name.in_(pods))
+    if labelled:
+        q = q.group_by(*cols).order_by(*cols)
+
+    out = []
+    for row in q.all():
+        item = {}
+        for i, key in enumerate(keys):
+            value = row[i]
+            if key == "period":
+                value = _bucket_iso(value)
+            elif key == "email":
+                value = value or "unknown"
+            elif value == "":
+                value = None  # rollup stores NULL dimensions as ""
+            item[key] = value
+        entries = row.entries or 0
+        total = float(row.total_hours or 0)
+        item["entries"] = entries
+        item["totalHours"] = round(total, 2)
+        item["avgDaily"] = round((total / entries) if entries else 0, 2)
+        out.append(item)
+    return out
+
 @app.route("/api/team-report", methods=["GET"])
+@jwt_required()
 def api_team_report():
+    """
+    Optional query params:
+      group_by=email,pod_name,product,project_name  (default: email)
+      period=day|week|month
+      source=raw|rollup  (rollup answers from daily_tracker_rollup)
+    start_date/end_date filter on the tracker date. Users see their own rows, pod-scoped
+    roles their assigned pods (same scope as the dashboard's team section).
+    """
     try:
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
-        role = request.args.get("role", "")
-        email = request.args.get("email", "")
-
-        q = DailyTracker.query
-
-        start_dt = _parse_date(start_date)
-        end_dt = _parse_date(end_date)
-        if start_dt:
-            q = q.filter(DailyTracker.submitted_at >= start_dt)
-        if end_dt:
-            q = q.filter(DailyTracker.submitted_at <= (end_dt + timedelta(days=1) - timedelta(seconds=1)))
-
-        # Regular users only see their own aggregated report
-        if role not in ("Manager", "Admin", "Internal Admin", "Team Lead"):
-            if email:
-                q = q.filter(DailyTracker.email == email)
-            else:
-                return jsonify({"status": "error", "message": "email required for user scope"}), 400
-
-        rows = q.order_by(DailyTracker.submitted_at.desc()).all()
+        identity = get_jwt_identity()
+        role = (get_jwt() or {}).get("role", "User")
 
-        agg = {}
-        for r in rows:
-            em = r.email or "unknown"
-            if em not in agg:
-                agg[em] = {"email": em, "entries": 0, "totalHours": 0.0}
-            try:
-                h = float(r.dedicated_hours or 0)
-            except Exception:
-                h = 0.0
-            agg[em]["entries"] += 1
-            agg[em]["totalHours"] += h
+        try:
+            group_by, period = parse_team_report_grouping(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        source = request.args.get("source", "raw")
+        if source not in ("raw", "rollup"):
+            return jsonify({"status": "error", "message": f"Unsupported source '{source}'"}), 400
 
-        out = []
-        for v in agg.values():
-            out.append({
-                "email": v["email"],
-                "entries": v["entries"],
-                "totalHours": round(v["totalHours"], 2),
-                "avgDaily": round((v["totalHours"] / v["entries"]) if v["entries"] else 0, 2)
-            })
+        pods, emails = dashboard_scope(role, identity)
 
-        return jsonify({"status": "success", "data": out})
+        try:
+            start_day = parse_day(start_date)
+            end_day = parse_day(end_date)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        key = report_cache_key(
+            "team-report",
+            report_scope(pods, emails),
+            {"start": _day(start_day), "end": _day(end_day), "group_by": group_by, "period": period, "source": source},
+        )
+        meta = report_cache_meta(["tracker"], pods=pods, emails=emails, start=_day(start_day), end=_day(end_day))
+        payload, hit = cached_report(key, meta, lambda: {
+            "status": "success",
+            "data": team_report_rows(
+                start_day=start_day,
+                end_day=end_day,
+                email=emails[0] if emails else None,
+                group_by=group_by,
+                period=period,
+                source=source,
+                pods=pods,
+            ),
+        })
+        resp = jsonify(payload)
+        resp.headers["X-Cache"] = "HIT" if hit else "MISS"
+        return resp
 
     except Exception as e:
         logger.exception("team-report API error")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# -----------------------
+# Dashboard (one round trip, sub-queries in parallel)
+# -----------------------
+DASHBOARD_TIMEOUT = float(os.environ.get("DASHBOARD_TIMEOUT", "10"))
+DASHBOARD_DAYS = 30
+
+_dashboard_pool = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+
+def _dashboard_task(fn, *args):
+    """
+    Run one sub-query in its own app context, i.e. its own session and pooled connection.
+    Returns (result, elapsed ms, its RequestMetrics for the calling request to merge).
+    """
+    started = time.perf_counter()
+    sql = RequestMetrics()
+    _request_metrics.set(sql)
+    try:
+        with app.app_context():
+            result = fn(*args)
+    finally:
+        _request_metrics.set(None)
+    return result, round((time.perf_counter() - started) * 1000, 1), sql
+
+def dashboard_scope(role: str, identity: str):
+    """(pods, emails) the caller may see; None means unrestricted. Empty pods = nothing."""
+    if role == "User":
+        return None, [identity]
+    if role in SCOPED_ROLES:
+        return allowed_pods(role, identity), None
+    return None, None
+
+def _dashboard_team(pods, emails, start_day, end_day):
+    key = report_cache_key("dashboard-team", report_scope(pods, emails), {"start": _day(start_day), "end": _day(end_day)})
+    meta = report_cache_meta(["tracker"], pods=pods, emails=emails, start=_day(start_day), end=_day(end_day))
+    payload, _ = cached_report(key, meta, lambda: team_report_rows(
+        start_day=start_day, end_day=end_day, email=emails[0] if emails else None,
+        group_by=("email",), source="rollup", pods=pods,
+    ))
+    return payload
+
+def _dashboard_resources(pods, emails, start_day, end_day):
+    q = db.session.query(ResourceTable.pod_name, func.count(ResourceTable.id))
+    if pods is not None:
+        q = q.filter(ResourceTable.pod_name.in_(pods))
+    if emails is not None:
+        q = q.filter(ResourceTable.email.in_(emails))
+    q = filter_day_range(q, ResourceTable.date, start_day, end_day)
+    by_pod = {pod or "unassigned": n for pod, n in q.group_by(ResourceTable.pod_name).all()}
+    return {"total": sum(by_pod.values()), "byPod": by_pod}
+
+@app.route("/api/dashboard", methods=["GET"])
+@jwt_required()
+def get_dashboard():
+    """
+    Everything the dashboard shows in one payload: performance summary, team totals,
+    resource plan counts and filter options for the caller's scope. The sections run
+    concurrently on _dashboard_pool, so latency is the slowest one, not the sum.
+    Optional query params: start_date, end_date (default: the last 30 days).
+    A section that fails or times out comes back null with its message under "errors".
+    """
+    identity = get_jwt_identity()
+    role = (get_jwt() or {}).get("role", "User")
+    try:
+        end_day = parse_day(request.args.get("end_date")) or datetime.now(timezone.utc).date()
+        start_day = parse_day(request.args.get("start_date")) or end_day - timedelta(days=DASHBOARD_DAYS - 1)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    pods, emails = dashboard_scope(role, identity)
+    started = time.perf_counter()
+    futures = {
+        "performance": _dashboard_pool.submit(
+            _dashboard_task, performance_summary_rows, role, identity, None, start_day, end_day
+        ),
+        "team": _dashboard_pool.submit(_dashboard_task, _dashboard_team, pods, emails, start_day, end_day),
+        "resources": _dashboard_pool.submit(_dashboard_task, _dashboard_resources, pods, emails, start_day, end_day),
+        "filters": _dashboard_pool.submit(
+            _dashboard_task, filter_values_for, filter_scope(role, identity)
+        ),
+    }
+    wait(futures.values(), timeout=DASHBOARD_TIMEOUT)
+
+    data, timings, errors = {}, {}, {}
+    for name, future in futures.items():
+        data[name] = None
+        if not future.done():
+            future.cancel()
+            errors[name] = f"timed out after {DASHBOARD_TIMEOUT}s"
+            continue
+        try:
+            data[name], timings[name], sql = future.result()
+            if _request_metrics.get() is not None:
+                _request_metrics.get().merge(sql)
+        except Exception as e:
+            logger.exception(f"dashboard section '{name}' failed")
+            errors[name] = str(e)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+    return jsonify({
+        "status": "success",
+        "range": {"start": start_day.isoformat(), "end": end_day.isoformat()},
+        "data": data,
+        "errors": errors,
+        "timingsMs": timings,
+    }), 200
+
 # -----------------------
 # CORS headers
 # -----------------------
@@ -1124,7 +4249,38 @@ def add_cors_headers(response):
 # -----------------------
 # Run
 # -----------------------
+# DB_INIT_ON_STARTUP=0 skips the setup for fast scale-out when deploys run `flask --app app init-db`
+DB_INIT_ON_STARTUP = os.environ.get("DB_INIT_ON_STARTUP", "1") == "1"
+DB_STARTUP_ATTEMPTS = max(1, int(os.environ.get("DB_STARTUP_ATTEMPTS", "3")))
+
+@app.before_request
+def _note_first_request():
+    if "first_request_s" not in startup_timings:
+        startup_timings["first_request_s"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+        logger.info(f"Startup: first request {startup_timings['first_request_s']}s after import")
+
+def create_app():
+    """
+    Production entry point (wsgi.py). Runs the one-time database setup, then drops
+    its connections so preloaded gunicorn workers each start with an empty pool.
+    Setup gets DB_STARTUP_ATTEMPTS tries (each bounded by DB_CONNECT_TIMEOUT) before
+    startup fails outright, rather than leaving requests to find a broken schema.
+    """
+    started = time.perf_counter()
+    if DB_INIT_ON_STARTUP:
+        with app.app_context():
+            for attempt in range(1, DB_STARTUP_ATTEMPTS + 1):
+                if initialize_rds():
+                    break
+                if attempt == DB_STARTUP_ATTEMPTS:
+                    raise RuntimeError(f"Database initialisation failed after {attempt} attempts")
+                time.sleep(min(2 ** attempt, 10))
+            db.engine.dispose()
+    startup_timings["db_init_s"] = round(time.perf_counter() - started, 3)
+    startup_timings["ready_s"] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+    logger.info(f"Startup: ready {startup_timings['ready_s']}s after import (db init {startup_timings['db_init_s']}s)")
+    return app
+
 if __name__ == "__main__":
-    with app.app_context():
-        initialize_rds()
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    # Local development only; production serves wsgi:app under gunicorn (gunicorn.conf.py)
+    create_app().run(host="0.0.0.0", port=5000, debug=os.environ.get("FLASK_DEBUG") == "1", threaded=True)
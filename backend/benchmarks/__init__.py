@@ -0,0 +1,4 @@
+"""
+Benchmark suite: synthetic data generator (seed.py) and endpoint runner (run.py).
+Run from backend/, e.g. `python -m benchmarks.run --rows 100000`.
+"""
@@ -0,0 +1,334 @@
+"""
+Concurrent load test for the end-of-shift spike.
+
+Replays the worst hour against a running server: analysts log in, refresh their
+tokens and submit multi-project Tracker forms while managers keep opening TeamReport,
+the dashboard and the performance summary. Reports throughput, error rates and tail
+latency per operation, plus each worker's connection-pool checkout waits from
+/api/debug/pool, so WEB_CONCURRENCY, GUNICORN_THREADS and DB_POOL_SIZE/DB_MAX_OVERFLOW
+can be sized from measurements.
+
+    gunicorn -c gunicorn.conf.py wsgi:app          # in another shell
+    python -m benchmarks.load --analysts 200 --managers 10 --duration 120 --output load.json
+
+Users are created through /api/users (as the admin account) on the first run.
+Standard library only, so it runs from any machine: one thread and one keep-alive
+connection per virtual user. Pool numbers are per worker process; polls open a new
+connection each time so they land on different workers.
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+PASSWORD = "password123"
+
+
+class Client:
+    """Keep-alive JSON client for one virtual user; reconnects after connection errors."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host, self.timeout = parts.netloc, timeout
+        self.conn = None
+        self.token = None
+
+    def request(self, method: str, path: str, body=None, token=None):
+        """Returns (status, parsed JSON or None, seconds). Status 0 means the request failed."""
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        token = token or self.token
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = self.conn_cls(self.host, timeout=self.timeout)
+            self.conn.request(method, path, body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            raw = resp.read()
+            status = resp.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 0, None, time.perf_counter() - started
+        elapsed = time.perf_counter() - started
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = None
+        return status, data, elapsed
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Recorder:
+    """Latency samples and status counts per operation, shared by all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, op: str, status: int, seconds: float):
+        with self.lock:
+            self.samples[op].append(seconds)
+            self.statuses[op][status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        out = {}
+        with self.lock:
+            ops = {op: (list(s), dict(self.statuses[op])) for op, s in self.samples.items()}
+        everything = []
+        for op, (samples, statuses) in sorted(ops.items()):
+            everything += samples
+            out[op] = _stats(samples, statuses, elapsed)
+        total = defaultdict(int)
+        for _, statuses in ops.values():
+            for status, n in statuses.items():
+                total[status] += n
+        out["_total"] = _stats(everything, dict(total), elapsed)
+        return out
+
+
+def _stats(samples: list, statuses: dict, elapsed: float) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    errors = sum(n for status, n in statuses.items() if status == 0 or status >= 400)
+
+    def pct(p):
+        return round(ms[min(len(ms) - 1, int(p * len(ms)))], 2) if ms else None
+
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "errorRate": round(errors / len(ms), 4) if ms else None,
+        "throughputRps": round(len(ms) / elapsed, 2) if elapsed else None,
+        "p50Ms": pct(0.5),
+        "p95Ms": pct(0.95),
+        "p99Ms": pct(0.99),
+        "maxMs": round(ms[-1], 2) if ms else None,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+class PoolMonitor(threading.Thread):
+    """Polls /api/debug/pool; each response comes from whichever worker served it, keyed by pid."""
+
+    def __init__(self, base_url: str, token: str, interval: float, timeout: float):
+        super().__init__(daemon=True)
+        self.client = Client(base_url, timeout)
+        self.client.token = token
+        self.interval = interval
+        self.stop = threading.Event()
+        self.latest = {}
+        self.peak_checked_out = defaultdict(int)
+        self.samples = []
+
+    def poll(self, reset: bool = False):
+        status, body, _ = self.client.request("GET", "/api/debug/pool" + ("?reset=1" if reset else ""))
+        self.client.close()  # a new connection per poll, so polls spread across workers
+        if status != 200 or not body:
+            return
+        data = body["data"]
+        self.latest[data["pid"]] = data
+        self.peak_checked_out[data["pid"]] = max(self.peak_checked_out[data["pid"]], data["checkedOut"])
+        self.samples.append({"t": round(time.time(), 3), "pid": data["pid"], "checkedOut": data["checkedOut"],
+                             "overflowInUse": data["overflowInUse"], "waitP95Ms": data["wait"]["p95Ms"]})
+
+    def run(self):
+        while not self.stop.wait(self.interval):
+            self.poll()
+
+    def report(self) -> dict:
+        workers = {
+            str(pid): {**data, "peakCheckedOut": self.peak_checked_out[pid]}
+            for pid, data in sorted(self.latest.items())
+        }
+        return {"workers": workers, "samples": self.samples}
+
+
+def login(client: Client, email: str, recorder: Recorder):
+    status, body, seconds = client.request("POST", "/api/login", {"email": email, "password": PASSWORD})
+    recorder.record("login", status, seconds)
+    if status != 200:
+        return None
+    client.token = body["access_token"]
+    return body["refresh_token"]
+
+
+def ensure_users(base_url: str, admin_token: str, analysts: list, managers: list, pods: list, timeout: float):
+    """Create the synthetic accounts (409 = already there) and give managers their pods."""
+    client = Client(base_url, timeout)
+    client.token = admin_token
+    created = 0
+    for email, role, pod in [(e, "User", pods[i % len(pods)]) for i, e in enumerate(analysts)] + \
+                            [(e, "Manager", pods[i % len(pods)]) for i, e in enumerate(managers)]:
+        status, _, _ = client.request("POST", "/api/users", {
+            "email": email, "password": PASSWORD, "name": email.split("@")[0], "role": role, "pod": pod,
+        })
+        if status not in (201, 409):
+            raise RuntimeError(f"creating {email} failed with HTTP {status}")
+        created += status == 201
+    for i, email in enumerate(managers):
+        own = [pods[(i + k) % len(pods)] for k in range(2)]
+        client.request("PUT", "/api/pod-assignments", {"user": email, "role": "Manager", "pods": own})
+    client.close()
+    return created
+
+
+def analyst(args, email: str, pod: str, options: dict, deadline: float, start_delay: float, recorder: Recorder):
+    time.sleep(start_delay)
+    rng = random.Random(email)
+    client = Client(args.base_url, args.timeout)
+    refresh_token = login(client, email, recorder)
+    if refresh_token is None:
+        return
+    refreshed_at = time.monotonic()
+    while time.monotonic() < deadline:
+        if time.monotonic() - refreshed_at >= args.refresh_every:
+            status, body, seconds = client.request("POST", "/api/refresh", token=refresh_token)
+            recorder.record("refresh", status, seconds)
+            if status == 200:
+                client.token = body["access_token"]
+            refreshed_at = time.monotonic()
+        projects = [
+            {
+                "projectName": rng.choice(options["projectNames"]).strip(),
+                "natureOfWork": rng.choice(options["natureOfWork"]),
+                "task": rng.choice(options["tasks"]),
+                "dedicatedHours": str(round(rng.uniform(0.5, 4), 2)),
+                "lineMiles": str(round(rng.uniform(1, 20), 2)),
+                "benchmarkForTask": str(rng.choice([2, 3, 4, 5])),
+            }
+            for _ in range(rng.randint(1, args.max_projects))
+        ]
+        status, _, seconds = client.request("POST", "/api/tracker", {
+            "date": datetime.now(timezone.utc).date().isoformat(),
+            "podName": pod, "product": "ivms", "modeOfFunctioning": rng.choice(options["modesOfFunctioning"]),
+            "projects": projects,
+        })
+        recorder.record("tracker.submit", status, seconds)
+        time.sleep(rng.expovariate(1 / args.think_time) if args.think_time > 0 else 0)
+    client.close()
+
+
+MANAGER_VIEWS = (
+    ("team-report", "/api/team-report?group_by=email&period=day&start_date={start}"),
+    ("dashboard", "/api/dashboard"),
+    ("performance.summary", "/api/performance/summary?start_date={start}"),
+)
+
+
+def manager(args, email: str, deadline: float, start_delay: float, recorder: Recorder):
+    time.sleep(start_delay)
+    rng = random.Random(email)
+    client = Client(args.base_url, args.timeout)
+    if login(client, email, recorder) is None:
+        return
+    start = datetime.now(timezone.utc).date().replace(day=1).isoformat()
+    while time.monotonic() < deadline:
+        for op, path in MANAGER_VIEWS:
+            status, _, seconds = client.request("GET", path.format(start=start))
+            recorder.record(op, status, seconds)
+        time.sleep(rng.expovariate(1 / args.manager_think_time) if args.manager_think_time > 0 else 0)
+    client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the end-of-shift submission spike against a running server.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--analysts", type=int, default=50, help="concurrent analysts submitting Tracker forms")
+    parser.add_argument("--managers", type=int, default=5, help="concurrent managers opening reports")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after ramp-up starts")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which virtual users start")
+    parser.add_argument("--think-time", type=float, default=2.0, help="mean seconds between an analyst's submissions")
+    parser.add_argument("--manager-think-time", type=float, default=5.0)
+    parser.add_argument("--max-projects", type=int, default=4, help="projects per Tracker submission (1..N)")
+    parser.add_argument("--refresh-every", type=float, default=30, help="seconds between token refreshes")
+    parser.add_argument("--pool-interval", type=float, default=1.0, help="seconds between /api/debug/pool polls")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--admin-email", default="admin@aidash.com")
+    parser.add_argument("--admin-password", default=PASSWORD)
+    parser.add_argument("--user-prefix", default="load", help="synthetic accounts are <prefix>.analystN@bench.local")
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    admin = Client(args.base_url, args.timeout)
+    status, body, _ = admin.request("POST", "/api/login", {"email": args.admin_email, "password": args.admin_password})
+    if status != 200:
+        sys.exit(f"admin login failed (HTTP {status}); is the server running at {args.base_url}?")
+    admin_token = body["access_token"]
+    status, body, _ = admin.request("GET", "/api/ui-options", token=admin_token)
+    options = body["data"]
+    pods = options["podNames"]
+
+    analysts = [f"{args.user_prefix}.analyst{i}@bench.local" for i in range(args.analysts)]
+    managers = [f"{args.user_prefix}.manager{i}@bench.local" for i in range(args.managers)]
+    created = ensure_users(args.base_url, admin_token, analysts, managers, pods, args.timeout)
+    print(f"{created} accounts created, {len(analysts) + len(managers) - created} reused", file=sys.stderr)
+
+    recorder = Recorder()
+    monitor = PoolMonitor(args.base_url, admin_token, args.pool_interval, args.timeout)
+    for _ in range(8):  # reach as many workers as possible so every wait window starts now
+        monitor.poll(reset=True)
+    monitor.latest.clear()
+    monitor.samples.clear()
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=analyst, daemon=True, args=(
+            args, email, pods[i % len(pods)], options, deadline, args.ramp * i / max(1, len(analysts)), recorder))
+        for i, email in enumerate(analysts)
+    ] + [
+        threading.Thread(target=manager, daemon=True, args=(
+            args, email, deadline, args.ramp * i / max(1, len(managers)), recorder))
+        for i, email in enumerate(managers)
+    ]
+    monitor.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    monitor.stop.set()
+    monitor.join()
+    for _ in range(8):
+        monitor.poll()
+
+    report = {
+        "baseUrl": args.base_url,
+        "startedAt": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("admin_password", "output")},
+        "elapsedSeconds": round(elapsed, 2),
+        "operations": recorder.summary(elapsed),
+        "pool": monitor.report(),
+    }
+    for op, s in report["operations"].items():
+        print(f"{op:22} {s['requests']:7} req  {s['throughputRps'] or 0:8.1f} rps  err {s['errorRate'] or 0:6.2%}  "
+              f"p50 {s['p50Ms'] or 0:8.1f}  p95 {s['p95Ms'] or 0:8.1f}  p99 {s['p99Ms'] or 0:8.1f} ms", file=sys.stderr)
+    for pid, w in report["pool"]["workers"].items():
+        wait = w["wait"]
+        print(f"worker {pid}: pool {w['poolSize']}+{w['maxOverflow']}, peak checked out {w['peakCheckedOut']}, "
+              f"waits {wait['waited']}/{wait['checkouts']} (p95 {wait['p95Ms']} ms, max {wait['maxMs']} ms, "
+              f"{wait['timeouts']} timeouts)", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Synthetic data for benchmarks.
+
+Seeds users_table, pod_assignments, daily_tracker_table, daily_activity and
+resource_planning_table at a configurable scale. Pods, products, projects, natures of
+work and tasks come from metadata.json with skewed (Zipf-like) weights, so a few
+projects dominate as they do in production. Output is reproducible for a given --seed.
+
+    python -m benchmarks.seed --database-url sqlite:////tmp/bench.db --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_PASSWORD = "password123"
+
+# Share of tracker rows per product; anything in metadata.json not listed gets the remainder
+PRODUCT_WEIGHTS = {"ivms": 0.35, "aims": 0.2, "ISMS": 0.15, "imagery": 0.1, "Vendor poc": 0.08, "IEMS": 0.07, "RSMS": 0.05}
+ROLE_WEIGHTS = {"User": 0.9, "Team Lead": 0.06, "Manager": 0.04}
+
+
+def load_app(database_url=None):
+    """
+    Import the Flask app against `database_url` (default: a temporary SQLite file)
+    and run its one-time setup. Returns the app module.
+    """
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    elif "DATABASE_URL" not in os.environ:
+        import tempfile
+        fd, path = tempfile.mkstemp(prefix="ivms-bench-", suffix=".db")
+        os.close(fd)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-" + "x" * 32)
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    import app as backend
+    backend.create_app()
+    return backend
+
+
+def _zipf_weights(n: int, s: float = 1.1):
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+class Catalog:
+    """Dimension values and their sampling weights, taken from metadata.json."""
+
+    def __init__(self, metadata_path):
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            options = json.load(f)["uiOptions"]
+        self.pods = [p for p in options["podNames"]]
+        self.modes = options["modesOfFunctioning"]
+        self.products = options["products"]
+        self.projects = [p.strip() for p in options["projectNames"]]
+        self.natures = options["natureOfWork"]
+        self.tasks = options["tasks"]
+        known = sum(PRODUCT_WEIGHTS.get(p, 0) for p in self.products)
+        rest = [p for p in self.products if p not in PRODUCT_WEIGHTS]
+        w = np.array([PRODUCT_WEIGHTS.get(p, (1 - known) / max(1, len(rest))) for p in self.products], dtype=float)
+        self.product_w = w / w.sum()
+        self.pod_w = _zipf_weights(len(self.pods), 0.6)
+        self.project_w = _zipf_weights(len(self.projects))
+        self.nature_w = _zipf_weights(len(self.natures))
+        self.task_w = _zipf_weights(len(self.tasks), 0.8)
+
+
+def _pick(rng, values, weights, n):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights)]
+
+
+def _weekday_days(rng, first: date, days: int, n: int):
+    """Random days in [first, first + days), weekdays five times likelier than weekends."""
+    offsets = np.arange(days)
+    weekday = np.array([(first + timedelta(int(o))).weekday() < 5 for o in offsets])
+    w = np.where(weekday, 5.0, 1.0)
+    picked = rng.choice(offsets, size=n, p=w / w.sum())
+    return [first + timedelta(int(o)) for o in picked.tolist()]
+
+
+def _hours(rng, n, mean=4.0):
+    return np.clip(np.round(rng.gamma(4.0, mean / 4.0, n) * 4) / 4, 0.25, 12.0)
+
+
+def _maybe(mask, values):
+    return [v if m else None for v, m in zip(values.tolist(), mask.tolist())]
+
+
+def make_users(catalog: Catalog, count: int, rng):
+    """Synthetic users (email, role, home pod) plus the default seed accounts."""
+    roles = _pick(rng, list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values()), count)
+    pods = _pick(rng, catalog.pods, catalog.pod_w, count)
+    users = [
+        {"id": f"bench-user-{i}", "email": f"bench.user{i}@bench.local", "name": f"Bench User {i}",
+         "role": str(roles[i]), "pod_name": str(pods[i])}
+        for i in range(count)
+    ]
+    # The default accounts the runner logs in with also get data and pods
+    users += [
+        {"email": "user1@aidash.com", "role": "User", "pod_name": catalog.pods[0]},
+        {"email": "user2@aidash.com", "role": "User", "pod_name": catalog.pods[1 % len(catalog.pods)]},
+    ]
+    return users
+
+
+def tracker_chunk(catalog: Catalog, users, first: date, days: int, start_index: int, n: int, rng):
+    """`n` daily_tracker_table rows with product-specific output columns filled in."""
+    who = rng.integers(0, len(users), n)
+    products = _pick(rng, catalog.products, catalog.product_w, n)
+    hours = _hours(rng, n)
+    is_ivms = products == "ivms"
+    is_aims = products == "aims"
+    is_isms = products == "ISMS"
+    benchmark = rng.choice([2.0, 3.0, 4.0, 5.0], n)
+    line_miles = np.round(hours * benchmark * rng.lognormal(0, 0.25, n), 2)
+    split = is_ivms & (rng.random(n) < 0.3)
+    h1v1_hours = np.round(hours * 0.5, 2)
+    conductor_lines = np.round(hours * rng.normal(6, 1.5, n).clip(0.5), 2)
+    area = np.round(hours * rng.lognormal(-0.2, 0.4, n), 2)
+    polygons, polylines, points = (rng.poisson(lam * hours) for lam in (6, 3, 10))
+    days_picked = _weekday_days(rng, first, days, n)
+    rows = [
+        {"id": f"bench-trk-{start_index + i}", "email": users[u]["email"], "date": d, "pod_name": users[u]["pod_name"]}
+        for i, (u, d) in enumerate(zip(who.tolist(), days_picked))
+    ]
+    cols = {
+        "mode_of_functioning": _pick(rng, catalog.modes, None, n).tolist(),
+        "product": products.tolist(),
+        "project_name": _pick(rng, catalog.projects, catalog.project_w, n).tolist(),
+        "nature_of_work": _pick(rng, catalog.natures, catalog.nature_w, n).tolist(),
+        "task": _pick(rng, catalog.tasks, catalog.task_w, n).tolist(),
+        "dedicated_hours": hours.tolist(),
+        "benchmark_for_task": _maybe(is_ivms, benchmark),
+        "line_miles": _maybe(is_ivms, line_miles),
+        "line_miles_h1v1": _maybe(split, np.round(line_miles * 0.6, 2)),
+        "dedicated_hours_h1v1": _maybe(split, h1v1_hours),
+        "line_miles_h1v0": _maybe(split, np.round(line_miles * 0.4, 2)),
+        "dedicated_hours_h1v0": _maybe(split, hours - h1v1_hours),
+        "conductor_lines": _maybe(is_aims, conductor_lines),
+        "number_of_points": _maybe(is_aims, np.round(conductor_lines * rng.normal(5, 1, n).clip(1), 2)),
+        "area_hectares": _maybe(is_isms, area),
+        "polygon_feature_count": _maybe(is_isms, polygons),
+        "polyline_feature_count": _maybe(is_isms, polylines),
+        "point_feature_count": _maybe(is_isms, points),
+        "spent_hours_on_above_task": _maybe(is_isms, np.round(hours * 0.9, 2)),
+    }
+    for name, values in cols.items():
+        for row, v in zip(rows, values):
+            row[name] = v
+    for row in rows:
+        row["remarks"] = None
+        row["submitted_at"] = datetime.combine(row["date"], dt_time(18), tzinfo=timezone.utc)
+    return rows
+
+
+def activity_chunk(catalog: Catalog, users, first: date, days: int, start_index: int, n: int, rng, columns):
+    """`n` legacy daily_activity rows (every column present, as the COPY path expects)."""
+    who = rng.integers(0, len(users), n).tolist()
+    products = _pick(rng, catalog.products, catalog.product_w, n)
+    hours = _hours(rng, n)
+    is_ivms = products == "ivms"
+    line_miles = np.round(hours * rng.uniform(2, 5, n), 2)
+    days_picked = _weekday_days(rng, first, days, n)
+    values = {
+        "mode_of_functioning": _pick(rng, catalog.modes, None, n).tolist(),
+        "product": products.tolist(),
+        "project_name": _pick(rng, catalog.projects, catalog.project_w, n).tolist(),
+        "nature_of_work": _pick(rng, catalog.natures, catalog.nature_w, n).tolist(),
+        "task": _pick(rng, catalog.tasks, catalog.task_w, n).tolist(),
+        "dedicated_hours": hours.tolist(),
+        "line_miles": _maybe(is_ivms, line_miles),
+    }
+    rows = []
+    for i in range(n):
+        u = users[who[i]]
+        row = {c.name: None for c in columns}
+        row.update({name: v[i] for name, v in values.items()})
+        at = datetime.combine(days_picked[i], dt_time(18))
+        row.update({
+            "id": f"bench-act-{start_index + i}",
+            "email": u["email"],
+            "name": u.get("name") or u["email"],
+            "pod_name": u["pod_name"],
+            "activity_date": at,
+            "created_at": at.isoformat(),
+        })
+        rows.append(row)
+    return rows
+
+
+def resource_chunk(catalog: Catalog, users, first: date, days: int, start_index: int, n: int, rng):
+    who = rng.integers(0, len(users), n).tolist()
+    days_picked = _weekday_days(rng, first, days, n)
+    modes = _pick(rng, catalog.modes, None, n).tolist()
+    products = _pick(rng, catalog.products, catalog.product_w, n).tolist()
+    projects = _pick(rng, catalog.projects, catalog.project_w, n).tolist()
+    natures = _pick(rng, catalog.natures, catalog.nature_w, n).tolist()
+    tasks = _pick(rng, catalog.tasks, catalog.task_w, n).tolist()
+    return [
+        {
+            "id": f"bench-res-{start_index + i}",
+            "email": users[who[i]]["email"],
+            "date": days_picked[i],
+            "pod_name": users[who[i]]["pod_name"],
+            "mode_of_functioning": modes[i],
+            "product": products[i],
+            "project_name": projects[i],
+            "nature_of_work": natures[i],
+            "task": tasks[i],
+            "submitted_at": datetime.combine(days_picked[i], dt_time(9), tzinfo=timezone.utc),
+        }
+        for i in range(n)
+    ]
+
+
+def _ensure_month_partitions(backend, first: date, last: date):
+    """Create monthly partitions up front so bulk rows never land in the DEFAULT partition."""
+    for table, column in backend.PARTITIONED_TABLES.items():
+        if not backend.is_partitioned(table):
+            continue
+        month = backend._month_start(first)
+        while month <= last:
+            backend.create_month_partition(table, column, month)
+            month = backend._next_month(month)
+    backend.db.session.commit()
+
+
+def _timed_chunks(label, total, chunk_size, write):
+    """Call write(start, n) per chunk; returns the table's timing summary."""
+    started = time.perf_counter()
+    done = 0
+    while done < total:
+        n = min(chunk_size, total - done)
+        write(done, n)
+        done += n
+        if done % (chunk_size * 20) == 0 or done == total:
+            print(f"  {label}: {done:,}/{total:,}", file=sys.stderr)
+    seconds = time.perf_counter() - started
+    return {"rows": total, "seconds": round(seconds, 3), "rowsPerSec": round(total / seconds, 1) if seconds else None}
+
+
+def seed_database(backend, rows: int, activity_rows=None, resource_rows=None, users=None,
+                  days: int = 365, seed: int = 0, chunk_size: int = 5000, disposable_users: int = 0) -> dict:
+    """
+    Fill an empty database. `rows` tracker rows over the last `days` days, activity rows
+    over the `days` before that, resource plans around today. Returns per-table timings.
+    Raises RuntimeError when daily_tracker_table already has rows.
+    """
+    db = backend.db
+    rng = np.random.default_rng(seed)
+    catalog = Catalog(backend.METADATA_PATH)
+    activity_rows = rows if activity_rows is None else activity_rows
+    resource_rows = max(1, rows // 10) if resource_rows is None else resource_rows
+    users = max(50, rows // 2000) if users is None else users
+    today = datetime.now(timezone.utc).date()
+    tracker_first = today - timedelta(days=days - 1)
+    activity_first = tracker_first - timedelta(days=days)
+    report = {}
+
+    with backend.app.app_context():
+        if db.session.query(backend.DailyTracker.id).first() is not None:
+            raise RuntimeError("daily_tracker_table is not empty; seed an empty database or reuse it with --skip-seed")
+        _ensure_month_partitions(backend, activity_first, today)
+
+        people = make_users(catalog, users, rng)
+        started = time.perf_counter()
+        hashed = backend.generate_password_hash(BENCH_PASSWORD, backend.PASSWORD_HASH_METHOD)
+        synthetic = [dict(u, password=hashed) for u in people if "id" in u]
+        synthetic += [
+            {"id": f"bench-disposable-{i}", "email": f"bench.disposable{i}@bench.local", "name": f"Disposable {i}",
+             "role": "User", "pod_name": None, "password": hashed}
+            for i in range(disposable_users)
+        ]
+        db.session.execute(backend.User.__table__.insert(), synthetic)
+        assignments = [
+            {"user_key": backend.user_key_from_email(u["email"]), "role": u["role"], "pod_name": u["pod_name"]}
+            for u in people if u["role"] in backend.SCOPED_ROLES
+        ]
+        # The default manager1/lead1 accounts see the metadata.json pods the data uses
+        assignments += [
+            {"user_key": "manager1", "role": "Manager", "pod_name": pod} for pod in catalog.pods[:2]
+        ] + [{"user_key": "lead1", "role": "Team Lead", "pod_name": catalog.pods[0]}]
+        existing = {
+            tuple(r) for r in db.session.query(
+                backend.PodAssignment.user_key, backend.PodAssignment.role, backend.PodAssignment.pod_name
+            )
+        }
+        assignments = [a for a in assignments if (a["user_key"], a["role"], a["pod_name"]) not in existing]
+        db.session.execute(backend.PodAssignment.__table__.insert(), assignments)
+        db.session.commit()
+        seconds = time.perf_counter() - started
+        report["users"] = {"rows": len(synthetic), "podAssignments": len(assignments), "seconds": round(seconds, 3)}
+
+        def write_tracker(start, n):
+            db.session.execute(
+                backend.DailyTracker.__table__.insert(),
+                tracker_chunk(catalog, people, tracker_first, days, start, n, rng),
+            )
+            db.session.commit()
+
+        columns = backend._activity_columns()
+
+        def write_activity(start, n):
+            backend._write_activity_chunk(
+                activity_chunk(catalog, people, activity_first, days, start, n, rng, columns), columns
+            )
+            db.session.commit()
+
+        def write_resource(start, n):
+            db.session.execute(
+                backend.ResourceTable.__table__.insert(),
+                resource_chunk(catalog, people, today - timedelta(days=89), 120, start, n, rng),
+            )
+            db.session.commit()
+
+        report["daily_tracker_table"] = _timed_chunks("daily_tracker_table", rows, chunk_size, write_tracker)
+        report["daily_activity"] = _timed_chunks("daily_activity", activity_rows, chunk_size, write_activity)
+        report["resource_planning_table"] = _timed_chunks("resource_planning_table", resource_rows, chunk_size, write_resource)
+
+        started = time.perf_counter()
+        rollup_rows = backend.rebuild_rollup()
+        report["daily_tracker_rollup"] = {"rows": rollup_rows, "seconds": round(time.perf_counter() - started, 3)}
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute(backend.text("ANALYZE"))
+            db.session.commit()
+        backend.report_cache.clear()
+        backend.scope_cache.clear()
+        backend.reset_filter_values()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic benchmark data.")
+    parser.add_argument("--database-url", help="SQLAlchemy URL (default: $DATABASE_URL or a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000, help="daily_tracker_table rows (10k to 10M)")
+    parser.add_argument("--activity-rows", type=int, help="daily_activity rows (default: --rows)")
+    parser.add_argument("--resource-rows", type=int, help="resource_planning_table rows (default: --rows / 10)")
+    parser.add_argument("--users", type=int, help="synthetic users (default: max(50, rows / 2000))")
+    parser.add_argument("--days", type=int, default=365, help="days of tracker history")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    backend = load_app(args.database_url)
+    report = seed_database(
+        backend, args.rows, args.activity_rows, args.resource_rows, args.users,
+        days=args.days, seed=args.seed, chunk_size=args.chunk_size,
+    )
+    with backend.app.app_context():
+        url = backend.db.engine.url.render_as_string(hide_password=True)
+    print(json.dumps({"databaseUrl": url, "seed": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
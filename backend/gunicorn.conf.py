@@ -0,0 +1,61 @@
+"""
+Gunicorn settings for the backend (see wsgi.py).
+
+Threaded workers, so one slow report only ties up a single thread rather than the
+whole box. The app is preloaded in the master (one-time DB setup runs once) and
+forked into WEB_CONCURRENCY workers; app.py sizes each worker's connection pool
+from WEB_CONCURRENCY, GUNICORN_THREADS and DB_MAX_CONNECTIONS.
+"""
+import multiprocessing
+import os
+
+# Exported before the app is preloaded so app.py's pool sizing sees the same numbers
+workers = int(os.environ.setdefault("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 9))))
+threads = int(os.environ.setdefault("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Never share the master's pooled sockets with a child; close=False leaves them to the parent
+    from app import app, db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Refuse new writes from the moment SIGTERM arrives, not after the grace period:
+    # gthread keeps serving open connections while in-flight requests finish
+    import signal
+
+    from app import inflight_writes
+
+    handle_exit = worker.handle_exit
+
+    def on_term(sig, frame):
+        inflight_writes.stop_accepting()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, on_term)
+    signal.siginterrupt(signal.SIGTERM, False)
+
+
+def worker_exit(server, worker):
+    # Runs after gthread's graceful wait; anything still counted was cut off
+    from app import inflight_writes
+
+    if inflight_writes.pending:
+        server.log.warning(f"Worker {worker.pid} exiting with {inflight_writes.pending} write(s) unfinished")
@@ -0,0 +1,91 @@
+"""
+Route-level tests against a throwaway SQLite database. Run from backend/:
+
+    python -m pytest -q
+
+The app binds its engine at import, so the environment is set before importing it.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DB_DIR = tempfile.mkdtemp(prefix="ivms-tests-")
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "test.db")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-" + "x" * 32)
+os.environ["HASH_WORKERS"] = "0"  # hash inline; no process pool in tests
+os.environ["PASSWORD_HASH_METHOD"] = "pbkdf2:sha256:1000"
+os.environ.pop("REPORT_CACHE_URL", None)
+sys.path.insert(0, BACKEND_DIR)
+
+import app as ivms  # noqa: E402
+
+PASSWORD = "password123"
+
+
+@pytest.fixture(scope="session")
+def app():
+    ivms.create_app()
+    ivms.app.config["TESTING"] = True
+    return ivms.app
+
+
+@pytest.fixture(autouse=True)
+def clean_state(app):
+    """Every test starts with no activity/tracker rows, no pod assignments and empty caches."""
+    with app.app_context():
+        for model in (ivms.DailyTracker, ivms.DailyTrackerRollup, ivms.TrackerSubmission,
+                      ivms.DailyActivity, ivms.PodAssignment):
+            model.query.delete()
+        ivms.db.session.commit()
+    ivms.report_cache.clear()
+    ivms.scope_cache.clear()
+    ivms.claims_cache.clear()
+    ivms.reset_filter_values()
+    yield
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    """login(email) -> Authorization headers for one of the seeded accounts."""
+    def _login(email):
+        resp = client.post("/api/login", json={"email": email, "password": PASSWORD})
+        assert resp.status_code == 200, resp.get_json()
+        return {"Authorization": "Bearer " + resp.get_json()["access_token"]}
+    return _login
+
+
+@pytest.fixture
+def assign_pods(app):
+    """assign_pods(email, role, pods): write pod_assignments rows directly, as another worker would."""
+    def _assign(email, role, pods):
+        with app.app_context():
+            key = ivms.user_key_from_email(email)
+            for pod in pods:
+                ivms.db.session.add(ivms.PodAssignment(user_key=key, role=role, pod_name=pod))
+            ivms.db.session.commit()
+            ivms.bump_generation("pod_assignments")
+    return _assign
+
+
+@pytest.fixture
+def add_activity(app):
+    """add_activity(id, email, pod, day, hours): insert a daily_activity row."""
+    def _add(row_id, email, pod, day, hours=1):
+        from datetime import datetime
+        with app.app_context():
+            ivms.db.session.add(ivms.DailyActivity(
+                id=row_id, email=email, name=email.split("@")[0], pod_name=pod, product="ivms",
+                project_name="BNG-AI", dedicated_hours=hours,
+                activity_date=datetime.fromisoformat(day + "T10:00:00"),
+            ))
+            ivms.db.session.commit()
+    return _add
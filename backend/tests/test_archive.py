@@ -0,0 +1,88 @@
+"""archive_tracker keeps every tracker column and leaves the aggregates unchanged."""
+import json
+from datetime import date, timedelta
+
+import app as ivms
+
+OLD_DAY = (date.today() - timedelta(days=ivms.ARCHIVE_AFTER_DAYS + 10)).isoformat()
+RANGE = f"start_date={OLD_DAY}&end_date={OLD_DAY}"
+
+
+def _submit(client, headers):
+    resp = client.post("/api/tracker", headers=headers, json={
+        "date": OLD_DAY, "podName": "POD-1 (Aryabhata)", "product": "isms",
+        "projects": [{"projectName": "SITE-A", "dedicatedHours": "5", "siteName": "North",
+                      "areaHectares": "2", "polygonFeatureCount": "30", "pointFeatureCount": "10",
+                      "spentHoursOnAboveTask": "4"}],
+    })
+    assert resp.status_code == 201, resp.get_json()
+
+
+def _aggregates(client, admin, manager):
+    return {
+        "raw": client.get(f"/api/team-report?{RANGE}", headers=manager).get_json()["data"],
+        "rollup": client.get(f"/api/team-report?{RANGE}&source=rollup", headers=manager).get_json()["data"],
+        "kpis": client.get(f"/api/performance/kpis?{RANGE}", headers=admin).get_json()["data"],
+        "timeseries": client.get(f"/api/performance/timeseries?{RANGE}", headers=admin).get_json()["data"]["series"],
+    }
+
+
+def test_archive_keeps_product_fields_and_aggregates(app, client, login, assign_pods):
+    assign_pods("manager1@aidash.com", "Manager", ["POD-1 (Aryabhata)"])
+    admin, manager = login("admin@aidash.com"), login("manager1@aidash.com")
+    _submit(client, login("user1@aidash.com"))
+    before = _aggregates(client, admin, manager)
+    assert before["raw"][0]["totalHours"] == 5.0
+    assert before["kpis"][0]["featuresPerHectare"] == 20.0
+
+    with app.app_context():
+        summary = ivms.archive_tracker()
+        assert summary["moved"] == 1
+        assert ivms.DailyTracker.query.count() == 0
+        row = ivms.DailyActivity.query.one()
+        assert row.archived_at is not None
+        assert row.site_name == "North"
+        assert float(row.area_hectares) == 2 and float(row.polygon_feature_count) == 30
+        assert float(row.spent_hours_on_above_task) == 4
+        assert row.submission_id is not None
+    ivms.report_cache.clear()
+
+    assert _aggregates(client, admin, manager) == before
+
+    with app.app_context():
+        ivms.rebuild_rollup()
+    ivms.report_cache.clear()
+    assert _aggregates(client, admin, manager) == before
+
+
+def test_editing_archived_row_updates_rollup(app, client, login, assign_pods):
+    assign_pods("manager1@aidash.com", "Manager", ["POD-1 (Aryabhata)"])
+    admin, manager = login("admin@aidash.com"), login("manager1@aidash.com")
+    _submit(client, login("user1@aidash.com"))
+    with app.app_context():
+        ivms.archive_tracker()
+        row_id = ivms.DailyActivity.query.one().id
+
+    resp = client.put("/api/daily_activity/edit", headers=admin, json={"id": row_id, "dedicated_hours": "8"})
+    assert resp.status_code == 200
+    rollup = client.get(f"/api/team-report?{RANGE}&source=rollup", headers=manager).get_json()["data"]
+    assert rollup[0]["totalHours"] == 8.0
+
+
+def test_performance_list_and_export_include_archived_rows(app, client, login):
+    user = login("user1@aidash.com")
+    _submit(client, user)
+    live = client.get(f"/api/performance?{RANGE}", headers=user).get_json()["data"]
+    export = client.get(f"/api/performance/export?{RANGE}&format=ndjson", headers=user)
+    before = [json.loads(line) for line in export.get_data(as_text=True).splitlines()]
+    assert len(live) == len(before) == 1
+
+    with app.app_context():
+        ivms.archive_tracker()
+
+    assert client.get(f"/api/performance?{RANGE}", headers=user).get_json()["data"] == live
+    export = client.get(f"/api/performance/export?{RANGE}&format=ndjson", headers=user)
+    after = [json.loads(line) for line in export.get_data(as_text=True).splitlines()]
+    assert after == before
+    csv_lines = client.get(f"/api/performance/export?{RANGE}&format=csv", headers=user).get_data(as_text=True).splitlines()
+    assert len(csv_lines) == 2 and csv_lines[0].startswith("id,email,date,")
@@ -0,0 +1,81 @@
+"""/api/refresh answers from the claims cache; writes to a user drop its entry."""
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask_jwt_extended import decode_token
+
+import app as ivms
+
+EMAIL = "claims.test@aidash.com"
+PASSWORD = "password123"
+
+
+@pytest.fixture
+def account(app, client, login):
+    resp = client.post("/api/users", headers=login("admin@aidash.com"), json={
+        "email": EMAIL, "password": PASSWORD, "name": "Claims Test", "role": "User",
+    })
+    assert resp.status_code == 201
+    with app.app_context():
+        user_id = ivms.User.query.filter_by(email=EMAIL).one().id
+    yield user_id
+    with app.app_context():
+        ivms.User.query.filter_by(email=EMAIL).delete()
+        ivms.db.session.commit()
+
+
+def _refresh(client, refresh_token):
+    return client.post("/api/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+
+def _role(app, resp):
+    with app.app_context():
+        return decode_token(resp.get_json()["access_token"])["role"]
+
+
+def _set_role(app, role):
+    """Change the row behind the app's back, as another worker or a SQL console would."""
+    with app.app_context():
+        ivms.User.query.filter_by(email=EMAIL).update({"role": role})
+        ivms.db.session.commit()
+
+
+def test_refresh_is_served_from_the_cache(app, client, account):
+    refresh = client.post("/api/login", json={"email": EMAIL, "password": PASSWORD}).get_json()["refresh_token"]
+    assert ivms.claims_cache.get(EMAIL)["role"] == "User"  # login primes the entry
+
+    _set_role(app, "Manager")
+    assert _role(app, _refresh(client, refresh)) == "User"  # cached until the TTL or a write through the API
+
+    ivms.claims_cache.delete(EMAIL)
+    assert _role(app, _refresh(client, refresh)) == "Manager"
+
+
+def test_delete_drops_the_entry(client, login, account):
+    refresh = client.post("/api/login", json={"email": EMAIL, "password": PASSWORD}).get_json()["refresh_token"]
+    assert _refresh(client, refresh).status_code == 200
+
+    assert client.delete(f"/api/users/{account}", headers=login("admin@aidash.com")).status_code == 200
+    assert ivms.claims_cache.get(EMAIL) is None
+    resp = _refresh(client, refresh)
+    assert resp.status_code == 401
+    assert resp.get_json()["message"] == "User not found"
+
+
+def test_password_reset_drops_the_entry(app, client, account):
+    refresh = client.post("/api/login", json={"email": EMAIL, "password": PASSWORD}).get_json()["refresh_token"]
+    raw = secrets.token_urlsafe(32)
+    with app.app_context():
+        ivms.db.session.add(ivms.PasswordResetToken(
+            id=str(uuid.uuid4()), user_id=account, token_hash=ivms.sha256_hex(raw),
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+        ))
+        ivms.db.session.commit()
+    _set_role(app, "Manager")
+
+    resp = client.post("/api/reset-password", json={"token": raw, "new_password": "another-password"})
+    assert resp.status_code == 200
+    assert ivms.claims_cache.get(EMAIL) is None
+    assert _role(app, _refresh(client, refresh)) == "Manager"
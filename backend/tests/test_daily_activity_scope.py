@@ -0,0 +1,51 @@
+"""RBAC scope of the /api/daily_activity routes comes from the JWT, never the query string."""
+import json
+
+
+def _export_ids(resp):
+    assert resp.status_code == 200
+    return sorted(json.loads(line)["id"] for line in resp.get_data(as_text=True).splitlines() if line)
+
+
+def test_user_export_ignores_role_and_email_overrides(client, login, add_activity):
+    add_activity("a-own", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("a-other", "user2@aidash.com", "POD-2 (Crawlers)", "2025-01-02")
+    headers = login("user1@aidash.com")
+
+    resp = client.get("/api/daily_activity/export?format=ndjson&role=Admin&email=admin@aidash.com", headers=headers)
+    assert _export_ids(resp) == ["a-own"]
+
+    resp = client.get("/api/daily_activity/export?format=ndjson&email=user2@aidash.com", headers=headers)
+    assert _export_ids(resp) == ["a-own"]
+
+
+def test_user_list_ignores_role_override(client, login, add_activity):
+    add_activity("a-own", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("a-other", "user2@aidash.com", "POD-2 (Crawlers)", "2025-01-02")
+    headers = login("user1@aidash.com")
+
+    resp = client.get("/api/daily_activity?role=Admin", headers=headers)
+    assert resp.status_code == 200
+    assert [row["id"] for row in resp.get_json()["data"]] == ["a-own"]
+
+
+def test_manager_export_limited_to_assigned_pods(client, login, add_activity, assign_pods):
+    add_activity("a-pod1", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("a-pod2", "user2@aidash.com", "POD-2 (Crawlers)", "2025-01-02")
+    assign_pods("manager1@aidash.com", "Manager", ["POD-1 (Aryabhata)"])
+    headers = login("manager1@aidash.com")
+
+    resp = client.get("/api/daily_activity/export?format=ndjson&role=Admin", headers=headers)
+    assert _export_ids(resp) == ["a-pod1"]
+
+
+def test_date_range_includes_whole_end_day(client, login, add_activity):
+    add_activity("a-before", "user1@aidash.com", "POD-1 (Aryabhata)", "2024-12-31")
+    add_activity("a-end", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-31")  # 10:00 on the end day
+    add_activity("a-after", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-02-01")
+    headers = login("user1@aidash.com")
+
+    resp = client.get("/api/daily_activity?start_date=2025-01-01&end_date=2025-01-31", headers=headers)
+    assert [row["id"] for row in resp.get_json()["data"]] == ["a-end"]
+
+    assert client.get("/api/daily_activity?start_date=soon", headers=headers).status_code == 400
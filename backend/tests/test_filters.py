@@ -0,0 +1,29 @@
+"""/api/daily_activity/filters requires a login and scopes ?source=data by the JWT."""
+
+
+def test_filters_require_login(client):
+    assert client.get("/api/daily_activity/filters").status_code == 401
+    assert client.get("/api/daily_activity/filters?source=data&role=Admin").status_code == 401
+
+
+def test_data_values_limited_to_manager_pods(client, login, add_activity, assign_pods):
+    add_activity("a-pod1", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("a-pod2", "user2@aidash.com", "POD-2 (Crawlers)", "2025-01-02")
+    assign_pods("manager1@aidash.com", "Manager", ["POD-1 (Aryabhata)"])
+
+    resp = client.get("/api/daily_activity/filters?source=data&role=Admin", headers=login("manager1@aidash.com"))
+    assert resp.status_code == 200
+    assert resp.get_json()["podNames"] == ["POD-1 (Aryabhata)"]
+
+
+def test_data_values_for_user_are_their_own_rows(client, login, add_activity):
+    add_activity("a-own", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("a-other", "user2@aidash.com", "POD-2 (Crawlers)", "2025-01-02")
+
+    # warm the unrestricted entry first: the user's request must not be served from it
+    admin = client.get("/api/daily_activity/filters?source=data", headers=login("admin@aidash.com"))
+    assert admin.get_json()["podNames"] == ["POD-1 (Aryabhata)", "POD-2 (Crawlers)"]
+
+    resp = client.get("/api/daily_activity/filters?source=data&role=Admin&email=admin@aidash.com",
+                      headers=login("user1@aidash.com"))
+    assert resp.get_json()["podNames"] == ["POD-1 (Aryabhata)"]
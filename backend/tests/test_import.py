@@ -0,0 +1,69 @@
+"""/api/daily_activity/import: coercion, rejected rows and chunked commits."""
+import io
+import json
+from decimal import Decimal
+
+import app as ivms
+
+CSV = (
+    "id,email,pod_name,product,project_name,dedicated_hours,activity_date\n"
+    "imp-1,user1@aidash.com,POD-1 (Aryabhata),ivms,BNG-AI,2.5,2025-01-02T10:00:00\n"
+    "imp-2,,POD-1 (Aryabhata),ivms,BNG-AI,1,2025-01-02\n"
+    "imp-3,user2@aidash.com,POD-2 (Crawlers),ivms,BNG-AI,abc,2025-01-03\n"
+    "imp-4,user2@aidash.com,POD-2 (Crawlers),ivms,BNG-AI,1,soon\n"
+)
+
+
+def _import(client, headers, body, fmt, **params):
+    return client.post("/api/daily_activity/import", headers=headers, data=body,
+                       query_string={"format": fmt, **params})
+
+
+def test_csv_import_rejects_bad_rows_and_keeps_good_ones(app, client, login):
+    resp = _import(client, login("admin@aidash.com"), CSV, "csv")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert (body["imported"], body["rejected"]) == (2, 2)
+    # CSV line numbers count the header
+    assert body["errors"] == [
+        {"line": 3, "error": "email is required"},
+        {"line": 5, "error": "invalid activity_date 'soon'"},
+    ]
+    with app.app_context():
+        rows = {r.id: r for r in ivms.DailyActivity.query.all()}
+    assert sorted(rows) == ["imp-1", "imp-3"]
+    assert rows["imp-1"].dedicated_hours == Decimal("2.50")
+    assert rows["imp-3"].dedicated_hours is None  # unparseable numbers become NULL, as in submit_tracker
+
+
+def test_ndjson_import_accepts_camel_case_and_reports_bad_lines(app, client, login):
+    lines = [
+        json.dumps({"email": "user1@aidash.com", "podName": "POD-1 (Aryabhata)", "dedicatedHours": "3",
+                    "activityDate": "2025-01-04"}),
+        "{not json",
+        json.dumps(["a", "list"]),
+        "",
+        json.dumps({"Email": "user2@aidash.com", "Project Name": "SITE-A"}),
+    ]
+    resp = _import(client, login("admin@aidash.com"), "\n".join(lines) + "\n", "ndjson", chunk_size=1)
+    body = resp.get_json()
+    assert (body["imported"], body["rejected"]) == (2, 2)
+    assert [e["line"] for e in body["errors"]] == [2, 3]
+    with app.app_context():
+        rows = ivms.DailyActivity.query.order_by(ivms.DailyActivity.email).all()
+        assert [(r.email, r.pod_name, r.project_name) for r in rows] == [
+            ("user1@aidash.com", "POD-1 (Aryabhata)", None),
+            ("user2@aidash.com", None, "SITE-A"),
+        ]
+        assert all(r.id for r in rows)  # generated when missing
+
+
+def test_import_is_admin_only_and_checks_format(client, login):
+    assert _import(client, login("user1@aidash.com"), CSV, "csv").status_code == 403
+    assert _import(client, login("admin@aidash.com"), CSV, "xml").status_code == 400
+
+
+def test_error_list_is_capped(app):
+    with app.app_context():
+        summary = ivms.import_daily_activity(io.StringIO("id,email\n" + "x,\n" * 30), "csv", max_errors=5)
+    assert summary["rejected"] == 30 and len(summary["errors"]) == 5
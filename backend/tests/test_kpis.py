@@ -0,0 +1,72 @@
+"""build_kpis: each product family's ratios over its own rows and hours, per key and period."""
+from datetime import date
+
+import app as ivms
+
+
+def _row(key, day, **values):
+    return (key, day, *(values.get(c) for c in ivms.KPI_COLUMNS))
+
+
+def _by_key_period(records):
+    return {(r["key"], r["period"]): r for r in records}
+
+
+def test_ivms_and_aims_ratios_use_their_own_hours():
+    jan = date(2025, 1, 10)
+    out = _by_key_period(ivms.build_kpis([
+        _row("a", jan, dedicated_hours=4, line_miles=12, benchmark_for_task=4),
+        _row("a", jan, dedicated_hours=2, line_miles=3),  # no benchmark: throughput only
+        _row("a", jan, dedicated_hours=5, conductor_lines=10, number_of_points=40),
+        _row("a", jan, line_miles_h1v1=10, dedicated_hours_h1v1=4),
+    ], "month"))
+    a = out[("a", "2025-01-01")]
+    assert (a["entries"], a["hours"], a["ivmsHours"]) == (4, 11.0, 6.0)
+    assert a["lineMilesPerHour"] == 2.5  # 15 miles / 6 IVMS hours, not / 11
+    assert a["attainment"] == 0.75  # 12 miles / (4 per hour x 4 hours), benchmarked row only
+    assert a["h1v1MilesPerHour"] == 2.5 and a["h1v0MilesPerHour"] is None
+    assert (a["conductorLinesPerHour"], a["pointsPerHour"], a["pointsPerConductorLine"]) == (2.0, 8.0, 4.0)
+    assert a["featuresPerHour"] is None  # no ISMS rows
+
+
+def test_isms_density_and_spent_hours():
+    jan = date(2025, 1, 10)
+    out = _by_key_period(ivms.build_kpis([
+        _row("b", jan, dedicated_hours=6, spent_hours_on_above_task=3, area_hectares=2,
+             polygon_feature_count=30, point_feature_count=10),
+        _row("b", jan, dedicated_hours=1, area_hectares=0, polyline_feature_count=5),
+    ], "month"))
+    b = out[("b", "2025-01-01")]
+    assert (b["ismsHours"], b["features"]) == (4.0, 45.0)  # spent hours win over dedicated hours
+    assert b["featuresPerHour"] == 11.25
+    assert b["hectaresPerHour"] == 0.5
+    assert b["featuresPerHectare"] == 20.0  # 40 features / 2 ha; the row without area is left out
+    assert b["lineMilesPerHour"] is None and b["attainment"] is None
+
+
+def test_rows_split_by_key_and_period():
+    out = _by_key_period(ivms.build_kpis([
+        _row("a", date(2025, 1, 6), dedicated_hours=2, line_miles=2),
+        _row("a", date(2025, 1, 12), dedicated_hours=2, line_miles=6),
+        _row("a", date(2025, 1, 13), dedicated_hours=1, line_miles=1),
+        _row(None, date(2025, 1, 13), dedicated_hours=1),
+    ], "week"))
+    assert sorted(out) == [("a", "2025-01-06"), ("a", "2025-01-13"), ("unknown", "2025-01-13")]
+    assert out[("a", "2025-01-06")]["lineMilesPerHour"] == 2.0
+    assert out[("a", "2025-01-13")]["lineMilesPerHour"] == 1.0
+    assert ivms.build_kpis([], "month") == []
+
+
+def test_route_groups_by_project_and_filters_product(client, login):
+    user = login("user1@aidash.com")
+    for product, project, hours, miles in (("ivms", "BNG-AI", "4", "10"), ("aims", "GRID", "2", None)):
+        client.post("/api/tracker", headers=user, json={
+            "date": "2025-01-07", "podName": "POD-1 (Aryabhata)", "product": product,
+            "projects": [{"projectName": project, "dedicatedHours": hours, "lineMiles": miles}],
+        })
+    url = "/api/performance/kpis?start_date=2025-01-01&end_date=2025-01-31&group_by=project_name"
+    data = client.get(url, headers=user).get_json()["data"]
+    assert sorted(r["key"] for r in data) == ["BNG-AI", "GRID"]
+    data = client.get(url + "&product=ivms", headers=user).get_json()["data"]
+    assert [(r["key"], r["lineMilesPerHour"]) for r in data] == [("BNG-AI", 2.5)]
+    assert client.get(url.replace("project_name", "task"), headers=user).status_code == 400
@@ -0,0 +1,69 @@
+"""/api/metrics: per-endpoint counters and histograms in Prometheus text format."""
+import re
+
+import app as ivms
+
+LINE = re.compile(r"^(\w+)(\{.*\})? (\S+)$")
+
+
+def _scrape(client):
+    resp = client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in resp.get_data(as_text=True).splitlines():
+        if line.startswith("#"):
+            continue
+        name, labels, value = LINE.match(line).groups()
+        samples[name + (labels or "")] = float(value)
+    return samples
+
+
+def _get(client, url, **kwargs):
+    resp = client.get(url, **kwargs)
+    resp.close()  # metrics are recorded once the body has been sent
+    return resp
+
+
+def test_requests_are_counted_by_endpoint_and_status(client, login):
+    health = 'endpoint="/api/health",method="GET"'
+    users = 'endpoint="/api/users/<user_id>",method="DELETE"'
+    before = _scrape(client)
+    for _ in range(3):
+        _get(client, "/api/health")
+    admin = login("admin@aidash.com")
+    resp = client.delete("/api/users/no-such-user", headers=admin)
+    resp.close()
+    resp = client.delete("/api/users/no-such-user", headers=login("user1@aidash.com"))
+    resp.close()
+    after = _scrape(client)
+
+    def delta(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert delta(f'ivms_http_requests_total{{{health},status="200"}}') == 3
+    assert delta(f'ivms_http_request_duration_seconds_count{{{health}}}') == 3
+    assert delta(f'ivms_http_request_duration_seconds_bucket{{{health},le="+Inf"}}') == 3
+    assert delta(f'ivms_http_response_bytes_total{{{health}}}') > 0
+    assert delta(f'ivms_http_requests_total{{{users},status="200"}}') == 1
+    assert delta(f'ivms_http_requests_total{{{users},status="403"}}') == 1
+    # the admin's delete looked the user up; the 403 never reached the database
+    assert delta(f'ivms_http_request_sql_statements_sum{{{users}}}') >= 1
+    assert after["ivms_db_pool_checkouts_total"] >= before.get("ivms_db_pool_checkouts_total", 0)
+
+
+def test_streamed_exports_count_their_bytes(client, login, add_activity):
+    add_activity("m-1", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    labels = 'endpoint="/api/daily_activity/export",method="GET"'
+    before = _scrape(client).get(f"ivms_http_response_bytes_total{{{labels}}}", 0)
+    resp = client.get("/api/daily_activity/export?format=ndjson", headers=login("admin@aidash.com"))
+    size = len(resp.get_data())
+    resp.close()
+    assert _scrape(client)[f"ivms_http_response_bytes_total{{{labels}}}"] - before == size
+
+
+def test_token_is_required_when_configured(client, monkeypatch):
+    monkeypatch.setattr(ivms, "METRICS_TOKEN", "scrape-me")
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/api/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code == 200
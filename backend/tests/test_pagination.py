@@ -0,0 +1,62 @@
+"""Keyset pagination on /api/daily_activity: cursor round trip, bad cursors, ties."""
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+import app as ivms
+
+
+def _pages(client, headers, query=""):
+    ids, cursor = [], None
+    while True:
+        url = f"/api/daily_activity?page_size=2{query}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=headers).get_json()
+        ids += [row["id"] for row in body["data"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("sort_value", [datetime(2025, 1, 2, 10, 30, 15, 123456), None])
+def test_cursor_round_trip(sort_value):
+    cursor = ivms.encode_cursor(sort_value, "row-7")
+    assert "=" not in cursor
+    assert ivms.decode_cursor(cursor) == (sort_value, "row-7")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(json.dumps(["2025-01-02T10:00:00", 7]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(["yesterday", "row-1"]).encode()).decode(),
+    base64.urlsafe_b64encode(json.dumps(["2025-01-02T10:00:00"]).encode()).decode(),
+])
+def test_invalid_cursor_is_a_400(client, login, cursor):
+    with pytest.raises(ValueError):
+        ivms.decode_cursor(cursor)
+    resp = client.get("/api/daily_activity", headers=login("admin@aidash.com"), query_string={"cursor": cursor})
+    assert resp.status_code == 400
+
+
+def test_pages_break_ties_on_id(app, client, login, add_activity):
+    # five rows on the same timestamp, one older, one without a date
+    for i in range(5):
+        add_activity(f"tie-{i}", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-02")
+    add_activity("older", "user1@aidash.com", "POD-1 (Aryabhata)", "2025-01-01")
+    with app.app_context():
+        ivms.db.session.add(ivms.DailyActivity(id="undated", email="user1@aidash.com", pod_name="POD-1 (Aryabhata)"))
+        ivms.db.session.commit()
+
+    ids = _pages(client, login("user1@aidash.com"))
+    assert ids == ["tie-4", "tie-3", "tie-2", "tie-1", "tie-0", "older", "undated"]
+
+
+def test_filters_apply_to_every_page(client, login, add_activity):
+    for i in range(5):
+        add_activity(f"a-{i}", "user1@aidash.com", "POD-1 (Aryabhata)", f"2025-01-0{i + 1}")
+        add_activity(f"b-{i}", "user1@aidash.com", "POD-2 (Crawlers)", f"2025-01-0{i + 1}")
+
+    ids = _pages(client, login("admin@aidash.com"), "&pod_name=POD-2 (Crawlers)&start_date=2025-01-02")
+    assert ids == ["b-4", "b-3", "b-2", "b-1"]
@@ -0,0 +1,88 @@
+"""Password hashing: rehash on login, queue limits, and slots held until a job ends."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import app as ivms
+
+EMAIL = "rehash.test@aidash.com"
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def account(app):
+    with app.app_context():
+        ivms.db.session.add(ivms.User(
+            id="rehash-test", email=EMAIL, name="Rehash Test", role="User",
+            password=generate_password_hash(PASSWORD, "pbkdf2:sha256:1000"),
+        ))
+        ivms.db.session.commit()
+    yield
+    with app.app_context():
+        ivms.User.query.filter_by(email=EMAIL).delete()
+        ivms.db.session.commit()
+
+
+def _stored_hash(app):
+    with app.app_context():
+        return ivms.User.query.filter_by(email=EMAIL).one().password
+
+
+def _login(client, password=PASSWORD):
+    return client.post("/api/login", json={"email": EMAIL, "password": password})
+
+
+@pytest.mark.parametrize("stored, method, expected", [
+    ("pbkdf2:sha256:1000$salt$hash", "pbkdf2:sha256:1000", False),
+    ("pbkdf2:sha256:1000$salt$hash", "pbkdf2:sha256:600000", True),
+    ("scrypt:32768:8:1$salt$hash", "scrypt:32768:8:1", False),
+    ("scrypt:16384:8:1$salt$hash", "scrypt:32768:8:1", True),
+    ("scrypt:32768:8:1$salt$hash", "scrypt", False),
+    ("pbkdf2:sha256:1000$salt$hash", "scrypt", True),
+])
+def test_needs_rehash(monkeypatch, stored, method, expected):
+    monkeypatch.setattr(ivms, "PASSWORD_HASH_METHOD", method)
+    assert ivms.needs_rehash(stored) is expected
+
+
+def test_login_rehashes_when_the_method_changes(app, client, account, monkeypatch):
+    assert _login(client).status_code == 200
+    assert _stored_hash(app).startswith("pbkdf2:sha256:1000$")
+
+    monkeypatch.setattr(ivms, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+    assert _login(client, "wrong password").status_code == 401
+    assert _stored_hash(app).startswith("pbkdf2:sha256:1000$")  # only after a successful login
+
+    assert _login(client).status_code == 200
+    upgraded = _stored_hash(app)
+    assert upgraded.startswith("pbkdf2:sha256:2000$")
+    assert _login(client).status_code == 200
+    assert _stored_hash(app) == upgraded  # nothing left to upgrade
+
+
+def test_full_queue_is_a_503(client, account, monkeypatch):
+    monkeypatch.setattr(ivms, "HASH_QUEUE_LIMIT", 0)
+    resp = _login(client)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "2"
+
+
+def test_slot_is_held_until_a_timed_out_job_finishes(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(ivms, "HASH_POOL_SIZE", 1)
+    monkeypatch.setattr(ivms, "HASH_TIMEOUT", 0.05)
+    monkeypatch.setattr(ivms, "_get_hash_pool", lambda: pool)
+    release = threading.Event()
+    try:
+        with pytest.raises(ivms.HashPoolBusy):
+            ivms._run_hash("hash", release.wait, 5)
+        # the caller gave up, but the job still occupies the pool
+        assert ivms.hash_stats_snapshot()["inflight"] == 1
+        release.set()
+        pool.shutdown(wait=True)
+        assert ivms.hash_stats_snapshot()["inflight"] == 0
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
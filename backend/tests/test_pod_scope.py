@@ -0,0 +1,78 @@
+"""Pod scopes: cached report entries always match the pod list in their key."""
+import app as ivms
+
+RANGE = "start_date=2025-01-01&end_date=2025-01-31"
+PODS = ["POD-1 (Aryabhata)", "POD-2 (Crawlers)"]
+
+
+def _submit(client, headers, pod):
+    resp = client.post("/api/tracker", headers=headers, json={
+        "date": "2025-01-02", "podName": pod, "product": "ivms",
+        "projects": [{"projectName": "BNG-AI", "dedicatedHours": "2"}],
+    })
+    assert resp.status_code == 201, resp.get_json()
+
+
+def _pods_seen(resp):
+    return sorted(row["podName"] for row in resp.get_json()["data"])
+
+
+def test_manager_cannot_widen_scope(client, login, assign_pods):
+    user = login("user1@aidash.com")
+    for pod in PODS:
+        _submit(client, user, pod)
+    assign_pods("manager1@aidash.com", "Manager", PODS[:1])
+    manager = login("manager1@aidash.com")
+
+    assert _pods_seen(client.get(f"/api/performance?{RANGE}&email=user1@aidash.com", headers=manager)) == PODS[:1]
+    assert client.get(f"/api/daily_activity?pod_name={PODS[1]}", headers=manager).get_json()["data"] == []
+
+
+def test_assignment_change_on_another_worker_applies_at_once(app, client, login, assign_pods):
+    user = login("user1@aidash.com")
+    for pod in PODS:
+        _submit(client, user, pod)
+    assign_pods("manager1@aidash.com", "Manager", PODS)
+    assign_pods("lead1@aidash.com", "Team Lead", PODS)
+    manager, lead = login("manager1@aidash.com"), login("lead1@aidash.com")
+    assert _pods_seen(client.get(f"/api/performance?{RANGE}", headers=manager)) == PODS
+    resp = client.get(f"/api/team-report?{RANGE}&group_by=pod_name", headers=manager)
+    assert resp.headers["X-Cache"] == "MISS"
+
+    # Another worker removes POD-2 (its PUT commits and bumps the generation); this
+    # worker still has the old list and the old report entries cached
+    with app.app_context():
+        ivms.PodAssignment.query.filter_by(user_key="manager1", pod_name=PODS[1]).delete()
+        ivms.db.session.commit()
+        ivms.bump_generation("pod_assignments")
+
+    assert _pods_seen(client.get(f"/api/performance?{RANGE}", headers=manager)) == PODS[:1]
+    resp = client.get(f"/api/team-report?{RANGE}&group_by=pod_name", headers=manager)
+    assert resp.headers["X-Cache"] == "MISS"
+    assert [row["podName"] for row in resp.get_json()["data"]] == PODS[:1]
+    # the lead kept both pods and shares nothing with the manager's new scope
+    assert _pods_seen(client.get(f"/api/performance?{RANGE}", headers=lead)) == PODS
+
+
+def test_scoped_queries_use_a_semi_join(app):
+    with app.app_context():
+        sql = str(ivms.DailyTracker.query.filter(
+            ivms.in_pod_scope(ivms.DailyTracker.pod_name, "Manager", "manager1@aidash.com")
+        ).statement)
+    assert "FROM pod_assignments" in sql
+
+
+def test_team_report_scope_comes_from_the_jwt(client, login, assign_pods):
+    _submit(client, login("user1@aidash.com"), PODS[0])
+    _submit(client, login("user2@aidash.com"), PODS[1])
+    assign_pods("manager1@aidash.com", "Manager", [PODS[0]])
+    url = f"/api/team-report?{RANGE}"
+
+    def emails(resp):
+        return sorted(row["email"] for row in resp.get_json()["data"])
+
+    assert client.get(url + "&role=Admin").status_code == 401
+    assert emails(client.get(url + "&role=Manager&email=user2@aidash.com",
+                             headers=login("user1@aidash.com"))) == ["user1@aidash.com"]
+    assert emails(client.get(url + "&role=Admin", headers=login("manager1@aidash.com"))) == ["user1@aidash.com"]
+    assert emails(client.get(url, headers=login("admin@aidash.com"))) == ["user1@aidash.com", "user2@aidash.com"]
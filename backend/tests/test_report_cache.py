@@ -0,0 +1,77 @@
+"""Report cache: hits per scope, TTL expiry, LRU eviction and write-driven invalidation."""
+import app as ivms
+
+RANGE = "start_date=2025-01-01&end_date=2025-01-31"
+PODS = ["POD-1 (Aryabhata)", "POD-2 (Crawlers)"]
+
+
+def _submit(client, headers, pod, day="2025-01-02"):
+    resp = client.post("/api/tracker", headers=headers, json={
+        "date": day, "podName": pod, "product": "ivms",
+        "projects": [{"projectName": "BNG-AI", "dedicatedHours": "2"}],
+    })
+    assert resp.status_code == 201, resp.get_json()
+
+
+def test_lru_cache_ttl_and_eviction(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ivms.time, "monotonic", lambda: clock[0])
+    cache = ivms.LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" is now the most recent
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    clock[0] += 10.5
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+def test_lru_cache_invalidate_by_meta():
+    cache = ivms.LRUCache(maxsize=10, ttl=60)
+    cache.set("p1", "x", {"pods": ["POD-1"]})
+    cache.set("p2", "y", {"pods": ["POD-2"]})
+    assert cache.invalidate(lambda meta: "POD-1" in meta["pods"]) == 1
+    assert (cache.get("p1"), cache.get("p2")) == (None, "y")
+
+
+def test_second_request_is_a_hit_until_the_ttl(client, login, monkeypatch):
+    _submit(client, login("user1@aidash.com"), PODS[0])
+    admin = login("admin@aidash.com")
+    url = f"/api/performance/timeseries?{RANGE}"
+    assert client.get(url, headers=admin).headers["X-Cache"] == "MISS"
+    assert client.get(url, headers=admin).headers["X-Cache"] == "HIT"
+
+    later = ivms.time.monotonic() + ivms.REPORT_CACHE_TTL + 1
+    monkeypatch.setattr(ivms.time, "monotonic", lambda: later)
+    assert client.get(url, headers=admin).headers["X-Cache"] == "MISS"
+
+
+def test_writes_only_drop_entries_they_touch(client, login, assign_pods):
+    assign_pods("manager1@aidash.com", "Manager", PODS[:1])
+    user1, user2 = login("user1@aidash.com"), login("user2@aidash.com")
+    _submit(client, user1, PODS[0])
+    manager = login("manager1@aidash.com")
+    url = f"/api/performance/timeseries?{RANGE}"
+    assert client.get(url, headers=manager).headers["X-Cache"] == "MISS"
+
+    _submit(client, user2, PODS[1])  # another pod
+    _submit(client, user1, PODS[0], day="2025-02-10")  # outside the cached range
+    resp = client.get(url, headers=manager)
+    assert resp.headers["X-Cache"] == "HIT"
+
+    _submit(client, user1, PODS[0])
+    resp = client.get(url, headers=manager)
+    assert resp.headers["X-Cache"] == "MISS"
+    assert sum(s["totalHours"] for s in resp.get_json()["data"]["series"]) == 4.0
+
+
+def test_scopes_do_not_share_entries(client, login):
+    _submit(client, login("user1@aidash.com"), PODS[0])
+    _submit(client, login("user2@aidash.com"), PODS[1])
+    url = f"/api/performance/timeseries?{RANGE}"
+    admin = client.get(url, headers=login("admin@aidash.com"))
+    user = client.get(url, headers=login("user2@aidash.com"))
+    assert user.headers["X-Cache"] == "MISS"
+    assert sum(s["totalHours"] for s in admin.get_json()["data"]["series"]) == 4.0
+    assert sum(s["totalHours"] for s in user.get_json()["data"]["series"]) == 2.0
@@ -0,0 +1,90 @@
+"""An edit must invalidate both the cached report payload and the conditional-GET validators."""
+import time
+
+RANGE = "start_date=2025-01-01&end_date=2025-01-31"
+
+
+def _submit(client, headers, hours="4"):
+    resp = client.post("/api/tracker", headers=headers, json={
+        "date": "2025-01-02", "podName": "POD-1 (Aryabhata)", "product": "ivms",
+        "projects": [{"projectName": "BNG-AI", "dedicatedHours": hours}],
+    })
+    assert resp.status_code == 201, resp.get_json()
+
+
+def _hours(resp):
+    return [row["hours"] for row in resp.get_json()["data"]]
+
+
+def test_edit_changes_performance_etag_and_payload(client, login):
+    user = login("user1@aidash.com")
+    admin = login("admin@aidash.com")
+    _submit(client, user, hours="4")
+
+    first = client.get(f"/api/performance?{RANGE}", headers=user)
+    assert first.status_code == 200 and _hours(first) == [4.0]
+    etag = first.headers["ETag"]
+    second = client.get(f"/api/performance?{RANGE}", headers={**user, "If-None-Match": etag})
+    assert second.status_code == 304
+
+    row_id = first.get_json()["data"][0]["id"]
+    edit = client.put("/api/daily_activity/edit", headers=admin, json={"id": row_id, "dedicated_hours": "7"})
+    assert edit.status_code == 200
+
+    after = client.get(f"/api/performance?{RANGE}", headers={**user, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert after.headers["X-Cache"] == "MISS"
+    assert _hours(after) == [7.0]
+
+
+def test_edit_moves_last_modified(client, login):
+    user = login("user1@aidash.com")
+    _submit(client, user)
+    first = client.get(f"/api/performance?{RANGE}", headers=user)
+    since = first.headers["Last-Modified"]
+    row_id = first.get_json()["data"][0]["id"]
+
+    time.sleep(1.1)  # Last-Modified has one-second resolution
+    client.put("/api/daily_activity/edit", headers=login("admin@aidash.com"),
+               json={"id": row_id, "remarks": "checked"})
+
+    resp = client.get(f"/api/performance?{RANGE}", headers={**user, "If-Modified-Since": since})
+    assert resp.status_code == 200
+
+
+def test_team_report_cache_invalidated_by_edit(client, login, assign_pods):
+    assign_pods("manager1@aidash.com", "Manager", ["POD-1 (Aryabhata)"])
+    user = login("user1@aidash.com")
+    manager = login("manager1@aidash.com")
+    _submit(client, user, hours="4")
+
+    url = f"/api/team-report?{RANGE}"
+    assert client.get(url, headers=manager).get_json()["data"][0]["totalHours"] == 4.0
+    assert client.get(url, headers=manager).headers["X-Cache"] == "HIT"
+
+    row_id = client.get(f"/api/performance?{RANGE}", headers=user).get_json()["data"][0]["id"]
+    client.put("/api/daily_activity/edit", headers=login("admin@aidash.com"),
+               json={"id": row_id, "dedicated_hours": "7"})
+
+    resp = client.get(url, headers=manager)
+    assert resp.headers["X-Cache"] == "MISS"
+    assert resp.get_json()["data"][0]["totalHours"] == 7.0
+
+
+def test_performance_never_serves_an_entry_older_than_its_etag(client, login, monkeypatch):
+    """A write whose invalidation never reaches this worker's cache (another gunicorn worker)."""
+    import app as ivms
+    monkeypatch.setattr(ivms.report_cache, "invalidate", lambda predicate: 0)
+    user = login("user1@aidash.com")
+    _submit(client, user, hours="4")
+    first = client.get(f"/api/performance?{RANGE}", headers=user)
+    assert _hours(first) == [4.0]
+
+    _submit(client, user, hours="6")
+    after = client.get(f"/api/performance?{RANGE}", headers=user)
+    assert after.headers["ETag"] != first.headers["ETag"]
+    assert after.headers["X-Cache"] == "MISS"
+    assert sorted(_hours(after)) == [4.0, 6.0]
+    again = client.get(f"/api/performance?{RANGE}", headers={**user, "If-None-Match": after.headers["ETag"]})
+    assert again.status_code == 304
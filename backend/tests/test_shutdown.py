@@ -0,0 +1,20 @@
+"""Writes are refused with 503 + Retry-After once the worker stops accepting them."""
+import app as ivms
+
+
+def test_writes_refused_after_stop_accepting(client, login, monkeypatch):
+    writes = ivms.InflightWrites()
+    monkeypatch.setattr(ivms, "inflight_writes", writes)
+    headers = login("user1@aidash.com")
+    body = {"date": "2025-01-02", "podName": "POD-1 (Aryabhata)", "product": "ivms",
+            "projects": [{"projectName": "BNG-AI", "dedicatedHours": "2"}]}
+
+    assert client.post("/api/tracker", headers=headers, json=body).status_code == 201
+    assert writes.pending == 0
+
+    writes.stop_accepting()
+    resp = client.post("/api/tracker", headers=headers, json=body)
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "5"
+    # reads are unaffected
+    assert client.get("/api/performance", headers=headers).status_code == 200
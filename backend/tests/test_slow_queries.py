@@ -0,0 +1,86 @@
+"""Slow-query log: fingerprints group statements by shape, and secrets never reach the log."""
+import pytest
+from werkzeug.security import generate_password_hash
+
+import app as ivms
+
+EMAIL = "slow.test@aidash.com"
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def slow_log(monkeypatch):
+    """Treat every statement as slow, starting from an empty log."""
+    monkeypatch.setattr(ivms, "SLOW_QUERY_SECONDS", 0)
+    ivms.slow_fingerprints.clear()
+    ivms.slow_recent.clear()
+    yield
+    ivms.slow_fingerprints.clear()
+    ivms.slow_recent.clear()
+
+
+@pytest.mark.parametrize("a, b", [
+    ("SELECT * FROM users WHERE email = 'a@x.com' AND id = 7",
+     "SELECT * FROM users WHERE email = 'o''brien@x.com' AND id = 12"),
+    ("SELECT * FROM t WHERE id IN (?, ?, ?)", "SELECT * FROM t WHERE id IN (%(id_1)s)"),
+    ("INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y')", "INSERT INTO t (a, b) VALUES (%s, %s)"),
+    ("SELECT a\n  FROM t\tWHERE b = 1.5", "SELECT a FROM t WHERE b = 2"),
+])
+def test_fingerprint_ignores_values(a, b):
+    assert ivms.fingerprint_sql(a) == ivms.fingerprint_sql(b)
+
+
+def test_fingerprint_keeps_shape():
+    fp, normalized = ivms.fingerprint_sql("SELECT * FROM t WHERE id IN (1, 2) AND name = 'x' LIMIT 10")
+    assert normalized == "SELECT * FROM t WHERE id IN (?+) AND name = ? LIMIT ?"
+    assert fp != ivms.fingerprint_sql("SELECT * FROM t WHERE code IN (1, 2) AND name = 'x' LIMIT 10")[0]
+    # identifiers that merely contain digits are not numbers
+    assert "table_2" in ivms.fingerprint_sql("SELECT * FROM table_2")[1]
+
+
+def test_secret_named_parameters_are_redacted():
+    params = ivms._redacted_params({"email": "a@x.com", "password": "hunter2", "reset_token": "t0k"}, False)
+    assert "hunter2" not in params and "t0k" not in params and "a@x.com" in params
+
+    rows = [("a@x.com", "h1"), ("b@x.com", "h2"), ("c@x.com", "h3")]
+    params = ivms._redacted_params(rows, True, ("email", "password_hash"))
+    assert params == "('a@x.com', '***') (+2 more rows)"
+    # positional values with unknown names are shown as-is, but never past the size cap
+    assert ivms._redacted_params(("x" * 1000,), False).endswith("...")
+
+
+def test_route_reports_fingerprints_without_secrets(app, client, login, slow_log, monkeypatch):
+    with app.app_context():
+        ivms.db.session.add(ivms.User(
+            id="slow-test", email=EMAIL, name="Slow Test", role="User",
+            password=generate_password_hash(PASSWORD, "pbkdf2:sha256:1000"),
+        ))
+        ivms.db.session.commit()
+    try:
+        # logging in under a new hash method rewrites the stored hash
+        monkeypatch.setattr(ivms, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+        assert client.post("/api/login", json={"email": EMAIL, "password": PASSWORD}).status_code == 200
+        with app.app_context():
+            new_hash = ivms.User.query.filter_by(email=EMAIL).one().password
+        assert new_hash.startswith("pbkdf2:sha256:2000$")
+
+        admin = login("admin@aidash.com")
+        assert client.get("/api/debug/slow-queries?sort=slowest", headers=admin).status_code == 400
+        assert client.get("/api/debug/slow-queries", headers=login("user1@aidash.com")).status_code == 403
+        resp = client.get("/api/debug/slow-queries?sort=count&limit=500&recent=1&reset=1", headers=admin)
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body["thresholdMs"] == 0
+        updates = [e for e in body["data"] if e["sql"].startswith("UPDATE users_table SET password")]
+        assert len(updates) == 1 and list(updates[0]["endpoints"]) == ["/api/login"]
+        logged = resp.get_data(as_text=True)
+        assert new_hash not in logged and PASSWORD not in logged
+        assert any(r["fingerprint"] == updates[0]["fingerprint"] for r in body["recent"])
+        counts = [e["count"] for e in body["data"]]
+        assert counts == sorted(counts, reverse=True)
+
+        assert client.get("/api/debug/slow-queries", headers=admin).get_json()["data"] != body["data"]
+    finally:
+        with app.app_context():
+            ivms.User.query.filter_by(email=EMAIL).delete()
+            ivms.db.session.commit()
@@ -0,0 +1,74 @@
+"""build_timeseries: gap filling, rolling means with warm-up, utilization per working day."""
+from datetime import date
+
+import pytest
+
+import app as ivms
+
+START, END = date(2025, 1, 6), date(2025, 1, 12)  # Monday .. Sunday
+ROWS = [
+    ("a", date(2025, 1, 1), 7.0),  # warm-up only: feeds the rolling means, not the hours
+    ("a", date(2025, 1, 6), 8.0),
+    ("a", date(2025, 1, 8), 4.0),
+    ("b", date(2025, 1, 11), 2.0),  # a Saturday
+    (None, date(2025, 1, 7), 1.0),
+]
+
+
+def _series(payload):
+    return {s["key"]: s for s in payload["series"]}
+
+
+def test_daily_gap_fill_and_rolling_means():
+    out = ivms.build_timeseries(ROWS, START, END, "day", target_hours=8)
+    assert out["calendar"] == [f"2025-01-{d:02d}" for d in range(6, 13)]
+    assert out["workingDays"] == [1, 1, 1, 1, 1, 0, 0]
+
+    a = _series(out)["a"]
+    assert a["hours"] == [8.0, 0.0, 4.0, 0.0, 0.0, 0.0, 0.0]
+    assert a["totalHours"] == 12.0
+    # trailing calendar windows, gaps count as zero: 01-01 and 01-06 are both in the first week
+    assert a["rolling7"][0] == round(15 / 7, 2)
+    assert a["rolling7"][2] == round(12 / 7, 2)
+    assert a["rolling30"][0] == 0.5
+    assert a["utilization"][:2] == [1.0, 0.0]
+    assert a["utilization"][5:] == [None, None]  # no target on weekends
+    assert a["utilizationOverall"] == 0.3
+
+    assert _series(out)["unknown"]["hours"][1] == 1.0  # NULL keys are grouped, not dropped
+    assert _series(out)["b"]["utilizationOverall"] == 0.05
+
+
+def test_weekly_buckets_start_on_monday():
+    out = ivms.build_timeseries(ROWS, START, END, "week", target_hours=8)
+    assert out["calendar"] == ["2025-01-06"] and out["workingDays"] == [5]
+    a = _series(out)["a"]
+    assert a["hours"] == [12.0]
+    assert a["utilization"] == [0.3]
+    assert a["rolling7"] == [round(12 / 7, 2)]  # read at the bucket's last day
+
+
+def test_no_rows_still_returns_the_calendar():
+    out = ivms.build_timeseries([], START, END, "day")
+    assert len(out["calendar"]) == 7 and out["series"] == []
+
+
+def test_route_scopes_and_validates(client, login):
+    for email, hours in (("user1@aidash.com", "6"), ("user2@aidash.com", "3")):
+        client.post("/api/tracker", headers=login(email), json={
+            "date": "2025-01-07", "podName": "POD-1 (Aryabhata)", "product": "ivms",
+            "projects": [{"projectName": "BNG-AI", "dedicatedHours": hours}],
+        })
+    url = "/api/performance/timeseries?start_date=2025-01-06&end_date=2025-01-12&period=week"
+
+    user = client.get(url, headers=login("user1@aidash.com")).get_json()
+    assert [(s["key"], s["hours"]) for s in user["data"]["series"]] == [("user1@aidash.com", [6.0])]
+    pods = client.get(url + "&group_by=pod_name", headers=login("admin@aidash.com")).get_json()
+    assert [(s["key"], s["hours"]) for s in pods["data"]["series"]] == [("POD-1 (Aryabhata)", [9.0])]
+
+
+@pytest.mark.parametrize("query", ["group_by=product", "period=hour", "target_hours=0",
+                                   "start_date=2025-02-01&end_date=2025-01-01", "start_date=soon"])
+def test_route_rejects_bad_parameters(client, login, query):
+    resp = client.get(f"/api/performance/timeseries?{query}", headers=login("admin@aidash.com"))
+    assert resp.status_code == 400
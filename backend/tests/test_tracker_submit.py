@@ -0,0 +1,33 @@
+"""A multi-project /api/tracker submission is one batch insert with its payload stored once."""
+import json
+
+import app as ivms
+
+
+def test_payload_stored_once_per_submission(app, client, login):
+    body = {
+        "date": "2025-01-02", "podName": "POD-1 (Aryabhata)", "product": "ivms", "modeOfFunctioning": "WFO",
+        "projects": [{"projectName": f"P-{i}", "dedicatedHours": "1", "remarks": f"r{i}"} for i in range(3)],
+    }
+    resp = client.post("/api/tracker", headers=login("user1@aidash.com"), json=body)
+    assert resp.status_code == 201
+    ids = resp.get_json()["ids"]
+    assert resp.get_json()["count"] == 3
+
+    with app.app_context():
+        submission = ivms.TrackerSubmission.query.one()
+        assert submission.project_count == 3
+        assert json.loads(submission.payload_json) == body
+        rows = ivms.DailyTracker.query.order_by(ivms.DailyTracker.project_name).all()
+        assert sorted(r.id for r in rows) == sorted(ids)
+        assert {r.submission_id for r in rows} == {submission.id}
+        assert all(r.metadata_json is None for r in rows)
+        assert [r.remarks for r in rows] == ["r0", "r1", "r2"]
+        assert len({r.submitted_at for r in rows}) == 1
+
+
+def test_empty_projects_write_nothing(app, client, login):
+    resp = client.post("/api/tracker", headers=login("user1@aidash.com"), json={"projects": []})
+    assert resp.status_code == 201 and resp.get_json()["count"] == 0
+    with app.app_context():
+        assert ivms.TrackerSubmission.query.count() == 0
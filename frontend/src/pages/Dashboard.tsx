@@ -1,13 +1,69 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import { fetchWithAuth } from '../utils/api';
 
 const Dashboard: React.FC<any> = ({ currentUser }) => {
+  const [dash, setDash] = useState<any>(null);
+  const [loading, setLoading] = useState(false);
+
+  useEffect(() => {
+    const load = async () => {
+      setLoading(true);
+      try {
+        // One round trip: performance, team totals, resource counts and filters together
+        const res = await fetchWithAuth('/api/dashboard');
+        if (!res.ok) throw new Error('Failed');
+        setDash(await res.json());
+      } catch (err) {
+        console.error(err);
+      } finally { setLoading(false); }
+    };
+    if (currentUser) load();
+  }, [currentUser]);
+
+  const performance: any[] = dash?.data?.performance || [];
+  const team: any[] = dash?.data?.team || [];
+  const resources = dash?.data?.resources;
+  const totalHours = performance.reduce((sum, d) => sum + (d.hours || 0), 0);
+  const totalEntries = performance.reduce((sum, d) => sum + (d.entries || 0), 0);
+
   return (
     <div>
       <p className="text-[11px] font-black text-purple-600 uppercase tracking-[0.4em]">Welcome</p>
       <h1 className="text-4xl font-black mt-2">Hello, {currentUser?.name || currentUser?.email}</h1>
-      <p className="mt-6 text-gray-600">Use the sidebar to navigate.</p>
+      {dash?.range && (
+        <p className="mt-2 text-xs text-gray-500">{dash.range.start} – {dash.range.end}</p>
+      )}
+
+      {loading ? <div className="mt-6">Loading...</div> : (
+        <div className="grid grid-cols-1 md:grid-cols-3 gap-6 mt-6">
+          <div className="bg-white rounded-2xl p-6 shadow-sm border">
+            <div className="text-sm text-gray-400">Hours logged</div>
+            <div className="text-3xl font-black">{totalHours.toFixed(1)}h</div>
+            <div className="text-xs text-gray-500">{totalEntries} entries</div>
+          </div>
+          <div className="bg-white rounded-2xl p-6 shadow-sm border">
+            <div className="text-sm text-gray-400">Team members reporting</div>
+            <div className="text-3xl font-black">{team.length}</div>
+          </div>
+          <div className="bg-white rounded-2xl p-6 shadow-sm border">
+            <div className="text-sm text-gray-400">Resource plan entries</div>
+            <div className="text-3xl font-black">{resources?.total ?? 0}</div>
+          </div>
+          {team.length > 0 && (
+            <div className="md:col-span-3 bg-white rounded-2xl p-6 shadow-sm border">
+              <div className="font-black mb-4">Team totals</div>
+              {team.map((t, i) => (
+                <div key={i} className="flex items-center justify-between py-1 text-sm">
+                  <span>{t.email}</span>
+                  <span className="font-black">{t.totalHours}h</span>
+                </div>
+              ))}
+            </div>
+          )}
+        </div>
+      )}
     </div>
   );
 };
 
-export default Dashboard;
\ No newline at end of file
+export default Dashboard;
@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useState } from "react";
 import { PerfRecord } from "../types";
 import { fetchWithAuth } from "../utils/api";
 
@@ -15,6 +15,8 @@ type Filters = {
 const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
   const [data, setData] = useState<PerfRecord[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const [filters, setFilters] = useState<Filters>({
     product: "",
@@ -26,9 +28,45 @@ const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
     toDate: "",
   });
 
+  const [filterOptions, setFilterOptions] = useState<Record<string, string[]>>({});
+
+  // Filters run on the server (the API scopes rows by the JWT), so every page
+  // "Load more" fetches continues the same filtered result set.
+  const buildUrl = (cursor?: string | null) => {
+    const qs = new URLSearchParams();
+    if (filters.product) qs.append('product', filters.product);
+    if (filters.project) qs.append('project_name', filters.project);
+    if (filters.pod) qs.append('pod_name', filters.pod);
+    if (filters.nature) qs.append('nature_of_work', filters.nature);
+    if (filters.task) qs.append('task', filters.task);
+    if (filters.fromDate) qs.append('start_date', filters.fromDate);
+    if (filters.toDate) qs.append('end_date', filters.toDate);
+    if (cursor) qs.append('cursor', cursor);
+    const q = qs.toString();
+    return q ? `/api/daily_activity?${q}` : `/api/daily_activity`;
+  };
+
+  // Dropdown values that occur in the caller's scope, not just in the loaded pages
   useEffect(() => {
+    const fetchFilterOptions = async () => {
+      try {
+        const res = await fetchWithAuth('/api/daily_activity/filters?source=data');
+        if (!res.ok) return;
+        const result = await res.json();
+        setFilterOptions(result?.data || result || {});
+      } catch (err) {
+        console.error("Error fetching filter options:", err);
+      }
+    };
+
+    if (currentUser) fetchFilterOptions();
+  }, [currentUser]);
+
+  useEffect(() => {
+    let cancelled = false;
     const fetchOldData = async () => {
       setLoading(true);
+      setNextCursor(null);
       try {
         const token =
           typeof window !== "undefined"
@@ -41,17 +79,8 @@ const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
           return;
         }
 
-        // Request: scope to current user for non-admins so regular users don't see other people's entries
-        let url = `/api/daily_activity`;
-        const nonAdminRoles = ['Admin', 'Internal Admin'];
-        if (!nonAdminRoles.includes(currentUser?.role || '')) {
-          const qs = new URLSearchParams();
-          if (currentUser?.email) qs.append('email', currentUser.email);
-          const q = qs.toString();
-          if (q) url = url + `?${q}`;
-        }
-
-        const res = await fetchWithAuth(url);
+        const res = await fetchWithAuth(buildUrl());
+        if (cancelled) return;
         if (!res.ok) {
           const errorText = await res.text();
           console.error(`API error ${res.status}:`, errorText);
@@ -60,81 +89,50 @@ const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
         }
 
         const result = await res.json();
+        if (cancelled) return;
         setData(result?.data || []);
+        setNextCursor(result?.next_cursor || null);
       } catch (err) {
         console.error("Error fetching data:", err);
-        setData([]);
+        if (!cancelled) setData([]);
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     fetchOldData();
-  }, [currentUser]);
+    return () => {
+      cancelled = true;
+    };
+  }, [currentUser, filters]);
 
-  const normalizeDate = (iso?: string) => {
-    if (!iso) return "";
-    // expects ISO like 2026-01-30T...
-    return iso.split("T")[0] || "";
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetchWithAuth(buildUrl(nextCursor));
+      if (!res.ok) {
+        console.error(`API error ${res.status}:`, await res.text());
+        return;
+      }
+      const result = await res.json();
+      setData((prev) => [...prev, ...(result?.data || [])]);
+      setNextCursor(result?.next_cursor || null);
+    } catch (err) {
+      console.error("Error fetching more data:", err);
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
-  const uniqueProducts = useMemo(
-    () => [...new Set(data.map((i) => i.product).filter(Boolean))].sort(),
-    [data]
-  );
-  const uniqueProjects = useMemo(
-    () => [...new Set(data.map((i) => i.projectName).filter(Boolean))].sort(),
-    [data]
-  );
-  const uniquePods = useMemo(
-    () => [...new Set(data.map((i) => i.podName).filter(Boolean))].sort(),
-    [data]
-  );
-  const uniqueNatures = useMemo(
-    () => [...new Set(data.map((i) => i.natureOfWork).filter(Boolean))].sort(),
-    [data]
-  );
-  const uniqueTasks = useMemo(
-    () => [...new Set(data.map((i) => i.task).filter(Boolean))].sort(),
-    [data]
-  );
-
-  const filteredData = useMemo(() => {
-    return data.filter((item) => {
-      // dropdowns => exact match (better UX)
-      if (filters.product && item.product !== filters.product) return false;
-      if (filters.project && item.projectName !== filters.project) return false;
-      if (filters.pod && item.podName !== filters.pod) return false;
-      if (filters.nature && item.natureOfWork !== filters.nature) return false;
-      if (filters.task && item.task !== filters.task) return false;
+  const uniqueProducts = filterOptions.products || [];
+  const uniqueProjects = filterOptions.projectNames || [];
+  const uniquePods = filterOptions.podNames || [];
+  const uniqueNatures = filterOptions.natureOfWork || [];
+  const uniqueTasks = filterOptions.tasks || [];
 
-      const itemDate = normalizeDate(item.submittedAt);
-
-      if (filters.fromDate && itemDate && itemDate < filters.fromDate) return false;
-      if (filters.toDate && itemDate && itemDate > filters.toDate) return false;
-
-      return true;
-    });
-  }, [data, filters]);
-
-  // If any filter is active (including date range), show the full filtered set.
-  // Otherwise, show only the first 50 rows for performance/UX.
-  const hasActiveFilters = useMemo(() => {
-    return Boolean(
-      filters.product ||
-      filters.project ||
-      filters.nature ||
-      filters.task ||
-      filters.pod ||
-      filters.fromDate ||
-      filters.toDate
-    );
-  }, [filters]);
-
-  const displayedData = useMemo(() => {
-    if (hasActiveFilters) return filteredData;
-    return filteredData.slice(0, 50);
-  }, [filteredData, hasActiveFilters]);
+  // Rows arrive already filtered, one server page at a time ("Load more").
+  const displayedData = data;
 
   const clearFilters = () =>
     setFilters({
@@ -315,7 +313,7 @@ const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
                     Loading data...
                   </td>
                 </tr>
-              ) : filteredData.length === 0 ? (
+              ) : displayedData.length === 0 ? (
                 <tr>
                   <td
                     colSpan={(currentUser?.role === "Admin" || currentUser?.role === "Internal Admin") ? 13 : 12}
@@ -399,6 +397,17 @@ const OldData: React.FC<any> = ({ currentUser, onEdit }) => {
             </tbody>
           </table>
         </div>
+        {nextCursor && !loading && (
+          <div className="px-6 py-3 border-t border-gray-300 bg-white flex justify-center">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-4 py-2 rounded-lg border border-gray-300 bg-white text-sm font-bold hover:bg-gray-50 disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );